@@ -0,0 +1,46 @@
+"""chain indexing and extrinsic status
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-19 00:00:00
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = '0002'
+down_revision = '0001'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('sync_cursors',
+    sa.Column('name', sa.String(), nullable=False),
+    sa.Column('position', sa.Integer(), nullable=False),
+    sa.Column('position_hash', sa.String(), nullable=True),
+    sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=True),
+    sa.PrimaryKeyConstraint('name')
+    )
+
+    with op.batch_alter_table('orders', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('chain_status', sa.String(), nullable=True))
+
+    with op.batch_alter_table('transactions', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('contract_order_id', sa.Integer(), nullable=True))
+        batch_op.add_column(sa.Column('event_index', sa.Integer(), nullable=True))
+        batch_op.create_index(batch_op.f('ix_transactions_contract_order_id'), ['contract_order_id'], unique=False)
+        batch_op.create_unique_constraint('uq_transactions_block_event', ['block_number', 'event_index'])
+
+
+def downgrade():
+    with op.batch_alter_table('transactions', schema=None) as batch_op:
+        batch_op.drop_constraint('uq_transactions_block_event', type_='unique')
+        batch_op.drop_index(batch_op.f('ix_transactions_contract_order_id'))
+        batch_op.drop_column('event_index')
+        batch_op.drop_column('contract_order_id')
+
+    with op.batch_alter_table('orders', schema=None) as batch_op:
+        batch_op.drop_column('chain_status')
+
+    op.drop_table('sync_cursors')
@@ -0,0 +1,31 @@
+"""order updated_at watermark
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-19 00:00:00
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = '0003'
+down_revision = '0002'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('orders', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=True))
+        batch_op.create_index(batch_op.f('ix_orders_updated_at'), ['updated_at'], unique=False)
+
+    # Existing rows: the latest lifecycle timestamp is the last change we know of
+    op.execute(
+        "UPDATE orders SET updated_at = COALESCE(completed_at, payment_sent_at, accepted_at, created_at)"
+    )
+
+
+def downgrade():
+    with op.batch_alter_table('orders', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_orders_updated_at'))
+        batch_op.drop_column('updated_at')
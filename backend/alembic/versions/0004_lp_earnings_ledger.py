@@ -0,0 +1,54 @@
+"""lp earnings ledger and rollups
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2026-10-19 00:00:00
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = '0004'
+down_revision = '0003'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('lp_ledger',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('lp_id', sa.Integer(), nullable=False),
+    sa.Column('order_id', sa.Integer(), nullable=False),
+    sa.Column('volume_usd', sa.Numeric(precision=20, scale=8), nullable=False),
+    sa.Column('earnings_usd', sa.Numeric(precision=20, scale=8), nullable=False),
+    sa.Column('occurred_at', sa.DateTime(timezone=True), nullable=False),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=True),
+    sa.ForeignKeyConstraint(['lp_id'], ['liquidity_providers.id'], ),
+    sa.ForeignKeyConstraint(['order_id'], ['orders.id'], ),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('order_id')
+    )
+    op.create_table('lp_earnings_rollups',
+    sa.Column('lp_id', sa.Integer(), nullable=False),
+    sa.Column('granularity', sa.String(), nullable=False),
+    sa.Column('bucket_start', sa.DateTime(timezone=True), nullable=False),
+    sa.Column('orders', sa.Integer(), nullable=False),
+    sa.Column('volume_usd', sa.Numeric(precision=20, scale=8), nullable=False),
+    sa.Column('earnings_usd', sa.Numeric(precision=20, scale=8), nullable=False),
+    sa.ForeignKeyConstraint(['lp_id'], ['liquidity_providers.id'], ),
+    sa.PrimaryKeyConstraint('lp_id', 'granularity', 'bucket_start')
+    )
+
+    # Completed orders so far become ledger entries; the rollup job builds the aggregates
+    op.execute(
+        "INSERT INTO lp_ledger (lp_id, order_id, volume_usd, earnings_usd, occurred_at) "
+        "SELECT lp_id, id, usd_amount, "
+        "CASE WHEN brl_amount > 0 THEN lp_fee_amount * usd_amount / brl_amount ELSE 0 END, completed_at "
+        "FROM orders WHERE status = 'COMPLETED' AND lp_id IS NOT NULL AND completed_at IS NOT NULL "
+        "ORDER BY completed_at, id"
+    )
+
+
+def downgrade():
+    op.drop_table('lp_earnings_rollups')
+    op.drop_table('lp_ledger')
@@ -0,0 +1,35 @@
+"""order outbox
+
+Revision ID: 0006
+Revises: 0005
+Create Date: 2026-10-19 00:00:00
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = '0006'
+down_revision = '0005'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('order_outbox',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('order_id', sa.Integer(), nullable=False),
+    sa.Column('event', sa.String(), nullable=False),
+    sa.Column('payload', sa.JSON(), nullable=False),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=False),
+    sa.ForeignKeyConstraint(['order_id'], ['orders.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    with op.batch_alter_table('order_outbox', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_order_outbox_order_id'), ['order_id'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('order_outbox', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_order_outbox_order_id'))
+
+    op.drop_table('order_outbox')
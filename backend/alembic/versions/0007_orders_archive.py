@@ -0,0 +1,103 @@
+"""orders archive
+
+Revision ID: 0007
+Revises: 0006
+Create Date: 2026-10-19 00:00:00
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+revision = '0007'
+down_revision = '0006'
+branch_labels = None
+depends_on = None
+
+ORDER_TYPES = ('BUY', 'SELL')
+ORDER_STATUSES = ('PENDING', 'ACCEPTED', 'PAYMENT_SENT', 'COMPLETED', 'DISPUTED', 'CANCELLED')
+
+# Tables whose order_id may now point at an archived order
+ORDER_REFERENCES = ('transactions', 'lp_ledger', 'order_outbox')
+
+# SQLite reflects the original foreign keys without a name; batch mode needs one to drop them
+NAMING = {"fk": "fk_%(table_name)s_%(column_0_name)s_%(referred_table_name)s"}
+
+COLUMNS = (
+    'id', 'order_type', 'status', 'dot_amount', 'brl_amount', 'usd_amount', 'exchange_rate_dot_brl',
+    'lp_fee_amount', 'user_id', 'lp_id', 'pix_key', 'pix_qr_code', 'pix_txid', 'pix_payment_proof',
+    'contract_order_id', 'escrow_tx_hash', 'release_tx_hash', 'chain_status', 'task_status', 'task_error',
+    'notes', 'dispute_reason', 'created_at', 'accepted_at', 'payment_sent_at', 'completed_at',
+    'expires_at', 'updated_at',
+)
+
+
+def _enum(values, name):
+    # The types already exist on PostgreSQL (orders table)
+    return sa.Enum(*values, name=name).with_variant(
+        postgresql.ENUM(*values, name=name, create_type=False), 'postgresql'
+    )
+
+
+def upgrade():
+    op.create_table('orders_archive',
+    sa.Column('id', sa.Integer(), autoincrement=False, nullable=False),
+    sa.Column('order_type', _enum(ORDER_TYPES, 'ordertype'), nullable=False),
+    sa.Column('status', _enum(ORDER_STATUSES, 'orderstatus'), nullable=True),
+    sa.Column('dot_amount', sa.Float(), nullable=False),
+    sa.Column('brl_amount', sa.Float(), nullable=False),
+    sa.Column('usd_amount', sa.Float(), nullable=False),
+    sa.Column('exchange_rate_dot_brl', sa.Float(), nullable=False),
+    sa.Column('lp_fee_amount', sa.Float(), nullable=True),
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('lp_id', sa.Integer(), nullable=True),
+    sa.Column('pix_key', sa.String(), nullable=True),
+    sa.Column('pix_qr_code', sa.String(), nullable=True),
+    sa.Column('pix_txid', sa.String(), nullable=True),
+    sa.Column('pix_payment_proof', sa.String(), nullable=True),
+    sa.Column('contract_order_id', sa.Integer(), nullable=True),
+    sa.Column('escrow_tx_hash', sa.String(), nullable=True),
+    sa.Column('release_tx_hash', sa.String(), nullable=True),
+    sa.Column('chain_status', sa.String(), nullable=True),
+    sa.Column('task_status', sa.String(), nullable=True),
+    sa.Column('task_error', sa.String(), nullable=True),
+    sa.Column('notes', sa.String(), nullable=True),
+    sa.Column('dispute_reason', sa.String(), nullable=True),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=True),
+    sa.Column('accepted_at', sa.DateTime(timezone=True), nullable=True),
+    sa.Column('payment_sent_at', sa.DateTime(timezone=True), nullable=True),
+    sa.Column('completed_at', sa.DateTime(timezone=True), nullable=True),
+    sa.Column('expires_at', sa.DateTime(timezone=True), nullable=True),
+    sa.Column('updated_at', sa.DateTime(timezone=True), nullable=True),
+    sa.Column('archived_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=False),
+    sa.ForeignKeyConstraint(['lp_id'], ['liquidity_providers.id'], ),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    with op.batch_alter_table('orders_archive', schema=None) as batch_op:
+        batch_op.create_index('ix_orders_archive_user_id_created_at', ['user_id', 'created_at'], unique=False)
+        batch_op.create_index('ix_orders_archive_lp_id_created_at', ['lp_id', 'created_at'], unique=False)
+
+    inspector = sa.inspect(op.get_bind())
+    for table in ORDER_REFERENCES:
+        name = next(
+            fk['name'] for fk in inspector.get_foreign_keys(table) if fk['referred_table'] == 'orders'
+        ) or f'fk_{table}_order_id_orders'
+        with op.batch_alter_table(table, naming_convention=NAMING) as batch_op:
+            batch_op.drop_constraint(name, type_='foreignkey')
+
+
+def downgrade():
+    # Archived orders go back to the live table first, so the foreign keys hold
+    columns = ', '.join(COLUMNS)
+    op.execute(f'INSERT INTO orders ({columns}) SELECT {columns} FROM orders_archive')
+
+    for table in ORDER_REFERENCES:
+        with op.batch_alter_table(table, schema=None) as batch_op:
+            batch_op.create_foreign_key(f'{table}_order_id_fkey', 'orders', ['order_id'], ['id'])
+
+    with op.batch_alter_table('orders_archive', schema=None) as batch_op:
+        batch_op.drop_index('ix_orders_archive_lp_id_created_at')
+        batch_op.drop_index('ix_orders_archive_user_id_created_at')
+
+    op.drop_table('orders_archive')
@@ -0,0 +1,29 @@
+"""index orders by contract order ID
+
+Revision ID: 0008
+Revises: 0007
+Create Date: 2026-10-19 00:00:00
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = '0008'
+down_revision = '0007'
+branch_labels = None
+depends_on = None
+
+# The chain indexer and escrow state lookups find orders, live or archived, by contract order ID
+TABLES = ('orders', 'orders_archive')
+
+
+def upgrade():
+    for table in TABLES:
+        with op.batch_alter_table(table, schema=None) as batch_op:
+            batch_op.create_index(batch_op.f(f'ix_{table}_contract_order_id'), ['contract_order_id'], unique=False)
+
+
+def downgrade():
+    for table in reversed(TABLES):
+        with op.batch_alter_table(table, schema=None) as batch_op:
+            batch_op.drop_index(batch_op.f(f'ix_{table}_contract_order_id'))
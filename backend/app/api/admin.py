@@ -0,0 +1,60 @@
+from fastapi import APIRouter, Depends, HTTPException, Header, status
+from fastapi.responses import FileResponse
+from typing import List, Optional
+import hmac
+import time
+
+from app.config import settings
+from app.profiling import profile_store, sign_profile_request
+from app.schemas import ProfileInfo, ProfileSignatureResponse
+
+router = APIRouter(prefix="/admin", tags=["admin"])
+
+
+async def require_admin(x_admin_token: Optional[str] = Header(None)):
+    """Admin endpoints need ADMIN_TOKEN configured and sent as X-Admin-Token"""
+    if not settings.admin_token or not x_admin_token or not hmac.compare_digest(x_admin_token, settings.admin_token):
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Admin token required"
+        )
+
+
+@router.get("/profiles", response_model=List[ProfileInfo], dependencies=[Depends(require_admin)])
+async def list_profiles():
+    """List stored request profiles, newest first"""
+    return profile_store.list()
+
+
+@router.get("/profiles/signature", response_model=ProfileSignatureResponse, dependencies=[Depends(require_admin)])
+async def get_profile_signature(path: str, ttl_seconds: int = 300):
+    """
+    Header that makes the profiling middleware profile requests to path
+    
+    Valid for ttl_seconds; needs PROFILING_SECRET set.
+    """
+    if not settings.profiling_enabled or not settings.profiling_secret:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Profiling by signed header is not enabled"
+        )
+    
+    expires_at = int(time.time()) + ttl_seconds
+    return ProfileSignatureResponse(
+        path=path,
+        header="X-Profile-Signature",
+        value=sign_profile_request(settings.profiling_secret, path, expires_at),
+        expires_at=expires_at
+    )
+
+
+@router.get("/profiles/{name}", dependencies=[Depends(require_admin)])
+async def download_profile(name: str):
+    """Download a profile in collapsed-stack format (flamegraph.pl, speedscope)"""
+    path = profile_store.path(name)
+    if not path:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Profile not found"
+        )
+    return FileResponse(path, media_type="text/plain", filename=name)
@@ -0,0 +1,40 @@
+from fastapi import APIRouter, Depends
+from sqlalchemy.orm import Session
+from datetime import datetime
+from typing import List, Optional, Literal
+
+from app.database import get_db
+from app.models import OrderType
+from app.schemas import OrderLifecycleStats, LPRankingEntry
+from app.services.order_analytics import order_analytics
+
+router = APIRouter(prefix="/analytics", tags=["analytics"])
+
+
+@router.get("/order-lifecycle", response_model=List[OrderLifecycleStats])
+def get_order_lifecycle(
+    group_by: Optional[Literal["order_type", "lp", "bucket"]] = None,
+    bucket: Literal["hour", "day"] = "day",
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+    db: Session = Depends(get_db)
+):
+    """
+    Time-to-accept, time-to-pay and time-to-complete percentiles (seconds)
+    
+    Overall, or grouped by order type, LP or creation time bucket.
+    Computed from data at most ANALYTICS_REFRESH_SECONDS old.
+    """
+    order_analytics.refresh_if_stale(db)
+    return order_analytics.lifecycle(group_by=group_by, bucket=bucket, since=since, until=until)
+
+
+@router.get("/lp-ranking", response_model=List[LPRankingEntry])
+def get_lp_ranking(
+    order_type: Optional[OrderType] = None,
+    min_orders: int = 5,
+    db: Session = Depends(get_db)
+):
+    """LPs ranked by median time to complete, fastest first"""
+    order_analytics.refresh_if_stale(db)
+    return order_analytics.lp_ranking(order_type=order_type, min_orders=min_orders)
@@ -8,6 +8,7 @@ from app.database import get_db
 from app.models import User
 from app.schemas import WalletAuthRequest, TokenResponse, UserResponse
 from app.config import settings
+from app.rate_limit import rate_limit
 from app.services.polkadot_service import polkadot_service
 
 router = APIRouter(prefix="/auth", tags=["auth"])
@@ -27,7 +28,7 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
     return encoded_jwt
 
 
-@router.post("/wallet", response_model=TokenResponse)
+@router.post("/wallet", response_model=TokenResponse, dependencies=[Depends(rate_limit("wallet_auth"))])
 async def authenticate_wallet(
     auth_request: WalletAuthRequest,
     db: Session = Depends(get_db)
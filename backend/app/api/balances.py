@@ -0,0 +1,23 @@
+from fastapi import APIRouter
+from typing import List
+
+from app.schemas import BalancesRequest, BalanceResponse
+from app.services.polkadot_service import polkadot_service
+
+router = APIRouter(prefix="/balances", tags=["balances"])
+
+
+@router.post("/", response_model=List[BalanceResponse])
+async def get_balances(request: BalancesRequest):
+    """
+    Get DOT balances for a list of wallet addresses
+    
+    All uncached addresses are fetched in a single chain round trip.
+    Balance is null for addresses that couldn't be read.
+    """
+    balances = await polkadot_service.get_balances_async(request.addresses)
+    
+    return [
+        BalanceResponse(address=address, **balances[address])
+        for address in dict.fromkeys(request.addresses)
+    ]
@@ -1,11 +1,24 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Request, status, UploadFile, File
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
-from typing import List
+from datetime import datetime
+from typing import List, Optional, Literal
+import io
 
 from app.database import get_db
 from app.models import User, LiquidityProvider, Order, OrderStatus
-from app.schemas import LiquidityProviderCreate, LiquidityProviderResponse, OrderResponse
+from app.schemas import (
+    LiquidityProviderCreate, LiquidityProviderResponse, OrderResponse, LPImportReport,
+    LPEarningsResponse, LPEarningsBucket
+)
 from app.services.pix_service import pix_service
+from app.services.order_service import order_service
+from app.services.lp_import_service import lp_import_service
+from app.services.lp_earnings_service import lp_earnings_service
+from app.services.order_export import order_exporter, MEDIA_TYPES
+from app.serialization import order_list_response
+from app.api.admin import require_admin
+from app.etags import resource_versions, etag, not_modified, with_etag
 
 router = APIRouter(prefix="/lp", tags=["liquidity_providers"])
 
@@ -58,6 +71,32 @@ async def register_as_lp(
     return lp
 
 
+@router.post("/import", response_model=LPImportReport, dependencies=[Depends(require_admin)])
+def import_lps(
+    file: UploadFile = File(...),
+    file_format: Optional[str] = None,
+    db: Session = Depends(get_db)
+):
+    """
+    Bulk onboard Liquidity Providers from a CSV or NDJSON file
+    
+    Columns: wallet_address, pix_key, pix_key_type and optionally
+    min_order_size_usd / max_order_size_usd. Valid rows are inserted,
+    invalid rows are returned in the error report. Needs the admin token.
+    """
+    if not file_format:
+        file_format = "ndjson" if (file.filename or "").endswith((".ndjson", ".jsonl")) else "csv"
+    
+    if file_format not in ("csv", "ndjson"):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Unsupported format, use csv or ndjson"
+        )
+    
+    stream = io.TextIOWrapper(file.file, encoding="utf-8", newline="")
+    return lp_import_service.import_stream(db, stream, file_format)
+
+
 @router.get("/profile", response_model=LiquidityProviderResponse)
 async def get_lp_profile(
     db: Session = Depends(get_db),
@@ -75,10 +114,11 @@ async def get_lp_profile(
 
 @router.get("/available-orders", response_model=List[OrderResponse])
 async def get_available_orders(
+    request: Request,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
-    """Get orders available for LP to accept"""
+    """Get orders available for LP to accept (ETag, like GET /orders/)"""
     
     if not current_user.lp_profile:
         raise HTTPException(
@@ -88,14 +128,42 @@ async def get_available_orders(
     
     lp = current_user.lp_profile
     
+    # The LP's limits pick the representation: changing them changes the tag
+    tag = etag(resource_versions.book(), "lp", lp.min_order_size_usd, lp.max_order_size_usd)
+    cached = not_modified(request, tag)
+    if cached:
+        return cached
+    
     # Get pending orders within LP limits
     orders = db.query(Order).filter(
         Order.status == OrderStatus.PENDING,
         Order.usd_amount >= lp.min_order_size_usd,
         Order.usd_amount <= lp.max_order_size_usd
-    ).order_by(Order.created_at.desc()).all()
+    ).order_by(Order.created_at.desc())
     
-    return orders
+    return with_etag(order_list_response(orders), tag)
+
+
+@router.get("/my-orders/export")
+async def export_lp_orders(
+    format: Literal["ndjson", "csv"] = "ndjson",
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+    current_user: User = Depends(get_current_user)
+):
+    """Stream every order processed by this LP (created in [start, end)) as NDJSON or CSV"""
+    
+    if not current_user.lp_profile:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="User is not registered as LP"
+        )
+    
+    return StreamingResponse(
+        order_exporter.stream(format, lp_id=current_user.lp_profile.id, start=start, end=end),
+        media_type=MEDIA_TYPES[format],
+        headers={"Content-Disposition": f'attachment; filename="lp-orders.{format}"'}
+    )
 
 
 @router.get("/my-orders", response_model=List[OrderResponse])
@@ -111,11 +179,7 @@ async def get_lp_orders(
             detail="User is not registered as LP"
         )
     
-    orders = db.query(Order).filter(
-        Order.lp_id == current_user.lp_profile.id
-    ).order_by(Order.created_at.desc()).all()
-    
-    return orders
+    return order_list_response(order_service.lp_orders_query(db, current_user.lp_profile.id))
 
 
 @router.put("/availability")
@@ -138,12 +202,19 @@ async def update_availability(
     return {"message": "Availability updated", "is_available": is_available}
 
 
-@router.get("/earnings")
+@router.get("/earnings", response_model=LPEarningsResponse)
 async def get_earnings(
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
-    """Get LP earnings"""
+    """
+    Get LP earnings, lifetime or for [start, end)
+    
+    Served from the hourly/daily rollups, so orders completed in the last
+    LP_ROLLUP_INTERVAL_SECONDS may not be included yet.
+    """
     
     if not current_user.lp_profile:
         raise HTTPException(
@@ -152,11 +223,33 @@ async def get_earnings(
         )
     
     lp = current_user.lp_profile
+    earnings = lp_earnings_service.get_earnings(db, lp.id, start=start, end=end)
+    
+    return LPEarningsResponse(
+        total_orders=earnings["orders"],
+        total_volume_usd=earnings["volume_usd"],
+        total_earnings_usd=earnings["earnings_usd"],
+        rating=lp.rating,
+        start=start,
+        end=end
+    )
+
+
+@router.get("/earnings/series", response_model=List[LPEarningsBucket])
+async def get_earnings_series(
+    interval: Literal["hour", "day"] = "day",
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """Get LP volume and earnings per hour or day (buckets without orders are omitted)"""
+    
+    if not current_user.lp_profile:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="User is not registered as LP"
+        )
     
-    return {
-        "total_orders": lp.total_orders_processed,
-        "total_volume_usd": lp.total_volume_usd,
-        "total_earnings_usd": lp.total_earnings_usd,
-        "rating": lp.rating
-    }
+    return lp_earnings_service.get_series(db, current_user.lp_profile.id, interval, start=start, end=end)
 
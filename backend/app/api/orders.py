@@ -1,11 +1,22 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, Header, HTTPException, Request, Response, WebSocket, WebSocketDisconnect, status
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
-from typing import List
+from datetime import datetime
+from typing import List, Optional, Literal
+import asyncio
+import json
 
+from app.cache import cache
+from app.config import settings
 from app.database import get_db
 from app.models import User, OrderType
-from app.schemas import OrderCreate, OrderResponse, OrderAccept, OrderConfirmPayment
+from app.schemas import OrderCreate, OrderResponse, OrderAccept, OrderConfirmPayment, ChainStateRequest, EscrowStateResponse
 from app.services.order_service import order_service
+from app.serialization import order_list_response
+from app.etags import resource_versions, etag, not_modified, with_etag
+from app.rate_limit import rate_limit
+from app.services.order_feed import order_feed, Subscription
+from app.services.order_export import order_exporter, MEDIA_TYPES
 
 router = APIRouter(prefix="/orders", tags=["orders"])
 
@@ -23,19 +34,43 @@ async def get_current_user(db: Session = Depends(get_db)) -> User:
     return user
 
 
-@router.post("/", response_model=OrderResponse)
+@router.post("/", response_model=OrderResponse, dependencies=[Depends(rate_limit("order_create"))])
 async def create_order(
     order_data: OrderCreate,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    current_user: User = Depends(get_current_user),
+    idempotency_key: Optional[str] = Header(None, max_length=128)
 ):
     """
     Create a new order
     
     - BUY: User wants to buy DOT (will pay PIX to LP)
     - SELL: User wants to sell DOT (will receive PIX from LP)
+    
+    Retries carrying the same Idempotency-Key header get the order created
+    by the first request, whichever worker handled it.
     """
-    order = await order_service.create_order(db, current_user, order_data)
+    key = f"idempotency:orders:{current_user.id}:{idempotency_key}" if idempotency_key else None
+    if key and not cache.add(key, {"order_id": None}, ttl=settings.idempotency_ttl_seconds):
+        stored = cache.get(key)
+        order = order_service.get_order(db, stored["order_id"]) if stored and stored["order_id"] else None
+        if order:
+            return order
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="A request with this Idempotency-Key is still being processed"
+        )
+    
+    order = None
+    try:
+        order = await order_service.create_order(db, current_user, order_data)
+    finally:
+        if key:
+            if order:
+                cache.set(key, {"order_id": order.id}, ttl=settings.idempotency_ttl_seconds)
+            else:
+                # Let the client retry a failed request with the same key
+                cache.delete(key)
     
     if not order:
         raise HTTPException(
@@ -48,12 +83,21 @@ async def create_order(
 
 @router.get("/", response_model=List[OrderResponse])
 async def get_orders(
+    request: Request,
     order_type: OrderType = None,
     db: Session = Depends(get_db)
 ):
-    """Get all active orders"""
-    orders = order_service.get_active_orders(db, order_type)
-    return orders
+    """
+    Get all active orders
+    
+    Tagged with an ETag: polling with If-None-Match gets a 304 until the
+    order book changes.
+    """
+    tag = etag(resource_versions.book(), "orders", order_type)
+    cached = not_modified(request, tag)
+    if cached:
+        return cached
+    return with_etag(order_list_response(order_service.active_orders_query(db, order_type)), tag)
 
 
 @router.get("/my-orders", response_model=List[OrderResponse])
@@ -62,16 +106,97 @@ async def get_my_orders(
     current_user: User = Depends(get_current_user)
 ):
     """Get current user's orders"""
-    orders = order_service.get_user_orders(db, current_user.id)
-    return orders
+    return order_list_response(order_service.user_orders_query(db, current_user.id))
+
+
+@router.get("/my-orders/export")
+async def export_my_orders(
+    format: Literal["ndjson", "csv"] = "ndjson",
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+    current_user: User = Depends(get_current_user)
+):
+    """Stream the current user's full order history (created in [start, end)) as NDJSON or CSV"""
+    return StreamingResponse(
+        order_exporter.stream(format, user_id=current_user.id, start=start, end=end),
+        media_type=MEDIA_TYPES[format],
+        headers={"Content-Disposition": f'attachment; filename="orders.{format}"'}
+    )
+
+
+@router.post("/chain-state", response_model=List[EscrowStateResponse])
+async def get_chain_state(
+    request: ChainStateRequest,
+    db: Session = Depends(get_db)
+):
+    """
+    Get on-chain escrow state for a batch of orders
+    
+    Served from the escrow state cache; only uncached orders hit the contract.
+    Unknown order IDs are omitted.
+    """
+    return await order_service.get_escrow_states(db, request.order_ids)
+
+
+@router.websocket("/feed")
+async def order_book_feed(
+    websocket: WebSocket,
+    order_type: Optional[OrderType] = None,
+    min_usd: Optional[float] = None,
+    max_usd: Optional[float] = None
+):
+    """
+    Live order book, replaces polling GET /orders/
+    
+    Sends {"type": "snapshot", "orders": [...]} with the pending orders
+    matching the filters, then {"type": <event>, "order": {...}} for each
+    created, accepted, payment_sent, completed or expired order. A client
+    that falls too far behind gets a new snapshot instead of the backlog.
+    """
+    await websocket.accept()
+    subscription, snapshot = order_feed.subscribe(
+        order_type.value if order_type else None, min_usd, max_usd
+    )
+    # Clients only listen; reading is how a disconnect is noticed between events
+    reader = asyncio.create_task(_wait_disconnect(websocket, subscription))
+    try:
+        await websocket.send_text(json.dumps({"type": "snapshot", "orders": snapshot}))
+        while True:
+            message = await subscription.queue.get()
+            if subscription.closed:
+                break
+            if subscription.overflowed:
+                snapshot = order_feed.resync(subscription)
+                message = json.dumps({"type": "snapshot", "orders": snapshot})
+            await websocket.send_text(message)
+    except WebSocketDisconnect:
+        pass
+    finally:
+        reader.cancel()
+        order_feed.unsubscribe(subscription)
+
+
+async def _wait_disconnect(websocket: WebSocket, subscription: Subscription):
+    try:
+        while (await websocket.receive())["type"] != "websocket.disconnect":
+            pass
+    finally:
+        subscription.close()
 
 
 @router.get("/{order_id}", response_model=OrderResponse)
 async def get_order(
     order_id: int,
+    request: Request,
+    response: Response,
     db: Session = Depends(get_db)
 ):
-    """Get order by ID"""
+    """Get order by ID (ETag, answers If-None-Match with 304 while unchanged)"""
+    tag = etag(resource_versions.order(order_id), "order")
+    cached = not_modified(request, tag)
+    if cached:
+        return cached
+    
     order = order_service.get_order(db, order_id)
     
     if not order:
@@ -80,10 +205,11 @@ async def get_order(
             detail="Order not found"
         )
     
+    with_etag(response, tag)
     return order
 
 
-@router.post("/{order_id}/accept", response_model=OrderResponse)
+@router.post("/{order_id}/accept", response_model=OrderResponse, dependencies=[Depends(rate_limit("order_accept"))])
 async def accept_order(
     order_id: int,
     db: Session = Depends(get_db),
@@ -92,7 +218,9 @@ async def accept_order(
     """
     LP accepts an order
     
-    User must be registered as LP
+    User must be registered as LP. The chain call (sell) or PIX QR code
+    (buy) follows in the background: poll task_status until "succeeded".
+    If it ends "failed" the order is back to pending.
     """
     # Check if user is LP
     if not current_user.lp_profile:
@@ -101,7 +229,7 @@ async def accept_order(
             detail="User is not registered as Liquidity Provider"
         )
     
-    order = await order_service.accept_order(db, order_id, current_user.lp_profile)
+    order = order_service.accept_order(db, order_id, current_user.lp_profile)
     
     if not order:
         raise HTTPException(
@@ -119,7 +247,13 @@ async def confirm_payment(
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
-    """Confirm PIX payment was sent"""
+    """
+    Confirm PIX payment was sent
+    
+    For an order escrowed on chain the payment is recorded on the contract
+    in the background: the order turns payment_sent once that is included
+    (poll task_status). If it ends "failed", confirm again.
+    """
     order = order_service.confirm_payment(
         db,
         order_id,
@@ -145,9 +279,11 @@ async def complete_order(
     """
     Complete order and release funds
     
-    Called by LP after verifying PIX payment
+    Called by LP after verifying PIX payment. Returns right away with
+    task_status "queued"; the order turns completed once the worker has
+    verified the payment and released the escrow.
     """
-    order = await order_service.complete_order(db, order_id)
+    order = order_service.complete_order(db, order_id)
     
     if not order:
         raise HTTPException(
@@ -159,8 +295,13 @@ async def complete_order(
 
 
 @router.get("/rates/exchange")
-async def get_exchange_rates():
-    """Get current DOT exchange rates"""
+async def get_exchange_rates(request: Request, response: Response):
+    """Get current DOT exchange rates (ETag over the rates themselves)"""
     rates = await order_service.get_exchange_rates()
+    tag = etag(rates["dot_to_usd"], "rates", rates["dot_to_brl"])
+    cached = not_modified(request, tag)
+    if cached:
+        return cached
+    with_etag(response, tag)
     return rates
 
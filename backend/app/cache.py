@@ -0,0 +1,183 @@
+from typing import Optional, Dict, Any, Callable, List, Tuple
+import json
+import logging
+import threading
+import time
+
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+Handler = Callable[[Any], None]
+
+
+class MemoryCache:
+    """
+    Process-local cache and pub/sub
+
+    Same interface as RedisCache, for a single worker, development and
+    tests. Handlers run synchronously in the publishing thread.
+    """
+
+    def __init__(self):
+        self._values: Dict[str, Tuple[Any, Optional[float]]] = {}
+        self._handlers: Dict[str, List[Handler]] = {}
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Any:
+        with self._lock:
+            entry = self._values.get(key)
+            if entry is None:
+                return None
+            value, expires = entry
+            if expires is not None and expires <= time.monotonic():
+                del self._values[key]
+                return None
+            return json.loads(value)
+
+    def set(self, key: str, value: Any, ttl: Optional[float] = None) -> bool:
+        with self._lock:
+            self._values[key] = (json.dumps(value), self._expiry(ttl))
+        return True
+
+    def add(self, key: str, value: Any, ttl: Optional[float] = None) -> bool:
+        """Set key only if it doesn't exist; True if it was set"""
+        with self._lock:
+            entry = self._values.get(key)
+            if entry is not None and (entry[1] is None or entry[1] > time.monotonic()):
+                return False
+            self._values[key] = (json.dumps(value), self._expiry(ttl))
+            return True
+
+    def delete(self, key: str):
+        with self._lock:
+            self._values.pop(key, None)
+
+    def publish(self, channel: str, message: Any) -> bool:
+        for handler in list(self._handlers.get(channel, ())):
+            try:
+                handler(json.loads(json.dumps(message)))
+            except Exception as e:
+                logger.error(f"Error handling message on {channel}: {e}")
+        return True
+
+    def subscribe(self, channel: str, handler: Handler):
+        with self._lock:
+            self._handlers.setdefault(channel, []).append(handler)
+
+    def close(self):
+        pass
+
+    @staticmethod
+    def _expiry(ttl: Optional[float]) -> Optional[float]:
+        return time.monotonic() + ttl if ttl is not None else None
+
+
+class RedisCache:
+    """
+    Cache and pub/sub shared by all workers through Redis
+
+    Values are stored as JSON under a common key prefix. Subscriptions share
+    one pub/sub connection read by a background thread. Redis errors are
+    logged and degrade to a cache miss / no-op, so an outage doesn't take
+    requests down with it.
+    """
+
+    def __init__(self, url: Optional[str] = None, prefix: str = "polkapay:", client: Any = None):
+        if client is None:
+            # Imported lazily, like the other optional clients
+            import redis
+            client = redis.Redis.from_url(url, decode_responses=True, socket_timeout=2, socket_connect_timeout=2)
+        self.client = client
+        self.prefix = prefix
+        self._handlers: Dict[str, List[Handler]] = {}
+        self._lock = threading.Lock()
+        self._pubsub: Any = None
+        self._thread: Any = None
+
+    def get(self, key: str) -> Any:
+        try:
+            value = self.client.get(self.prefix + key)
+            return json.loads(value) if value is not None else None
+        except Exception as e:
+            logger.error(f"Error reading {key} from Redis: {e}")
+            return None
+
+    def set(self, key: str, value: Any, ttl: Optional[float] = None) -> bool:
+        try:
+            self.client.set(self.prefix + key, json.dumps(value), px=self._ttl_ms(ttl))
+            return True
+        except Exception as e:
+            logger.error(f"Error writing {key} to Redis: {e}")
+            return False
+
+    def add(self, key: str, value: Any, ttl: Optional[float] = None) -> bool:
+        """Set key only if it doesn't exist; True if it was set"""
+        try:
+            return bool(self.client.set(self.prefix + key, json.dumps(value), px=self._ttl_ms(ttl), nx=True))
+        except Exception as e:
+            logger.error(f"Error writing {key} to Redis: {e}")
+            # Fail open: callers treat the key as theirs
+            return True
+
+    def delete(self, key: str):
+        try:
+            self.client.delete(self.prefix + key)
+        except Exception as e:
+            logger.error(f"Error deleting {key} from Redis: {e}")
+
+    def publish(self, channel: str, message: Any) -> bool:
+        try:
+            self.client.publish(self.prefix + channel, json.dumps(message))
+            return True
+        except Exception as e:
+            logger.error(f"Error publishing to {channel}: {e}")
+            return False
+
+    def subscribe(self, channel: str, handler: Handler):
+        with self._lock:
+            handlers = self._handlers.setdefault(channel, [])
+            handlers.append(handler)
+            if len(handlers) > 1:
+                return
+            if self._pubsub is None:
+                self._pubsub = self.client.pubsub(ignore_subscribe_messages=True)
+            self._pubsub.subscribe(**{self.prefix + channel: self._on_message})
+            if self._thread is None:
+                self._thread = self._pubsub.run_in_thread(
+                    sleep_time=1.0, daemon=True, exception_handler=self._on_error
+                )
+
+    def close(self):
+        if self._thread is not None:
+            self._thread.stop()
+            self._thread = None
+
+    def _on_message(self, message: Dict[str, Any]):
+        channel = message["channel"][len(self.prefix):]
+        data = json.loads(message["data"])
+        for handler in list(self._handlers.get(channel, ())):
+            try:
+                handler(data)
+            except Exception as e:
+                logger.error(f"Error handling message on {channel}: {e}")
+
+    @staticmethod
+    def _on_error(error: Exception, pubsub: Any, thread: Any):
+        # The pub/sub connection resubscribes on its own once Redis is back
+        logger.error(f"Redis pub/sub error: {error}")
+        time.sleep(1.0)
+
+    @staticmethod
+    def _ttl_ms(ttl: Optional[float]) -> Optional[int]:
+        return max(int(ttl * 1000), 1) if ttl is not None else None
+
+
+def create_cache() -> Any:
+    if settings.cache_backend == "redis":
+        return RedisCache(settings.redis_url)
+    return MemoryCache()
+
+
+# Global instance
+cache = create_cache()
@@ -1,7 +1,10 @@
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
+import time
+
 from app.config import settings
+from app.metrics import metrics
 
 # Create engine
 engine = create_engine(
@@ -17,11 +20,32 @@ SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 Base = declarative_base()
 
 
+@event.listens_for(engine, "before_cursor_execute")
+def _start_query_timer(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("query_started", []).append(time.perf_counter())
+
+
+@event.listens_for(engine, "after_cursor_execute")
+def _observe_query(conn, cursor, statement, parameters, context, executemany):
+    started = conn.info["query_started"].pop()
+    # Label by statement kind only, full SQL would explode the series count
+    operation = statement.lstrip().split(None, 1)[0].upper() if statement.strip() else "OTHER"
+    metrics.observe("db_query_duration_seconds", time.perf_counter() - started, operation=operation)
+
+
+@event.listens_for(engine, "handle_error")
+def _discard_query_timer(context):
+    started = context.connection.info.get("query_started") if context.connection is not None else None
+    if started:
+        started.pop()
+
+
 def get_db():
     """Database dependency"""
     db = SessionLocal()
+    started = time.perf_counter()
     try:
         yield db
     finally:
         db.close()
-
+        metrics.observe("db_session_duration_seconds", time.perf_counter() - started)
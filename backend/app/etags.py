@@ -0,0 +1,131 @@
+from fastapi import Request, Response
+from sqlalchemy import event, inspect
+from sqlalchemy.orm import Session
+from typing import Optional, Any
+import hashlib
+import secrets
+
+from app.cache import cache
+from app.config import settings
+from app.database import SessionLocal
+from app.models import Order, OrderStatus
+
+BOOK_KEY = "version:orders:book"
+
+
+def _order_key(order_id: int) -> str:
+    return f"version:orders:{order_id}"
+
+
+class ResourceVersions:
+    """
+    Version tokens of the order resources, for ETags
+
+    A token stays in the shared cache until its resource changes: commits
+    that touch an order drop its token, and the order book's if the order is
+    or was pending; the next read mints a fresh one. Checking a client's tag
+    costs one cache lookup, no query and no serialization.
+
+    Tokens are read before the data they tag and dropped after the commit,
+    so a race can only tag new data with an old token (one extra full
+    response), never revalidate an outdated body. Writers in every process
+    must reach the same cache, so tokens need the Redis backend: with the
+    per-process memory backend another API worker would keep serving a
+    token its own commits never dropped.
+    """
+
+    def __init__(self, enabled: bool = True, ttl: float = 86400.0):
+        self.enabled = enabled
+        self.ttl = ttl
+
+    def book(self) -> Optional[str]:
+        """Token of the pending order book (GET /orders/, /lp/available-orders)"""
+        return self._token(BOOK_KEY)
+
+    def order(self, order_id: int) -> Optional[str]:
+        return self._token(_order_key(order_id))
+
+    def touch(self, db: Session, order_id: int):
+        """Invalidate an order on commit, for bulk updates that bypass the unit of work"""
+        db.info.setdefault("etag_orders", set()).add(order_id)
+        db.info["etag_book"] = True
+
+    def _token(self, key: str) -> Optional[str]:
+        if not self.enabled:
+            return None
+        token = cache.get(key)
+        if token is None:
+            token = secrets.token_hex(8)
+            if not cache.add(key, token, ttl=self.ttl):
+                token = cache.get(key) or token
+        return token
+
+    def collect(self, session: Session):
+        """Remember the orders a flush wrote, until the transaction ends"""
+        for obj in (*session.new, *session.dirty, *session.deleted):
+            if not isinstance(obj, Order):
+                continue
+            session.info.setdefault("etag_orders", set()).add(obj.id)
+            if obj.status == OrderStatus.PENDING or inspect(obj).attrs.status.history.has_changes():
+                session.info["etag_book"] = True
+
+    def invalidate(self, session: Session):
+        order_ids = session.info.pop("etag_orders", None)
+        book = session.info.pop("etag_book", False)
+        if not self.enabled or not order_ids:
+            return
+        for order_id in order_ids:
+            cache.delete(_order_key(order_id))
+        if book:
+            cache.delete(BOOK_KEY)
+
+
+def etag(version: Optional[str], *variant: Any) -> Optional[str]:
+    """Strong ETag for one representation of a versioned resource, None without a version"""
+    if version is None:
+        return None
+    digest = hashlib.blake2b("|".join(map(str, (version, *variant))).encode(), digest_size=8)
+    return f'"{digest.hexdigest()}"'
+
+
+def not_modified(request: Request, tag: Optional[str]) -> Optional[Response]:
+    """304 response if the request's If-None-Match matches tag"""
+    header = request.headers.get("if-none-match")
+    if tag is None or header is None:
+        return None
+    candidates = [candidate.strip().removeprefix("W/") for candidate in header.split(",")]
+    if tag in candidates or "*" in candidates:
+        return with_etag(Response(status_code=304), tag)
+    return None
+
+
+def with_etag(response: Response, tag: Optional[str]) -> Response:
+    """Tag a response; clients and proxies must revalidate before reusing it"""
+    if tag is not None:
+        response.headers["ETag"] = tag
+        response.headers["Cache-Control"] = "no-cache"
+    return response
+
+
+# Global instance
+resource_versions = ResourceVersions(
+    # A memory cache only sees this process's commits, not other API or task workers'
+    enabled=settings.cache_backend == "redis",
+    ttl=settings.etag_version_ttl_seconds
+)
+
+
+@event.listens_for(SessionLocal, "after_flush")
+def _collect_orders(session: Session, flush_context: Any):
+    resource_versions.collect(session)
+
+
+@event.listens_for(SessionLocal, "after_commit")
+def _invalidate_versions(session: Session):
+    resource_versions.invalidate(session)
+
+
+@event.listens_for(SessionLocal, "after_rollback")
+def _discard_versions(session: Session):
+    session.info.pop("etag_orders", None)
+    session.info.pop("etag_book", None)
@@ -1,11 +1,22 @@
-from fastapi import FastAPI
+from fastapi import FastAPI, Response
 from fastapi.middleware.cors import CORSMiddleware
 import logging
+import threading
 
 from app.config import settings
-from app.database import engine, Base
-from app.api import auth, orders, liquidity_providers
+from app.database import engine, SessionLocal
+from app.cache import cache
+from app.metrics import metrics, MetricsMiddleware
+from app.profiling import profile_store, ProfilingMiddleware
+from app.migrations import get_schema_status, upgrade_schema
+from app.api import auth, orders, liquidity_providers, balances, analytics, admin
 from app.services.polkadot_service import polkadot_service
+from app.services.chain_indexer import chain_indexer
+from app.services.lp_earnings_service import lp_earnings_service
+from app.services.order_feed import order_feed
+from app.services.order_outbox import order_outbox
+from app.services.order_analytics import order_analytics
+from app.services.order_archive import order_archive
 
 # Configure logging
 logging.basicConfig(
@@ -30,10 +41,31 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Opt-in request profiling, not installed at all unless enabled
+if settings.profiling_enabled:
+    app.add_middleware(
+        ProfilingMiddleware,
+        store=profile_store,
+        sample_rate=settings.profiling_sample_rate,
+        secret=settings.profiling_secret,
+        interval=settings.profiling_interval_ms / 1000
+    )
+
+# Request metrics, outermost so the latency covers every other middleware
+metrics.enabled = settings.metrics_enabled
+app.add_middleware(MetricsMiddleware, registry=metrics)
+
 # Include routers
 app.include_router(auth.router, prefix=settings.api_prefix)
 app.include_router(orders.router, prefix=settings.api_prefix)
 app.include_router(liquidity_providers.router, prefix=settings.api_prefix)
+app.include_router(balances.router, prefix=settings.api_prefix)
+app.include_router(analytics.router, prefix=settings.api_prefix)
+app.include_router(admin.router, prefix=settings.api_prefix)
+
+
+# Filled in during startup, reported by /health
+readiness = {"schema": None, "polkadot_connecting": False}
 
 
 @app.on_event("startup")
@@ -41,21 +73,82 @@ async def startup_event():
     """Run on application startup"""
     logger.info(f"Starting {settings.app_name} v{settings.app_version}")
     
-    # Create database tables
-    Base.metadata.create_all(bind=engine)
-    logger.info("Database tables created")
-    
-    # Connect to Polkadot
-    if polkadot_service.connect():
-        logger.info("Connected to Polkadot network")
+    # Tables are managed by Alembic migrations (alembic upgrade head)
+    schema = get_schema_status()
+    if not schema["up_to_date"] and settings.database_auto_migrate and "error" not in schema:
+        logger.info(f"Migrating database schema {schema['current']} -> {schema['head']}")
+        try:
+            upgrade_schema()
+        except Exception as e:
+            logger.error(f"Error migrating database schema: {e}")
+        schema = get_schema_status()
+    if schema["up_to_date"]:
+        logger.info(f"Database schema at revision {schema['head']}")
+    elif "error" in schema:
+        logger.error(f"Database schema status unavailable: {schema['error']}")
     else:
-        logger.warning("Failed to connect to Polkadot network")
+        logger.error(
+            f"Database schema at revision {schema['current']}, expected {schema['head']}: "
+            "run `alembic upgrade head`"
+        )
+    readiness["schema"] = schema
+    
+    # Roll LP ledger entries up into hourly/daily earnings
+    if settings.lp_rollup_enabled and schema["up_to_date"]:
+        lp_earnings_service.start()
+    
+    # Move old completed/cancelled orders out of the live table
+    if settings.archive_enabled and schema["up_to_date"]:
+        order_archive.start()
+    
+    # Pending orders for the WebSocket order book feed
+    if schema["up_to_date"]:
+        db = SessionLocal()
+        try:
+            order_feed.start(db)
+        finally:
+            db.close()
+    
+    # Relay order transitions from the outbox to the feed and analytics
+    if settings.outbox_relay_enabled and schema["up_to_date"]:
+        order_outbox.register("order_feed", order_feed.consume)
+        order_outbox.register("order_analytics", order_analytics.consume, bootstrap=order_analytics.bootstrap)
+        order_outbox.start()
+    
+    # Connect in the background so the app serves (and /health answers) right away
+    readiness["polkadot_connecting"] = True
+    threading.Thread(target=_connect_polkadot, name="polkadot-connect", daemon=True).start()
+
+
+def _connect_polkadot():
+    """Connect to Polkadot and start the chain consumers that need the connection"""
+    try:
+        if polkadot_service.connect():
+            logger.info("Connected to Polkadot network")
+        else:
+            logger.warning("Failed to connect to Polkadot network")
+        
+        # Index escrow contract events into transactions
+        if settings.indexer_enabled:
+            if polkadot_service.contract_metadata:
+                chain_indexer.start()
+                logger.info("Contract event indexer started")
+            else:
+                logger.warning("Indexer enabled but no contract metadata loaded")
+    finally:
+        readiness["polkadot_connecting"] = False
 
 
 @app.on_event("shutdown")
 async def shutdown_event():
     """Run on application shutdown"""
     logger.info("Shutting down...")
+    chain_indexer.stop()
+    lp_earnings_service.stop()
+    order_archive.stop()
+    order_outbox.stop()
+    order_feed.stop()
+    cache.close()
     polkadot_service.disconnect()
 
 
@@ -72,13 +165,55 @@ async def root():
 
 @app.get("/health")
 async def health_check():
-    """Health check endpoint"""
+    """Health check endpoint, ready once the schema is current and Polkadot is connected"""
+    schema = readiness["schema"]
+    schema_ready = bool(schema and schema["up_to_date"])
     return {
         "status": "healthy",
-        "polkadot_connected": polkadot_service.substrate is not None
+        "ready": schema_ready and polkadot_service.is_connected,
+        "schema_revision": schema["current"] if schema else None,
+        "schema_up_to_date": schema_ready,
+        "polkadot_connecting": readiness["polkadot_connecting"],
+        "polkadot_connected": polkadot_service.is_connected,
+        "polkadot_pool": polkadot_service.pool_metrics()
     }
 
 
+@app.get("/metrics", include_in_schema=False)
+async def metrics_endpoint():
+    """Prometheus metrics"""
+    return Response(content=metrics.render(), media_type="text/plain; version=0.0.4")
+
+
+def _polkadot_pool_samples(key: str):
+    return lambda: [({}, polkadot_service.pool_metrics()[key])]
+
+
+def _db_pool_samples():
+    pool = engine.pool
+    # Only QueuePool exposes these; SQLite's pools don't
+    if not hasattr(pool, "checkedout"):
+        return []
+    return [
+        ({"state": "checked_out"}, pool.checkedout()),
+        ({"state": "checked_in"}, pool.checkedin()),
+        ({"state": "overflow"}, max(pool.overflow(), 0)),
+    ]
+
+
+def _extrinsic_queue_samples():
+    queue = polkadot_service.extrinsic_queue
+    return [({}, queue.pending_count)] if queue else []
+
+
+metrics.gauge("db_pool_connections", "Database pool connections by state", _db_pool_samples)
+metrics.gauge("polkadot_pool_connections", "Polkadot connection pool size", _polkadot_pool_samples("size"))
+metrics.gauge("polkadot_pool_healthy_connections", "Healthy Polkadot connections", _polkadot_pool_samples("healthy"))
+metrics.gauge("polkadot_pool_in_use_connections", "Polkadot connections checked out", _polkadot_pool_samples("in_use"))
+metrics.gauge("polkadot_pending_extrinsics", "Submitted extrinsics not yet included", _extrinsic_queue_samples)
+metrics.gauge("order_feed_subscribers", "Open order book feed connections", lambda: [({}, order_feed.subscriber_count)])
+
+
 if __name__ == "__main__":
     import uvicorn
     uvicorn.run(
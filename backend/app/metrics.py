@@ -0,0 +1,216 @@
+from bisect import bisect_left
+from typing import Dict, Any, Callable, List, Tuple
+import asyncio
+import functools
+import threading
+import time
+
+# Latency buckets in seconds, from fast cache hits to slow chain calls
+DEFAULT_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+LabelKey = Tuple[Tuple[str, str], ...]
+
+
+class _Shard:
+    """One thread's counters and histograms, only ever written by that thread"""
+
+    def __init__(self):
+        self.counters: Dict[Tuple[str, LabelKey], float] = {}
+        # (name, labels) -> [bucket counts..., +Inf count, sum]
+        self.histograms: Dict[Tuple[str, LabelKey], List[float]] = {}
+
+
+class MetricsRegistry:
+    """
+    Counters, latency histograms and gauges in Prometheus text format
+
+    Writes go to a per-thread shard without locks; a scrape sums all
+    shards. Gauges are callbacks evaluated at scrape time, so they cost
+    nothing between scrapes.
+    """
+
+    def __init__(self, prefix: str = "polkapay", buckets: Tuple[float, ...] = DEFAULT_BUCKETS):
+        self.prefix = prefix
+        self.buckets = buckets
+        self.enabled = True
+        self._help: Dict[str, Tuple[str, str]] = {}
+        self._gauges: List[Tuple[str, Callable[[], List[Tuple[Dict[str, str], float]]]]] = []
+        self._shards: List[_Shard] = []
+        self._shards_lock = threading.Lock()
+        self._local = threading.local()
+
+    def describe(self, name: str, kind: str, help_text: str):
+        self._help[f"{self.prefix}_{name}"] = (kind, help_text)
+
+    def _shard(self) -> _Shard:
+        shard = getattr(self._local, "shard", None)
+        if shard is None:
+            shard = self._local.shard = _Shard()
+            with self._shards_lock:
+                self._shards.append(shard)
+        return shard
+
+    def inc(self, name: str, value: float = 1.0, **labels: str):
+        if not self.enabled:
+            return
+        counters = self._shard().counters
+        key = (name, tuple(sorted(labels.items())))
+        counters[key] = counters.get(key, 0.0) + value
+
+    def observe(self, name: str, seconds: float, **labels: str):
+        if not self.enabled:
+            return
+        histograms = self._shard().histograms
+        key = (name, tuple(sorted(labels.items())))
+        histogram = histograms.get(key)
+        if histogram is None:
+            histogram = histograms[key] = [0.0] * (len(self.buckets) + 2)
+        histogram[bisect_left(self.buckets, seconds)] += 1
+        histogram[-1] += seconds
+
+    def gauge(self, name: str, help_text: str, collect: Callable[[], List[Tuple[Dict[str, str], float]]]):
+        """Register a gauge whose samples are read from collect() on every scrape"""
+        self.describe(name, "gauge", help_text)
+        self._gauges.append((name, collect))
+
+    def timed(self, name: str, **labels: str) -> Callable:
+        """Decorator observing the duration of a sync or async function"""
+        def decorator(func: Callable) -> Callable:
+            if asyncio.iscoroutinefunction(func):
+                @functools.wraps(func)
+                async def async_wrapper(*args: Any, **kwargs: Any) -> Any:
+                    started = time.perf_counter()
+                    try:
+                        return await func(*args, **kwargs)
+                    finally:
+                        self.observe(name, time.perf_counter() - started, **labels)
+                return async_wrapper
+
+            @functools.wraps(func)
+            def wrapper(*args: Any, **kwargs: Any) -> Any:
+                started = time.perf_counter()
+                try:
+                    return func(*args, **kwargs)
+                finally:
+                    self.observe(name, time.perf_counter() - started, **labels)
+            return wrapper
+        return decorator
+
+    def render(self) -> str:
+        """Prometheus text exposition (format 0.0.4)"""
+        with self._shards_lock:
+            shards = list(self._shards)
+
+        counters: Dict[Tuple[str, LabelKey], float] = {}
+        histograms: Dict[Tuple[str, LabelKey], List[float]] = {}
+        for shard in shards:
+            # Copies are atomic under the GIL, the owning thread keeps writing
+            for key, value in list(shard.counters.items()):
+                counters[key] = counters.get(key, 0.0) + value
+            for key, values in list(shard.histograms.items()):
+                values = list(values)
+                total = histograms.get(key)
+                histograms[key] = values if total is None else [a + b for a, b in zip(total, values)]
+
+        lines: List[str] = []
+        described = set()
+
+        def header(name: str, kind: str):
+            if name not in described:
+                described.add(name)
+                help_text = self._help.get(name, (kind, ""))[1]
+                if help_text:
+                    lines.append(f"# HELP {name} {help_text}")
+                lines.append(f"# TYPE {name} {kind}")
+
+        for (name, labels), value in sorted(counters.items()):
+            full_name = f"{self.prefix}_{name}"
+            header(full_name, "counter")
+            lines.append(f"{full_name}{_format_labels(labels)} {_format_value(value)}")
+
+        for (name, labels), values in sorted(histograms.items()):
+            full_name = f"{self.prefix}_{name}"
+            header(full_name, "histogram")
+            cumulative = 0.0
+            for bound, count in zip(self.buckets + (float("inf"),), values):
+                cumulative += count
+                le = "+Inf" if bound == float("inf") else repr(bound)
+                lines.append(f"{full_name}_bucket{_format_labels(labels + (('le', le),))} {_format_value(cumulative)}")
+            lines.append(f"{full_name}_sum{_format_labels(labels)} {values[-1]!r}")
+            lines.append(f"{full_name}_count{_format_labels(labels)} {_format_value(cumulative)}")
+
+        for name, collect in self._gauges:
+            full_name = f"{self.prefix}_{name}"
+            try:
+                samples = collect()
+            except Exception:
+                continue
+            header(full_name, "gauge")
+            for labels, value in samples:
+                lines.append(f"{full_name}{_format_labels(tuple(sorted(labels.items())))} {_format_value(value)}")
+
+        return "\n".join(lines) + "\n"
+
+
+def _format_labels(labels: LabelKey) -> str:
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{key}="{_escape(value)}"' for key, value in labels) + "}"
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_value(value: float) -> str:
+    return str(int(value)) if float(value).is_integer() else repr(float(value))
+
+
+class MetricsMiddleware:
+    """
+    Per-route request counters and latency histograms
+
+    A plain ASGI middleware (no BaseHTTPMiddleware task overhead). Requests
+    are labelled by the matched route template, not the raw path, so IDs
+    in URLs don't create new series.
+    """
+
+    def __init__(self, app: Any, registry: MetricsRegistry):
+        self.app = app
+        self.registry = registry
+
+    async def __call__(self, scope: Dict[str, Any], receive: Callable, send: Callable):
+        if scope["type"] != "http" or not self.registry.enabled:
+            await self.app(scope, receive, send)
+            return
+
+        started = time.perf_counter()
+        status_code = 500
+
+        async def send_wrapper(message: Dict[str, Any]):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            route = scope.get("route")
+            path = getattr(route, "path", None) or "unmatched"
+            elapsed = time.perf_counter() - started
+            self.registry.observe("http_request_duration_seconds", elapsed, method=scope["method"], route=path)
+            self.registry.inc(
+                "http_requests_total", method=scope["method"], route=path, status=str(status_code)
+            )
+
+
+# Global instance
+metrics = MetricsRegistry()
+metrics.describe("http_requests_total", "counter", "HTTP requests by route and status")
+metrics.describe("http_request_duration_seconds", "histogram", "HTTP request latency by route")
+metrics.describe("dependency_duration_seconds", "histogram", "Latency of calls to external dependencies")
+metrics.describe("polkadot_call_timeouts_total", "counter", "Polkadot calls that exceeded their timeout")
+metrics.describe("rate_limited_total", "counter", "Requests rejected by the rate limiter, by budget")
+metrics.describe("db_query_duration_seconds", "histogram", "Database statement latency")
+metrics.describe("db_session_duration_seconds", "histogram", "Lifetime of request database sessions")
@@ -0,0 +1,43 @@
+from typing import Optional, Dict, Any
+import logging
+import os
+
+from app.database import engine
+
+logger = logging.getLogger(__name__)
+
+ALEMBIC_INI = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "alembic.ini")
+
+
+def _alembic_config():
+    from alembic.config import Config
+
+    config = Config(ALEMBIC_INI)
+    # Keep the app's logging setup when running from inside the app
+    config.attributes["configure_logger"] = False
+    return config
+
+
+def get_schema_status() -> Dict[str, Any]:
+    """Compare the database's Alembic revision with the latest migration"""
+    from alembic.runtime.migration import MigrationContext
+    from alembic.script import ScriptDirectory
+
+    head: Optional[str] = None
+    current: Optional[str] = None
+    try:
+        head = ScriptDirectory.from_config(_alembic_config()).get_current_head()
+        with engine.connect() as connection:
+            current = MigrationContext.configure(connection).get_current_revision()
+    except Exception as e:
+        logger.error(f"Error reading schema version: {e}")
+        return {"current": None, "head": head, "up_to_date": False, "error": str(e)}
+
+    return {"current": current, "head": head, "up_to_date": current == head}
+
+
+def upgrade_schema(revision: str = "head"):
+    """Apply migrations up to revision (same as `alembic upgrade head`)"""
+    from alembic import command
+
+    command.upgrade(_alembic_config(), revision)
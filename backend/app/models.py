@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Float, Boolean, DateTime, ForeignKey, Enum
+from sqlalchemy import Column, Integer, String, Float, Boolean, DateTime, ForeignKey, Enum, UniqueConstraint, Index, Numeric, JSON
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from datetime import datetime
@@ -88,9 +88,8 @@ class LiquidityProvider(Base):
     orders_processed = relationship("Order", back_populates="liquidity_provider")
 
 
-class Order(Base):
-    """Order model"""
-    __tablename__ = "orders"
+class OrderColumns:
+    """Columns shared by live orders and their archived copies"""
 
     id = Column(Integer, primary_key=True, index=True)
     
@@ -116,9 +115,15 @@ class Order(Base):
     pix_payment_proof = Column(String, nullable=True)
     
     # Blockchain
-    contract_order_id = Column(Integer, nullable=True)
+    contract_order_id = Column(Integer, nullable=True, index=True)
     escrow_tx_hash = Column(String, nullable=True)
+    payment_tx_hash = Column(String, nullable=True)  # confirm_payment_sent
     release_tx_hash = Column(String, nullable=True)
+    chain_status = Column(String, nullable=True)  # submitted, in_block, failed
+    
+    # Background side effects (app.tasks)
+    task_status = Column(String, nullable=True)  # queued, running, succeeded, failed
+    task_error = Column(String, nullable=True)
     
     # Metadata
     notes = Column(String, nullable=True)
@@ -130,22 +135,100 @@ class Order(Base):
     payment_sent_at = Column(DateTime(timezone=True), nullable=True)
     completed_at = Column(DateTime(timezone=True), nullable=True)
     expires_at = Column(DateTime(timezone=True), nullable=True)
-    
+    # Change watermark for incremental readers (analytics)
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now(), index=True)
+
+
+class Order(OrderColumns, Base):
+    """Order model"""
+    __tablename__ = "orders"
+
     # Relationships
-    user = relationship("User", back_populates="orders_created", foreign_keys=[user_id])
+    user = relationship("User", back_populates="orders_created", foreign_keys="Order.user_id")
     liquidity_provider = relationship("LiquidityProvider", back_populates="orders_processed")
 
 
+class ArchivedOrder(OrderColumns, Base):
+    """Completed or cancelled order moved out of the live table (app.services.order_archive)"""
+    __tablename__ = "orders_archive"
+    __table_args__ = (
+        Index("ix_orders_archive_user_id_created_at", "user_id", "created_at"),
+        Index("ix_orders_archive_lp_id_created_at", "lp_id", "created_at"),
+    )
+
+    # Same ID as the live order it was
+    id = Column(Integer, primary_key=True, autoincrement=False)
+    updated_at = Column(DateTime(timezone=True))
+    archived_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+
+
 class Transaction(Base):
     """Transaction history model"""
     __tablename__ = "transactions"
+    __table_args__ = (
+        UniqueConstraint("block_number", "event_index", name="uq_transactions_block_event"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
-    order_id = Column(Integer, ForeignKey("orders.id"))
+    # Live or archived order, hence no foreign key
+    order_id = Column(Integer)
+    contract_order_id = Column(Integer, nullable=True, index=True)
     
     tx_hash = Column(String, nullable=False)
-    tx_type = Column(String, nullable=False)  # escrow, release, refund
+    tx_type = Column(String, nullable=False)  # escrow, accept, release, refund
     block_number = Column(Integer, nullable=True)
+    event_index = Column(Integer, nullable=True)
+    
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+
+
+class SyncCursor(Base):
+    """Checkpoint for background jobs that process a stream incrementally"""
+    __tablename__ = "sync_cursors"
+
+    name = Column(String, primary_key=True)
+    position = Column(Integer, nullable=False, default=0)
+    position_hash = Column(String, nullable=True)
+    
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+
+
+
+class OrderOutboxEvent(Base):
+    """Order state change, written in the same transaction as the change"""
+    __tablename__ = "order_outbox"
+
+    id = Column(Integer, primary_key=True)
+    order_id = Column(Integer, nullable=False, index=True)  # live or archived order
+    event = Column(String, nullable=False)  # created, accepted, payment_sent, completed, reopened
+    payload = Column(JSON, nullable=False)  # OrderResponse at the time of the change
     
+    created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+
+
+class LPLedgerEntry(Base):
+    """Append-only record of one completed order's LP volume and earnings"""
+    __tablename__ = "lp_ledger"
+
+    id = Column(Integer, primary_key=True)
+    lp_id = Column(Integer, ForeignKey("liquidity_providers.id"), nullable=False)
+    order_id = Column(Integer, unique=True, nullable=False)  # live or archived order
+    
+    volume_usd = Column(Numeric(20, 8), nullable=False)
+    earnings_usd = Column(Numeric(20, 8), nullable=False)
+    
+    occurred_at = Column(DateTime(timezone=True), nullable=False)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
 
+
+class LPEarningsRollup(Base):
+    """Per-LP volume and earnings summed over one hour or day"""
+    __tablename__ = "lp_earnings_rollups"
+
+    lp_id = Column(Integer, ForeignKey("liquidity_providers.id"), primary_key=True)
+    granularity = Column(String, primary_key=True)  # hour, day
+    bucket_start = Column(DateTime(timezone=True), primary_key=True)
+    
+    orders = Column(Integer, nullable=False, default=0)
+    volume_usd = Column(Numeric(20, 8), nullable=False, default=0)
+    earnings_usd = Column(Numeric(20, 8), nullable=False, default=0)
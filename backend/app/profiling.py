@@ -0,0 +1,221 @@
+from collections import Counter
+from typing import Optional, Dict, Any, Callable, List
+import asyncio
+import hashlib
+import hmac
+import logging
+import os
+import random
+import re
+import sys
+import threading
+import time
+
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+PROFILE_HEADER = b"x-profile-signature"
+
+# Leaf frames of threads parked waiting for work, left out of profiles
+IDLE_FRAMES = {("threading.py", "wait"), ("selectors.py", "select"), ("queue.py", "get")}
+
+PROFILE_NAME = re.compile(r"^[\w.\-]+\.folded$")
+
+
+def sign_profile_request(secret: str, path: str, expires: int) -> str:
+    """Value for the X-Profile-Signature header that profiles one request to path"""
+    digest = hmac.new(secret.encode(), f"{expires}:{path}".encode(), hashlib.sha256).hexdigest()
+    return f"{expires}.{digest}"
+
+
+def verify_profile_signature(secret: str, path: str, value: str) -> bool:
+    expires, _, digest = value.partition(".")
+    if not expires.isdigit() or int(expires) < time.time():
+        return False
+    return hmac.compare_digest(sign_profile_request(secret, path, int(expires)), f"{expires}.{digest}")
+
+
+class SamplingProfiler:
+    """
+    Wall-clock sampling profiler over all threads
+
+    Samples sys._current_frames() on a background thread, so sync
+    endpoints running on the threadpool are captured as well as the event
+    loop. The profile is process-wide: whatever else runs meanwhile (other
+    requests, background jobs) is sampled too, so each stack starts with
+    its thread name to tell them apart. Output is in collapsed-stack format
+    (one "thread;frame;frame;... count" line per stack), ready for
+    flamegraph.pl or speedscope.
+    """
+
+    def __init__(self, interval: float = 0.001):
+        self.interval = interval
+        self.samples: Counter = Counter()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self):
+        self._thread = threading.Thread(target=self._run, name="profiler", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> Counter:
+        self._stop.set()
+        self._thread.join()
+        return self.samples
+
+    def _run(self):
+        own_id = threading.get_ident()
+        # Sample at least once, even for requests shorter than the interval
+        while True:
+            names = {thread.ident: thread.name for thread in threading.enumerate()}
+            for thread_id, frame in sys._current_frames().items():
+                if thread_id == own_id:
+                    continue
+                stack = _collapse(frame)
+                if stack:
+                    self.samples[f"{names.get(thread_id, thread_id)};{stack}"] += 1
+            if self._stop.wait(self.interval):
+                return
+
+    def collapsed(self) -> str:
+        return "".join(f"{stack} {count}\n" for stack, count in self.samples.most_common())
+
+
+def _collapse(frame: Any) -> Optional[str]:
+    frames: List[str] = []
+    leaf = frame
+    while frame is not None:
+        code = frame.f_code
+        frames.append(f"{code.co_name} ({_short_path(code.co_filename)}:{code.co_firstlineno})")
+        frame = frame.f_back
+    if (os.path.basename(leaf.f_code.co_filename), leaf.f_code.co_name) in IDLE_FRAMES:
+        return None
+    return ";".join(reversed(frames))
+
+
+def _short_path(filename: str) -> str:
+    parts = filename.replace("\\", "/").split("/")
+    return "/".join(parts[-2:])
+
+
+class ProfileStore:
+    """Profiles on disk, keeping only the newest max_files"""
+
+    def __init__(self, directory: str, max_files: int):
+        self.directory = directory
+        self.max_files = max_files
+        self._lock = threading.Lock()
+
+    def save(self, name: str, content: str):
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            with open(os.path.join(self.directory, name), "w", encoding="utf-8") as f:
+                f.write(content)
+            self._rotate()
+        except Exception as e:
+            logger.error(f"Error saving profile {name}: {e}")
+
+    def list(self) -> List[Dict[str, Any]]:
+        if not os.path.isdir(self.directory):
+            return []
+        profiles = []
+        for entry in os.scandir(self.directory):
+            if entry.is_file() and PROFILE_NAME.match(entry.name):
+                stat = entry.stat()
+                profiles.append({"name": entry.name, "size": stat.st_size, "created_at": stat.st_mtime})
+        return sorted(profiles, key=lambda profile: (profile["created_at"], profile["name"]), reverse=True)
+
+    def path(self, name: str) -> Optional[str]:
+        """Path of a stored profile, None for unknown or unsafe names"""
+        if not PROFILE_NAME.match(name):
+            return None
+        path = os.path.join(self.directory, name)
+        return path if os.path.isfile(path) else None
+
+    def _rotate(self):
+        with self._lock:
+            for profile in self.list()[self.max_files:]:
+                try:
+                    os.remove(os.path.join(self.directory, profile["name"]))
+                except FileNotFoundError:
+                    pass
+
+
+class ProfilingMiddleware:
+    """
+    Profile selected requests and store their collapsed stacks
+
+    A request is profiled when it carries a valid X-Profile-Signature
+    header (see sign_profile_request) or falls within sample_rate. Only
+    one request is profiled at a time; others pass through untouched, but
+    still show up in the process-wide profile if they overlap it.
+    """
+
+    def __init__(
+        self,
+        app: Any,
+        store: ProfileStore,
+        sample_rate: float = 0.0,
+        secret: Optional[str] = None,
+        interval: float = 0.001
+    ):
+        self.app = app
+        self.store = store
+        self.sample_rate = sample_rate
+        self.secret = secret
+        self.interval = interval
+        self._active = threading.Lock()
+
+    async def __call__(self, scope: Dict[str, Any], receive: Callable, send: Callable):
+        if scope["type"] != "http" or not self._selected(scope) or not self._active.acquire(blocking=False):
+            await self.app(scope, receive, send)
+            return
+
+        status_code = 500
+
+        async def send_wrapper(message: Dict[str, Any]):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        profiler = SamplingProfiler(self.interval)
+        started = time.perf_counter()
+        profiler.start()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            elapsed_ms = (time.perf_counter() - started) * 1000
+            # Joining the sampler and writing the file block: keep them off the event loop
+            await asyncio.get_running_loop().run_in_executor(
+                None, self._finish, profiler, scope, status_code, elapsed_ms
+            )
+
+    def _finish(self, profiler: SamplingProfiler, scope: Dict[str, Any], status_code: int, elapsed_ms: float):
+        try:
+            profiler.stop()
+        finally:
+            self._active.release()
+        route = getattr(scope.get("route"), "path", None) or scope["path"]
+        name = "{}.{:03d}_{}_{}_{}_{}_{:.0f}ms.folded".format(
+            time.strftime("%Y%m%dT%H%M%S"),
+            int(time.time() * 1000) % 1000,
+            os.getpid(),
+            scope["method"],
+            re.sub(r"[^\w\-]+", "-", route).strip("-") or "root",
+            status_code,
+            elapsed_ms
+        )
+        self.store.save(name, profiler.collapsed())
+
+    def _selected(self, scope: Dict[str, Any]) -> bool:
+        if self.secret:
+            for key, value in scope["headers"]:
+                if key == PROFILE_HEADER:
+                    return verify_profile_signature(self.secret, scope["path"], value.decode("latin-1"))
+        return self.sample_rate > 0 and random.random() < self.sample_rate
+
+
+# Global instance
+profile_store = ProfileStore(settings.profiling_dir, settings.profiling_max_files)
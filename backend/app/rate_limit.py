@@ -0,0 +1,176 @@
+from fastapi import HTTPException, Request, status
+from jose import JWTError, jwt
+from typing import Optional, Dict, Any, Callable, List, Tuple
+import logging
+import math
+import threading
+import time
+
+from app.cache import cache, RedisCache
+from app.config import settings
+from app.metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+# Per-route budgets: (tokens per minute, burst)
+BUDGETS: Dict[str, Tuple[float, int]] = {
+    "wallet_auth": (settings.rate_limit_wallet_auth_per_minute, settings.rate_limit_wallet_auth_burst),
+    "order_create": (settings.rate_limit_order_create_per_minute, settings.rate_limit_order_create_burst),
+    "order_accept": (settings.rate_limit_order_accept_per_minute, settings.rate_limit_order_accept_burst),
+}
+
+
+class _Shard:
+    def __init__(self):
+        self.lock = threading.Lock()
+        # key -> [tokens, updated, full_at]
+        self.buckets: Dict[str, List[float]] = {}
+
+
+class MemoryRateLimiter:
+    """
+    Token buckets held in this process
+
+    Buckets are spread over shards with a lock each, so concurrent requests
+    for different keys rarely contend. Buckets that have refilled are
+    dropped once a shard grows past max_keys_per_shard.
+    """
+
+    def __init__(self, shards: int = 16, max_keys_per_shard: int = 10000):
+        self._shards = [_Shard() for _ in range(shards)]
+        self.max_keys_per_shard = max_keys_per_shard
+
+    def acquire(self, key: str, rate: float, burst: int) -> float:
+        """Take a token: 0.0 if granted, else seconds until the next one"""
+        now = time.monotonic()
+        shard = self._shards[hash(key) % len(self._shards)]
+        with shard.lock:
+            bucket = shard.buckets.get(key)
+            tokens = burst if bucket is None else min(burst, bucket[0] + (now - bucket[1]) * rate)
+            wait = 0.0
+            if tokens >= 1:
+                tokens -= 1
+            else:
+                wait = (1 - tokens) / rate
+            shard.buckets[key] = [tokens, now, now + (burst - tokens) / rate]
+            if bucket is None and len(shard.buckets) > self.max_keys_per_shard:
+                self._prune(shard, now)
+            return wait
+
+    @staticmethod
+    def _prune(shard: _Shard, now: float):
+        for key in [key for key, bucket in shard.buckets.items() if bucket[2] <= now]:
+            del shard.buckets[key]
+
+
+# Refill, take a token and store the bucket in one round trip. Time comes
+# from Redis so workers with skewed clocks agree. Returns the wait as a
+# string: Lua numbers would be truncated to integers.
+TOKEN_BUCKET_SCRIPT = """
+local rate = tonumber(ARGV[1])
+local burst = tonumber(ARGV[2])
+local clock = redis.call('TIME')
+local now = tonumber(clock[1]) + tonumber(clock[2]) / 1000000
+local bucket = redis.call('HMGET', KEYS[1], 'tokens', 'updated')
+local tokens = burst
+if bucket[1] then
+    tokens = math.min(burst, tonumber(bucket[1]) + (now - tonumber(bucket[2])) * rate)
+end
+local wait = 0
+if tokens >= 1 then
+    tokens = tokens - 1
+else
+    wait = (1 - tokens) / rate
+end
+redis.call('HSET', KEYS[1], 'tokens', tostring(tokens), 'updated', tostring(now))
+redis.call('PEXPIRE', KEYS[1], math.ceil((burst - tokens) / rate * 1000) + 1000)
+return tostring(wait)
+"""
+
+
+class RedisRateLimiter:
+    """
+    Token buckets shared by all workers through Redis
+
+    Each check is one script call. A rejected key is also remembered locally
+    until its next token is due, so a client hammering the API is turned
+    away without a round trip. Redis errors are logged and let the request
+    through, like the cache.
+    """
+
+    def __init__(self, client: Any, prefix: str = "polkapay:", max_blocked: int = 10000):
+        self.client = client
+        self.prefix = prefix
+        self.max_blocked = max_blocked
+        self._script = client.register_script(TOKEN_BUCKET_SCRIPT)
+        self._blocked: Dict[str, float] = {}
+
+    def acquire(self, key: str, rate: float, burst: int) -> float:
+        """Take a token: 0.0 if granted, else seconds until the next one"""
+        now = time.monotonic()
+        blocked_until = self._blocked.get(key)
+        if blocked_until is not None:
+            if blocked_until > now:
+                return blocked_until - now
+            self._blocked.pop(key, None)
+
+        try:
+            wait = float(self._script(keys=[f"{self.prefix}ratelimit:{key}"], args=[rate, burst]))
+        except Exception as e:
+            logger.error(f"Error checking rate limit for {key}: {e}")
+            return 0.0
+
+        if wait > 0:
+            if len(self._blocked) >= self.max_blocked:
+                self._blocked = {k: until for k, until in self._blocked.items() if until > now}
+            self._blocked[key] = now + wait
+        return wait
+
+
+def create_rate_limiter() -> Any:
+    if isinstance(cache, RedisCache):
+        return RedisRateLimiter(cache.client, cache.prefix)
+    return MemoryRateLimiter()
+
+
+def client_identity(request: Request) -> str:
+    """Wallet from a valid bearer token, else the client IP"""
+    authorization = request.headers.get("authorization")
+    if authorization and authorization[:7].lower() == "bearer ":
+        try:
+            payload = jwt.decode(authorization[7:], settings.secret_key, algorithms=[settings.algorithm])
+            if payload.get("sub"):
+                return f"wallet:{payload['sub']}"
+        except JWTError:
+            pass
+    return f"ip:{request.client.host if request.client else 'unknown'}"
+
+
+def rate_limit(budget: str) -> Callable:
+    """
+    Dependency charging one token of budget per request
+
+    List it in the route's dependencies: those run before the endpoint's
+    own (database session, current user), so a rejected request does no
+    database or chain work.
+    """
+    per_minute, burst = BUDGETS[budget]
+    rate = per_minute / 60.0
+
+    async def check(request: Request):
+        if not settings.rate_limit_enabled:
+            return
+        wait = rate_limiter.acquire(f"{budget}:{client_identity(request)}", rate, burst)
+        if wait > 0:
+            metrics.inc("rate_limited_total", budget=budget)
+            raise HTTPException(
+                status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+                detail="Too many requests",
+                headers={"Retry-After": str(math.ceil(wait))}
+            )
+
+    return check
+
+
+# Global instance
+rate_limiter = create_rate_limiter()
@@ -1,5 +1,5 @@
 from pydantic import BaseModel, Field
-from typing import Optional
+from typing import Optional, List
 from datetime import datetime
 from app.models import OrderStatus, OrderType
 
@@ -51,6 +51,35 @@ class LiquidityProviderResponse(BaseModel):
         from_attributes = True
 
 
+class LPEarningsResponse(BaseModel):
+    total_orders: int
+    total_volume_usd: float
+    total_earnings_usd: float
+    rating: float
+    start: Optional[datetime] = None
+    end: Optional[datetime] = None
+
+
+class LPEarningsBucket(BaseModel):
+    bucket_start: datetime
+    orders: int
+    volume_usd: float
+    earnings_usd: float
+
+
+class LPImportRowError(BaseModel):
+    row: int
+    wallet_address: Optional[str]
+    error: str
+
+
+class LPImportReport(BaseModel):
+    total_rows: int
+    imported: int
+    failed: int
+    errors: List[LPImportRowError]
+
+
 # Order Schemas
 class OrderCreate(BaseModel):
     order_type: OrderType
@@ -73,13 +102,32 @@ class OrderResponse(BaseModel):
     pix_qr_code: Optional[str]
     pix_txid: Optional[str]
     contract_order_id: Optional[int]
+    chain_status: Optional[str] = None
+    task_status: Optional[str] = None
+    task_error: Optional[str] = None
     created_at: datetime
+    accepted_at: Optional[datetime] = None
+    payment_sent_at: Optional[datetime] = None
+    completed_at: Optional[datetime] = None
     expires_at: Optional[datetime]
     
     class Config:
         from_attributes = True
 
 
+class ChainStateRequest(BaseModel):
+    order_ids: List[int] = Field(..., min_length=1, max_length=5000)
+
+
+class EscrowStateResponse(BaseModel):
+    order_id: int
+    contract_order_id: Optional[int]
+    status: Optional[str]  # Contract status, None if not on chain
+    amount: Optional[int]  # Planck
+    buyer: Optional[str]
+    seller: Optional[str]
+
+
 class OrderAccept(BaseModel):
     lp_id: int
 
@@ -89,6 +137,17 @@ class OrderConfirmPayment(BaseModel):
     payment_proof: Optional[str] = None
 
 
+# Balance Schemas
+class BalancesRequest(BaseModel):
+    addresses: List[str] = Field(..., min_length=1, max_length=1000)
+
+
+class BalanceResponse(BaseModel):
+    address: str
+    balance: Optional[float]
+    block_hash: Optional[str]
+
+
 # PIX Schemas
 class PIXQRCodeResponse(BaseModel):
     qr_code: str
@@ -97,6 +156,43 @@ class PIXQRCodeResponse(BaseModel):
     amount: float
 
 
+# Analytics Schemas
+class LatencyPercentiles(BaseModel):
+    count: int  # Orders that reached both timestamps
+    p50: Optional[float]  # Seconds
+    p90: Optional[float]
+    p99: Optional[float]
+
+
+class OrderLifecycleStats(BaseModel):
+    group: Optional[str]  # Order type, LP ID or bucket start, None for overall
+    orders: int
+    time_to_accept: LatencyPercentiles
+    time_to_pay: LatencyPercentiles
+    time_to_complete: LatencyPercentiles
+
+
+class LPRankingEntry(BaseModel):
+    lp_id: int
+    orders: int
+    p50_time_to_accept: Optional[float]
+    p50_time_to_complete: float
+
+
+# Admin Schemas
+class ProfileInfo(BaseModel):
+    name: str
+    size: int
+    created_at: float  # Unix timestamp
+
+
+class ProfileSignatureResponse(BaseModel):
+    path: str
+    header: str
+    value: str
+    expires_at: int
+
+
 # Auth Schemas
 class WalletAuthRequest(BaseModel):
     wallet_address: str
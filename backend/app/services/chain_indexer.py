@@ -0,0 +1,272 @@
+from sqlalchemy import insert
+from sqlalchemy.orm import Session
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional, Dict, Any, Callable, List, Tuple, Iterator
+import json
+import logging
+import threading
+
+from app.config import settings
+from app.database import SessionLocal
+from app.models import Order, Transaction, SyncCursor
+from app.services.polkadot_service import polkadot_service, PolkadotService
+from app.services.order_archive import with_archive
+
+logger = logging.getLogger(__name__)
+
+# PolkaPayEscrow event -> Transaction.tx_type
+EVENT_TX_TYPES = {
+    "OrderCreated": "escrow",
+    "OrderAccepted": "accept",
+    "OrderCompleted": "release",
+    "OrderCancelled": "refund",
+}
+
+CURSOR_NAME = "contract_events"
+
+
+class ChainMismatchError(Exception):
+    """The indexed block under the cursor is no longer on the chain"""
+
+
+class SubstrateBlockSource:
+    """
+    Reads escrow contract events from the chain
+
+    Only finalized blocks are indexed: they can't be reorganised away, so
+    indexed rows never need rolling back.
+    """
+
+    def __init__(self, service: PolkadotService):
+        self.service = service
+        self._substrate: Optional[Any] = None
+        self._lock = threading.Lock()
+
+    def head(self) -> int:
+        return self.service.get_finalized_head_number()
+
+    def block_hash(self, block_number: int) -> Optional[str]:
+        return self.service.get_block_hash(block_number)
+
+    def fetch(self, block_number: int) -> Tuple[str, List[Dict[str, Any]]]:
+        return self.service.get_block_contract_events(block_number)
+
+    def follow(self, on_head: Callable[[int], None], stop: threading.Event):
+        """Call on_head for every newly finalized block until stopped or closed"""
+        # A subscription pins its websocket, so it gets its own connection
+        substrate = self.service._create_substrate(settings.polkadot_node_url)
+        with self._lock:
+            self._substrate = substrate
+        if stop.is_set():
+            self.close()
+            return
+
+        def handler(header: Any, update_nr: int, subscription_id: str):
+            if stop.is_set():
+                return True
+            on_head(header["header"]["number"])
+
+        try:
+            substrate.subscribe_block_headers(handler, finalized_only=True)
+        finally:
+            self.close()
+
+    def close(self):
+        """Close the subscription's connection, which ends follow()"""
+        with self._lock:
+            substrate, self._substrate = self._substrate, None
+        if substrate is not None:
+            substrate.close()
+
+
+class RecordedBlockSource:
+    """
+    Replays blocks from an NDJSON recording
+
+    Each line is {"block_number", "block_hash", "events": [...]} with events
+    in the shape returned by PolkadotService.get_block_contract_events.
+    """
+
+    def __init__(self, path: str):
+        self.blocks: Dict[int, Tuple[str, List[Dict[str, Any]]]] = {}
+        with open(path, encoding="utf-8") as f:
+            for line in f:
+                if line.strip():
+                    block = json.loads(line)
+                    self.blocks[block["block_number"]] = (block["block_hash"], block["events"])
+
+    def head(self) -> int:
+        return max(self.blocks, default=0)
+
+    def block_hash(self, block_number: int) -> Optional[str]:
+        return self.blocks.get(block_number, (None, []))[0]
+
+    def fetch(self, block_number: int) -> Tuple[str, List[Dict[str, Any]]]:
+        return self.blocks.get(block_number, (None, []))
+
+    def follow(self, on_head: Callable[[int], None], stop: threading.Event):
+        for block_number in sorted(self.blocks):
+            if stop.is_set():
+                return
+            on_head(block_number)
+
+    def close(self):
+        pass
+
+
+def record_blocks(source: Any, start: int, end: int) -> Iterator[str]:
+    """Yield NDJSON lines for blocks start..end, replayable by RecordedBlockSource"""
+    for block_number in range(start, end + 1):
+        block_hash, events = source.fetch(block_number)
+        yield json.dumps({"block_number": block_number, "block_hash": block_hash, "events": events}) + "\n"
+
+
+class ChainIndexer:
+    """
+    Indexes PolkaPayEscrow events into the transactions table
+
+    Blocks are processed in batches; each batch's rows and the cursor
+    advance commit together, so a restart resumes exactly after the last
+    committed block without duplicates. The cursor also keeps that block's
+    hash: if the chain under it changed (node pointed at another chain),
+    indexing stops instead of mixing the two.
+    """
+
+    def __init__(
+        self,
+        source: Any,
+        batch_size: int = 100,
+        start_block: Optional[int] = None,
+        fetch_workers: int = 4,
+        on_block: Optional[Callable[[int, List[Dict[str, Any]]], None]] = None
+    ):
+        self.source = source
+        self.on_block = on_block
+        self.batch_size = batch_size
+        self.start_block = start_block
+        # Blocks within a batch are fetched concurrently over the connection pool
+        self._fetch_executor = ThreadPoolExecutor(max_workers=fetch_workers, thread_name_prefix="indexer-fetch")
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+
+    def start(self):
+        """Catch up and then follow new blocks in a background thread"""
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="chain-indexer", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        # Ends a follow() waiting for the next block
+        self.source.close()
+
+    def sync(self, head: Optional[int] = None) -> int:
+        """Index every block up to head (default: chain head), returns blocks indexed"""
+        with self._lock:
+            head = self.source.head() if head is None else head
+            db = SessionLocal()
+            try:
+                cursor, cursor_hash = self._get_cursor(db, head)
+                if cursor < head and cursor_hash is not None:
+                    block_hash = self.source.block_hash(cursor)
+                    if block_hash != cursor_hash:
+                        raise ChainMismatchError(
+                            f"Indexed block {cursor} is {cursor_hash}, the chain has {block_hash}"
+                        )
+                indexed = 0
+                while cursor < head and not self._stop.is_set():
+                    end = min(head, cursor + self.batch_size)
+                    self._index_range(db, cursor + 1, end)
+                    indexed += end - cursor
+                    cursor = end
+                    if head - cursor > 0:
+                        logger.info(f"Indexer catching up: block {cursor}/{head}")
+                return indexed
+            finally:
+                db.close()
+
+    def _run(self):
+        backoff = 1.0
+        while not self._stop.is_set():
+            try:
+                self.sync()
+                self.source.follow(self._on_head, self._stop)
+                backoff = 1.0
+            except Exception as e:
+                if self._stop.is_set():
+                    return
+                logger.error(f"Indexer error, retrying in {backoff:.0f}s: {e}")
+                self._stop.wait(backoff)
+                backoff = min(backoff * 2, 60.0)
+
+    def _on_head(self, head: int):
+        self.sync(head)
+
+    def _get_cursor(self, db: Session, head: int) -> Tuple[int, Optional[str]]:
+        """Last indexed block and its hash"""
+        cursor = db.query(SyncCursor).filter(SyncCursor.name == CURSOR_NAME).first()
+        if cursor:
+            return cursor.position, cursor.position_hash
+
+        # First run: start from the configured block or the current head
+        position = (self.start_block - 1) if self.start_block is not None else head
+        db.add(SyncCursor(name=CURSOR_NAME, position=position))
+        db.commit()
+        return position, None
+
+    def _index_range(self, db: Session, start: int, end: int):
+        """Fetch, decode and insert events for blocks start..end in one transaction"""
+        rows = []
+        last_hash = None
+        block_numbers = range(start, end + 1)
+        blocks = list(zip(block_numbers, self._fetch_executor.map(self.source.fetch, block_numbers)))
+        for block_number, (block_hash, events) in blocks:
+            last_hash = block_hash
+            for event in events:
+                tx_type = EVENT_TX_TYPES.get(event["name"])
+                if tx_type:
+                    rows.append({
+                        "contract_order_id": event["args"]["order_id"],
+                        "tx_hash": event["tx_hash"] or "",
+                        "tx_type": tx_type,
+                        "block_number": block_number,
+                        "event_index": event["event_index"]
+                    })
+
+        try:
+            if rows:
+                contract_ids = {row["contract_order_id"] for row in rows}
+                order_ids = dict(with_archive(
+                    db, [Order.contract_order_id, Order.id],
+                    lambda model: model.contract_order_id.in_(contract_ids)
+                ))
+                for row in rows:
+                    row["order_id"] = order_ids.get(row["contract_order_id"])
+                db.execute(insert(Transaction), rows)
+
+            db.query(SyncCursor).filter(SyncCursor.name == CURSOR_NAME).update(
+                {"position": end, "position_hash": last_hash},
+                synchronize_session=False
+            )
+            db.commit()
+        except Exception:
+            db.rollback()
+            raise
+
+        if self.on_block:
+            for block_number, (_, events) in blocks:
+                self.on_block(block_number, events)
+        
+        if rows:
+            logger.info(f"Indexed {len(rows)} contract events from blocks {start}-{end}")
+
+
+# Global instance
+chain_indexer = ChainIndexer(
+    SubstrateBlockSource(polkadot_service),
+    batch_size=settings.indexer_batch_size,
+    start_block=settings.indexer_start_block,
+    fetch_workers=settings.polkadot_pool_size,
+    on_block=polkadot_service.escrow_cache.apply_block
+)
@@ -0,0 +1,138 @@
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional, Dict, Any, Callable, List, Iterable
+import logging
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+# PolkaPayEscrow event -> resulting contract OrderStatus
+EVENT_STATUSES = {
+    "OrderCreated": "Pending",
+    "OrderAccepted": "Accepted",
+    "OrderCompleted": "Completed",
+    "OrderCancelled": "Cancelled",
+}
+
+
+class EscrowStateCache:
+    """
+    Read-through cache of on-chain escrow orders keyed by contract order ID
+
+    Entries come from contract reads (misses are read concurrently). Every
+    new block from the indexer updates entries touched by its events; other
+    entries expire after max_age_blocks because confirm_payment_sent changes
+    state without emitting an event. Without a block feed entries expire by
+    time only (max_age_blocks * block_time).
+    """
+
+    def __init__(
+        self,
+        reader: Callable[[int], Optional[Dict[str, Any]]],
+        max_age_blocks: int = 10,
+        block_time: float = 6.0,
+        max_entries: int = 100_000,
+        read_workers: int = 4
+    ):
+        self.reader = reader
+        self.max_age_blocks = max_age_blocks
+        self.max_age_seconds = max_age_blocks * block_time
+        self.max_entries = max_entries
+
+        self._entries: Dict[int, Dict[str, Any]] = {}
+        # Latest block from apply_block, None until the indexer feeds one
+        self._current_block: Optional[int] = None
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=read_workers, thread_name_prefix="escrow-read")
+        self._stats = {"hits": 0, "misses": 0, "event_updates": 0}
+
+    def get(self, contract_order_id: int) -> Optional[Dict[str, Any]]:
+        return self.get_many([contract_order_id]).get(contract_order_id)
+
+    def get_many(self, contract_order_ids: Iterable[int]) -> Dict[int, Optional[Dict[str, Any]]]:
+        """Get escrow state for many orders, reading only uncached ones from the contract"""
+        now = time.monotonic()
+        results: Dict[int, Optional[Dict[str, Any]]] = {}
+        missing: List[int] = []
+
+        with self._lock:
+            for order_id in dict.fromkeys(contract_order_ids):
+                entry = self._entries.get(order_id)
+                if entry and self._is_fresh(entry, now):
+                    results[order_id] = entry["state"]
+                else:
+                    missing.append(order_id)
+            self._stats["hits"] += len(results)
+            self._stats["misses"] += len(missing)
+
+        if missing:
+            block = self._current_block
+            states = list(self._executor.map(self._read, missing))
+            with self._lock:
+                for order_id, state in zip(missing, states):
+                    results[order_id] = state
+                    if state is not None and not self._updated_since(order_id, block):
+                        self._store(order_id, state, block, now)
+
+        return results
+
+    def apply_block(self, block_number: int, events: List[Dict[str, Any]]):
+        """Advance to a new block and apply its escrow events to cached entries"""
+        now = time.monotonic()
+        with self._lock:
+            self._current_block = max(self._current_block or 0, block_number)
+            for event in events:
+                status = EVENT_STATUSES.get(event["name"])
+                if not status:
+                    continue
+                order_id = event["args"]["order_id"]
+                entry = self._entries.get(order_id)
+                if not entry:
+                    # Events don't carry the whole order (OrderCreated has no seller
+                    # or fee): new entries only come from contract reads
+                    continue
+
+                state = dict(entry["state"], status=status)
+                if event["name"] == "OrderAccepted":
+                    state["seller"] = event["args"].get("seller")
+
+                self._store(order_id, state, block_number, now)
+                self._stats["event_updates"] += 1
+
+    def invalidate(self, contract_order_id: int):
+        with self._lock:
+            self._entries.pop(contract_order_id, None)
+
+    def metrics(self) -> Dict[str, Any]:
+        with self._lock:
+            return {"entries": len(self._entries), "current_block": self._current_block, **self._stats}
+
+    def _read(self, contract_order_id: int) -> Optional[Dict[str, Any]]:
+        try:
+            return self.reader(contract_order_id)
+        except Exception as e:
+            logger.error(f"Error reading escrow order {contract_order_id}: {e}")
+            return None
+
+    def _is_fresh(self, entry: Dict[str, Any], now: float) -> bool:
+        if now - entry["stored_at"] >= self.max_age_seconds:
+            return False
+        if self._current_block is None or entry["block"] is None:
+            # No block feed when it was stored: age by time only
+            return True
+        return self._current_block - entry["block"] < self.max_age_blocks
+
+    def _updated_since(self, order_id: int, block: Optional[int]) -> bool:
+        """Whether an event from a block after `block` updated the entry while it was being read"""
+        entry = self._entries.get(order_id)
+        if not entry or entry["block"] is None:
+            return False
+        return block is None or entry["block"] > block
+
+    def _store(self, order_id: int, state: Dict[str, Any], block: Optional[int], now: float):
+        if len(self._entries) >= self.max_entries and order_id not in self._entries:
+            # Drop the oldest tenth instead of evicting one entry per insert
+            oldest = sorted(self._entries, key=lambda key: self._entries[key]["stored_at"])
+            for key in oldest[:max(1, self.max_entries // 10)]:
+                del self._entries[key]
+        self._entries[order_id] = {"state": state, "block": block, "stored_at": now}
@@ -0,0 +1,326 @@
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING, Optional, Dict, Any, Callable
+import logging
+import threading
+
+from app.services.substrate_pool import SubstratePool, PoolUnavailableError, CONNECTION_ERRORS
+
+if TYPE_CHECKING:
+    from substrateinterface import Keypair, ExtrinsicReceipt
+
+logger = logging.getLogger(__name__)
+
+# Submission errors that mean our local nonce drifted from the chain
+NONCE_ERRORS = ("stale", "future", "outdated", "priority is too low", "nonce")
+
+# Failures worth another attempt (node error responses are retried too)
+RETRYABLE_ERRORS = CONNECTION_ERRORS + (PoolUnavailableError,)
+
+
+class ExtrinsicStatus:
+    QUEUED = "queued"
+    SUBMITTED = "submitted"
+    IN_BLOCK = "in_block"
+    FAILED = "failed"
+
+
+@dataclass
+class SubmissionStatus:
+    """Status update for one submitted extrinsic"""
+    status: str
+    tx_hash: Optional[str] = None
+    nonce: Optional[int] = None
+    block_hash: Optional[str] = None
+    block_number: Optional[int] = None
+    error: Optional[str] = None
+    receipt: Optional["ExtrinsicReceipt"] = None
+    context: Dict[str, Any] = field(default_factory=dict)
+
+
+@dataclass
+class _PendingExtrinsic:
+    tx_hash: str
+    nonce: int
+    death_block: int  # first block the extrinsic's era no longer allows
+    context: Dict[str, Any]
+
+
+class NonceManager:
+    """Tracks the signer's next nonce locally so submissions don't wait on the chain"""
+
+    def __init__(self, address: str):
+        self.address = address
+        self._next: Optional[int] = None
+        self._lock = threading.Lock()
+
+    def next_nonce(self, substrate: Any) -> int:
+        """Reserve the next nonce, reading it from the node on first use or after a resync"""
+        with self._lock:
+            if self._next is None:
+                # Unlike the runtime nonce, this includes transactions already in the pool
+                response = substrate.rpc_request("system_accountNextIndex", [self.address])
+                self._next = response.get("result", 0)
+                logger.info(f"Nonce for {self.address} synced at {self._next}")
+            nonce = self._next
+            self._next += 1
+            return nonce
+
+    def resync(self):
+        """Forget the local nonce, it is re-read from the node on next use"""
+        with self._lock:
+            self._next = None
+
+
+class ExtrinsicQueue:
+    """
+    Pipelined extrinsic submission for a single signer
+
+    Extrinsics are signed with locally tracked nonces and submitted without
+    waiting for inclusion. A tracker thread follows new blocks and reports
+    inclusion or failure through the on_status callback. Extrinsics are
+    mortal: one reported as not included can't be included later.
+    """
+
+    def __init__(
+        self,
+        pool: SubstratePool,
+        keypair: "Keypair",
+        on_status: Callable[[SubmissionStatus], None],
+        max_workers: int = 4,
+        block_time: float = 6.0,
+        mortality_blocks: int = 64,
+        submit_attempts: int = 5,
+        retry_backoff: float = 0.2
+    ):
+        self.pool = pool
+        self.keypair = keypair
+        self.on_status = on_status
+        self.block_time = block_time
+        # Era periods are powers of two
+        self.mortality_blocks = max(4, 1 << (mortality_blocks - 1).bit_length())
+        self.submit_attempts = submit_attempts
+        self.retry_backoff = retry_backoff
+        self.nonces = NonceManager(keypair.ss58_address)
+
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="extrinsic")
+        # Signing and submission happen in nonce order
+        self._submit_lock = threading.Lock()
+        self._pending: Dict[str, _PendingExtrinsic] = {}
+        self._pending_lock = threading.Lock()
+        self._last_block: Optional[int] = None
+        self._stop = threading.Event()
+        self._tracker = threading.Thread(target=self._track_loop, name="extrinsic-tracker", daemon=True)
+        self._tracker.start()
+
+    def submit(self, build_call: Callable[[Any], Any], context: Optional[Dict[str, Any]] = None) -> Future:
+        """
+        Queue an extrinsic for submission
+
+        build_call receives a substrate connection and returns the call to sign.
+        The returned future resolves to a SubmissionStatus once the extrinsic
+        is accepted by the node (not when it is included).
+        """
+        return self._executor.submit(self._submit, build_call, context or {})
+
+    def close(self):
+        self._stop.set()
+        self._executor.shutdown(wait=False)
+
+    @property
+    def pending_count(self) -> int:
+        return len(self._pending)
+
+    def _submit(self, build_call: Callable[[Any], Any], context: Dict[str, Any]) -> SubmissionStatus:
+        """
+        Sign and submit, retrying transient failures with backoff
+
+        Until the node has possibly seen the extrinsic, a failure drops it and
+        the next attempt signs again with a fresh nonce. Once a submission was
+        cut off by a connection error, the node may have it, so later attempts
+        resend the same signed bytes (a duplicate is rejected by the node, and
+        never executed twice) and the tracker settles the outcome.
+        """
+        from substrateinterface.exceptions import SubstrateRequestException
+        extrinsic = None
+        tx_hash = None
+        nonce = None
+        maybe_sent = False
+        error: Optional[Exception] = None
+
+        for attempt in range(self.submit_attempts):
+            if attempt:
+                if self._stop.wait(self.retry_backoff * (2 ** (attempt - 1))):
+                    break
+            sending = False
+            try:
+                # Waiting submitters don't hold pool connections other readers need
+                with self._submit_lock, self.pool.connection() as substrate:
+                    if extrinsic is None:
+                        if self._last_block is None:
+                            # Inclusion can only happen after the current head
+                            self._last_block = substrate.get_block_header()["header"]["number"]
+                        nonce = self.nonces.next_nonce(substrate)
+                        # The era starts at the finalized head, which can't be reorganised away
+                        era_block = substrate.get_block_number(substrate.get_chain_finalised_head())
+                        extrinsic = substrate.create_signed_extrinsic(
+                            call=build_call(substrate),
+                            keypair=self.keypair,
+                            nonce=nonce,
+                            era={"period": self.mortality_blocks, "current": era_block}
+                        )
+                        # Track before submitting so the tracker can't miss a fast inclusion
+                        tx_hash = _extrinsic_hash(extrinsic)
+                        with self._pending_lock:
+                            self._pending[tx_hash] = _PendingExtrinsic(
+                                tx_hash=tx_hash,
+                                nonce=nonce,
+                                death_block=era_block + self.mortality_blocks,
+                                context=context
+                            )
+                    sending = True
+                    substrate.submit_extrinsic(extrinsic, wait_for_inclusion=False)
+                return self._submitted(tx_hash, nonce, context)
+
+            except Exception as e:
+                error = e
+                if maybe_sent:
+                    if isinstance(e, SubstrateRequestException):
+                        # The node answered about bytes it may already hold (already imported,
+                        # stale nonce...): inclusion or expiry is up to the tracker
+                        return self._submitted(tx_hash, nonce, context)
+                    logger.warning(f"Resubmitting extrinsic {tx_hash} failed (attempt {attempt + 1}): {e}")
+                    continue
+
+                if sending and isinstance(e, CONNECTION_ERRORS):
+                    maybe_sent = True
+                    logger.warning(f"Connection lost submitting extrinsic {tx_hash}, resending: {e}")
+                    continue
+
+                # Not sent, or rejected by the node: the nonce is unused
+                if tx_hash:
+                    with self._pending_lock:
+                        self._pending.pop(tx_hash, None)
+                extrinsic = None
+                tx_hash = None
+                self.nonces.resync()
+                if not isinstance(e, RETRYABLE_ERRORS + (SubstrateRequestException,)):
+                    break
+                is_nonce_error = isinstance(e, SubstrateRequestException) and any(
+                    marker in str(e).lower() for marker in NONCE_ERRORS
+                )
+                logger.warning(
+                    f"{'Nonce rejected, resyncing' if is_nonce_error else 'Error submitting extrinsic'}"
+                    f" (attempt {attempt + 1}/{self.submit_attempts}): {e}"
+                )
+
+        if maybe_sent:
+            return self._submitted(tx_hash, nonce, context)
+        logger.error(f"Error submitting extrinsic: {error}")
+        status = SubmissionStatus(status=ExtrinsicStatus.FAILED, error=str(error), context=context)
+        self._report(status)
+        return status
+
+    def _submitted(self, tx_hash: str, nonce: int, context: Dict[str, Any]) -> SubmissionStatus:
+        status = SubmissionStatus(
+            status=ExtrinsicStatus.SUBMITTED,
+            tx_hash=tx_hash,
+            nonce=nonce,
+            context=context
+        )
+        self._report(status)
+        return status
+
+    def _report(self, status: SubmissionStatus):
+        try:
+            self.on_status(status)
+        except Exception as e:
+            logger.error(f"Error reporting extrinsic status: {e}")
+
+    def _track_loop(self):
+        while not self._stop.wait(self.block_time):
+            try:
+                self._scan_new_blocks()
+            except Exception as e:
+                logger.warning(f"Error tracking extrinsics: {e}")
+
+    def _scan_new_blocks(self):
+        with self.pool.connection() as substrate:
+            head = substrate.get_block_header()["header"]["number"]
+            if not self._pending:
+                # Just follow the head while idle
+                self._last_block = head
+                return
+            start = head if self._last_block is None else self._last_block + 1
+
+            try:
+                for block_number in range(start, head + 1):
+                    block = substrate.get_block(block_number=block_number)
+                    block_hash = block["header"]["hash"]
+                    for extrinsic in block["extrinsics"]:
+                        tx_hash = _extrinsic_hash(extrinsic)
+                        with self._pending_lock:
+                            pending = self._pending.get(tx_hash)
+                        if pending:
+                            # Reported first: if the receipt or the report fails, the block is scanned again next time
+                            self._report_inclusion(substrate, pending, block_hash, block_number)
+                            with self._pending_lock:
+                                self._pending.pop(tx_hash, None)
+                    self._last_block = block_number
+            finally:
+                self._expire_pending()
+
+    def _report_inclusion(self, substrate: Any, pending: _PendingExtrinsic, block_hash: str, block_number: int):
+        from substrateinterface import ExtrinsicReceipt
+        receipt = ExtrinsicReceipt(substrate=substrate, extrinsic_hash=pending.tx_hash, block_hash=block_hash)
+        # Loads the block's events (RPC): raises here rather than inside on_status
+        if receipt.is_success:
+            status = ExtrinsicStatus.IN_BLOCK
+            error = None
+        else:
+            status = ExtrinsicStatus.FAILED
+            error = str(receipt.error_message)
+            logger.error(f"Extrinsic {pending.tx_hash} failed in block {block_number}: {error}")
+
+        # Not through _report: an error here (e.g. decoding events over RPC) leaves the extrinsic pending
+        self.on_status(SubmissionStatus(
+            status=status,
+            tx_hash=pending.tx_hash,
+            nonce=pending.nonce,
+            block_hash=block_hash,
+            block_number=block_number,
+            error=error,
+            receipt=receipt,
+            context=pending.context
+        ))
+
+    def _expire_pending(self):
+        """Fail extrinsics whose era ended in a block already scanned without them"""
+        if self._last_block is None:
+            return
+        with self._pending_lock:
+            expired = [
+                pending for pending in self._pending.values()
+                if self._last_block >= pending.death_block - 1
+            ]
+            for pending in expired:
+                del self._pending[pending.tx_hash]
+
+        if expired:
+            # Dropped transactions leave a nonce gap
+            self.nonces.resync()
+        for pending in expired:
+            logger.error(f"Extrinsic {pending.tx_hash} not included before its era ended at block {pending.death_block}")
+            self._report(SubmissionStatus(
+                status=ExtrinsicStatus.FAILED,
+                tx_hash=pending.tx_hash,
+                nonce=pending.nonce,
+                error="Not included in time",
+                context=pending.context
+            ))
+
+
+def _extrinsic_hash(extrinsic: Any) -> Optional[str]:
+    if getattr(extrinsic, "extrinsic_hash", None):
+        return f"0x{extrinsic.extrinsic_hash.hex()}"
+    return None
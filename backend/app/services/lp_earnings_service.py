@@ -0,0 +1,275 @@
+from sqlalchemy import func, and_, or_
+from sqlalchemy.orm import Session
+from datetime import datetime, timedelta, timezone
+from decimal import Decimal
+from typing import Optional, Dict, Any, List, Tuple
+import logging
+import threading
+
+from app.config import settings
+from app.database import SessionLocal
+from app.models import Order, LiquidityProvider, LPLedgerEntry, LPEarningsRollup, SyncCursor
+
+logger = logging.getLogger(__name__)
+
+CURSOR_NAME = "lp_earnings_rollup"
+GRANULARITIES = ("hour", "day")
+
+
+def _utc(value: datetime) -> datetime:
+    """Naive UTC, like the rest of the app's timestamps"""
+    if value.tzinfo is not None:
+        value = value.astimezone(timezone.utc).replace(tzinfo=None)
+    return value
+
+
+def truncate(value: datetime, granularity: str) -> datetime:
+    value = _utc(value).replace(minute=0, second=0, microsecond=0)
+    return value.replace(hour=0) if granularity == "day" else value
+
+
+def _ceil_hour(value: datetime) -> datetime:
+    hour = truncate(value, "hour")
+    return hour if hour == _utc(value) else hour + timedelta(hours=1)
+
+
+def _ceil_day(value: datetime) -> datetime:
+    day = truncate(value, "day")
+    return day if day == _utc(value) else day + timedelta(days=1)
+
+
+class LPEarningsService:
+    """
+    LP volume and earnings from an append-only ledger
+
+    Completing an order only inserts a ledger row, so the LP row is never
+    written on the request path. A background job rolls new ledger rows
+    into hourly and daily aggregates (and refreshes the LP's lifetime
+    totals), tracking its position with a SyncCursor.
+    """
+
+    def __init__(self, interval: float = 10.0, batch_size: int = 5000, gap_timeout: float = 10.0):
+        self.interval = interval
+        self.batch_size = batch_size
+        self.gap_timeout = gap_timeout
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def record_completion(self, db: Session, order: Order):
+        """Add the ledger entry for a completed order; committed with the order"""
+        volume = Decimal(str(order.usd_amount))
+        earnings = Decimal(0)
+        if order.brl_amount:
+            # The fee is charged in BRL, earnings are tracked in USD
+            earnings = Decimal(str(order.lp_fee_amount)) * volume / Decimal(str(order.brl_amount))
+        db.add(LPLedgerEntry(
+            lp_id=order.lp_id,
+            order_id=order.id,
+            volume_usd=volume,
+            earnings_usd=earnings,
+            occurred_at=order.completed_at
+        ))
+
+    def start(self):
+        """Roll up new ledger entries every interval in a background thread"""
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="lp-earnings-rollup", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+
+    def _run(self):
+        while not self._stop.is_set():
+            try:
+                while self.rollup() == self.batch_size and not self._stop.is_set():
+                    pass
+            except Exception as e:
+                logger.error(f"Error rolling up LP earnings: {e}")
+            self._stop.wait(self.interval)
+
+    def rollup(self) -> int:
+        """Roll up one batch of ledger entries, returns entries processed"""
+        db = SessionLocal()
+        try:
+            # Row lock keeps concurrent workers from rolling up the same entries
+            cursor = db.query(SyncCursor).filter(SyncCursor.name == CURSOR_NAME).with_for_update().first()
+            if cursor is None:
+                cursor = SyncCursor(name=CURSOR_NAME, position=0)
+                db.add(cursor)
+                db.flush()
+
+            rows = db.query(
+                LPLedgerEntry.id, LPLedgerEntry.lp_id, LPLedgerEntry.volume_usd,
+                LPLedgerEntry.earnings_usd, LPLedgerEntry.occurred_at, LPLedgerEntry.created_at
+            ).filter(LPLedgerEntry.id > cursor.position).order_by(LPLedgerEntry.id).limit(self.batch_size).all()
+            entries = self._contiguous(rows, cursor.position)
+            if not entries:
+                db.rollback()
+                return 0
+
+            totals: Dict[Tuple[int, str, datetime], List[Any]] = {}
+            for _, lp_id, volume, earnings, occurred_at, _ in entries:
+                for granularity in GRANULARITIES:
+                    bucket = totals.setdefault((lp_id, granularity, truncate(occurred_at, granularity)), [0, Decimal(0), Decimal(0)])
+                    bucket[0] += 1
+                    bucket[1] += Decimal(volume)
+                    bucket[2] += Decimal(earnings)
+
+            lp_ids = {key[0] for key in totals}
+            buckets = [key[2] for key in totals]
+            existing = {
+                (row.lp_id, row.granularity, _utc(row.bucket_start)): row
+                for row in db.query(LPEarningsRollup).filter(
+                    LPEarningsRollup.lp_id.in_(lp_ids),
+                    LPEarningsRollup.bucket_start >= min(buckets),
+                    LPEarningsRollup.bucket_start <= max(buckets)
+                )
+            }
+            for key, (orders, volume, earnings) in totals.items():
+                row = existing.get(key)
+                if row is None:
+                    db.add(LPEarningsRollup(
+                        lp_id=key[0], granularity=key[1], bucket_start=key[2],
+                        orders=orders, volume_usd=volume, earnings_usd=earnings
+                    ))
+                else:
+                    row.orders += orders
+                    row.volume_usd += volume
+                    row.earnings_usd += earnings
+            db.flush()
+
+            self._refresh_lp_totals(db, lp_ids)
+            cursor.position = entries[-1][0]
+            db.commit()
+
+            logger.info(f"Rolled up {len(entries)} LP ledger entries for {len(lp_ids)} LPs")
+            return len(entries)
+        except Exception:
+            db.rollback()
+            raise
+        finally:
+            db.close()
+
+    def _contiguous(self, rows: List[Any], position: int) -> List[Any]:
+        """
+        Entries up to the first recent gap in IDs
+
+        A gap is an entry whose order is still committing (or rolled back):
+        moving the cursor past it would leave that entry out of the rollups
+        for good, so the batch stops there until the gap is older than
+        gap_timeout, as in OrderOutbox.
+        """
+        horizon = datetime.utcnow() - timedelta(seconds=self.gap_timeout)
+        entries = []
+        expected = position + 1
+        for row in rows:
+            if row.id != expected and _utc(row.created_at) > horizon:
+                break
+            entries.append(row)
+            expected = row.id + 1
+        return entries
+
+    def _refresh_lp_totals(self, db: Session, lp_ids: set):
+        """Lifetime totals on the LP row, recomputed from the daily rollups"""
+        lifetime = db.query(
+            LPEarningsRollup.lp_id,
+            func.sum(LPEarningsRollup.orders),
+            func.sum(LPEarningsRollup.volume_usd),
+            func.sum(LPEarningsRollup.earnings_usd)
+        ).filter(
+            LPEarningsRollup.lp_id.in_(lp_ids),
+            LPEarningsRollup.granularity == "day"
+        ).group_by(LPEarningsRollup.lp_id)
+        for lp_id, orders, volume, earnings in lifetime:
+            db.query(LiquidityProvider).filter(LiquidityProvider.id == lp_id).update({
+                "total_orders_processed": orders,
+                "total_volume_usd": float(volume),
+                "total_earnings_usd": float(earnings)
+            }, synchronize_session=False)
+
+    def get_earnings(
+        self,
+        db: Session,
+        lp_id: int,
+        start: Optional[datetime] = None,
+        end: Optional[datetime] = None
+    ) -> Dict[str, Any]:
+        """
+        Orders, volume and earnings of an LP in [start, end)
+
+        Whole days come from daily rollups and the partial days at either
+        edge from hourly ones, all in one query. The range is widened to
+        whole hours.
+        """
+        orders, volume, earnings = db.query(
+            func.coalesce(func.sum(LPEarningsRollup.orders), 0),
+            func.coalesce(func.sum(LPEarningsRollup.volume_usd), 0),
+            func.coalesce(func.sum(LPEarningsRollup.earnings_usd), 0)
+        ).filter(
+            LPEarningsRollup.lp_id == lp_id,
+            self._range_filter(start, end)
+        ).one()
+        return {"orders": int(orders), "volume_usd": float(volume), "earnings_usd": float(earnings)}
+
+    def get_series(
+        self,
+        db: Session,
+        lp_id: int,
+        interval: str,
+        start: Optional[datetime] = None,
+        end: Optional[datetime] = None
+    ) -> List[Dict[str, Any]]:
+        """Hourly or daily buckets of an LP in [start, end), empty buckets omitted"""
+        query = db.query(LPEarningsRollup).filter(
+            LPEarningsRollup.lp_id == lp_id,
+            LPEarningsRollup.granularity == interval
+        )
+        if start is not None:
+            query = query.filter(LPEarningsRollup.bucket_start >= truncate(start, interval))
+        if end is not None:
+            query = query.filter(LPEarningsRollup.bucket_start < _utc(end))
+        return [
+            {
+                "bucket_start": row.bucket_start,
+                "orders": row.orders,
+                "volume_usd": float(row.volume_usd),
+                "earnings_usd": float(row.earnings_usd)
+            }
+            for row in query.order_by(LPEarningsRollup.bucket_start)
+        ]
+
+    @staticmethod
+    def _range_filter(start: Optional[datetime], end: Optional[datetime]) -> Any:
+        start = truncate(start, "hour") if start is not None else None
+        end = _ceil_hour(end) if end is not None else None
+        first_day = _ceil_day(start) if start is not None else None
+        last_day = truncate(end, "day") if end is not None else None
+
+        if first_day is not None and last_day is not None and first_day >= last_day:
+            # Within a single day (or two partial ones): hourly rows only
+            return and_(
+                LPEarningsRollup.granularity == "hour",
+                LPEarningsRollup.bucket_start >= start,
+                LPEarningsRollup.bucket_start < end
+            )
+
+        days = [LPEarningsRollup.granularity == "day"]
+        edges = []
+        if first_day is not None:
+            days.append(LPEarningsRollup.bucket_start >= first_day)
+            edges.append(and_(LPEarningsRollup.bucket_start >= start, LPEarningsRollup.bucket_start < first_day))
+        if last_day is not None:
+            days.append(LPEarningsRollup.bucket_start < last_day)
+            edges.append(and_(LPEarningsRollup.bucket_start >= last_day, LPEarningsRollup.bucket_start < end))
+        if not edges:
+            return and_(*days)
+        return or_(and_(*days), and_(LPEarningsRollup.granularity == "hour", or_(*edges)))
+
+
+# Global instance
+lp_earnings_service = LPEarningsService(
+    interval=settings.lp_rollup_interval_seconds,
+    batch_size=settings.lp_rollup_batch_size,
+    gap_timeout=settings.lp_rollup_gap_timeout_seconds
+)
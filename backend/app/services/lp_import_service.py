@@ -0,0 +1,238 @@
+from sqlalchemy import insert
+from sqlalchemy.orm import Session
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple, TextIO
+import csv
+import json
+import logging
+import math
+
+from app.models import User, LiquidityProvider
+from app.services.pix_service import pix_service
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+REQUIRED_FIELDS = ("wallet_address", "pix_key", "pix_key_type")
+OPTIONAL_FLOAT_FIELDS = ("min_order_size_usd", "max_order_size_usd")
+ORDER_SIZE_DEFAULTS = {
+    field: LiquidityProvider.__table__.c[field].default.arg for field in OPTIONAL_FLOAT_FIELDS
+}
+
+# Keeps IN (...) lists well under database parameter limits
+LOOKUP_CHUNK_SIZE = 900
+
+
+class LPImportService:
+    """Service for bulk Liquidity Provider onboarding"""
+
+    def __init__(self, chunk_size: int = 5000):
+        self.chunk_size = chunk_size
+
+    def iter_rows(self, stream: TextIO, file_format: str) -> Iterator[Tuple[int, Any]]:
+        """
+        Stream rows from a CSV or NDJSON file
+
+        Yields (row_number, row) where row is a dict, or an error message
+        string when the line could not be parsed.
+        """
+        if file_format == "csv":
+            reader = csv.DictReader(stream)
+            for row_number, row in enumerate(reader, start=1):
+                yield row_number, row
+        elif file_format == "ndjson":
+            for row_number, line in enumerate(stream, start=1):
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    row = json.loads(line)
+                except ValueError as e:
+                    yield row_number, f"Invalid JSON: {e}"
+                    continue
+                if not isinstance(row, dict):
+                    yield row_number, "Row must be a JSON object"
+                    continue
+                yield row_number, row
+        else:
+            raise ValueError(f"Unsupported import format: {file_format}")
+
+    def import_stream(self, db: Session, stream: TextIO, file_format: str) -> Dict[str, Any]:
+        """Import LPs from a CSV/NDJSON stream, returning a per-row error report"""
+        report = {"total_rows": 0, "imported": 0, "failed": 0, "errors": []}
+        seen_wallets = set()
+        chunk: List[Tuple[int, Any]] = []
+
+        for row_number, row in self.iter_rows(stream, file_format):
+            report["total_rows"] += 1
+            chunk.append((row_number, row))
+            if len(chunk) >= self.chunk_size:
+                self._import_chunk(db, chunk, seen_wallets, report)
+                chunk = []
+
+        if chunk:
+            self._import_chunk(db, chunk, seen_wallets, report)
+
+        report["failed"] = len(report["errors"])
+        logger.info(
+            f"LP import finished: {report['imported']} imported, "
+            f"{report['failed']} failed of {report['total_rows']} rows"
+        )
+        return report
+
+    def _import_chunk(
+        self,
+        db: Session,
+        chunk: List[Tuple[int, Any]],
+        seen_wallets: set,
+        report: Dict[str, Any]
+    ):
+        """Validate and bulk insert one chunk of rows"""
+        errors = report["errors"]
+        candidates = []
+
+        # Field checks
+        for row_number, row in chunk:
+            if isinstance(row, str):
+                errors.append(self._error(row_number, None, row))
+                continue
+
+            wallet = row.get("wallet_address")
+            wallet = wallet.strip() if isinstance(wallet, str) else None
+            try:
+                limits = self._check_fields(row)
+            except ValueError as e:
+                errors.append(self._error(row_number, wallet or None, str(e)))
+                continue
+            candidates.append((row_number, wallet, row, limits))
+
+        if not candidates:
+            return
+
+        # PIX key checks, one batch per chunk
+        valid_keys = pix_service.validate_pix_keys(
+            [row["pix_key"].strip() for _, _, row, _ in candidates],
+            [row["pix_key_type"].strip().lower() for _, _, row, _ in candidates]
+        )
+        valid_candidates = []
+        chunk_wallets = set()
+        for candidate, is_valid in zip(candidates, valid_keys):
+            row_number, wallet = candidate[0], candidate[1]
+            if not is_valid:
+                errors.append(self._error(row_number, wallet, "Invalid PIX key"))
+            elif wallet in seen_wallets or wallet in chunk_wallets:
+                # Only rows that were accepted count: a corrected row after a rejected one goes through
+                errors.append(self._error(row_number, wallet, "Duplicate wallet address in import"))
+            else:
+                chunk_wallets.add(wallet)
+                valid_candidates.append(candidate)
+
+        if not valid_candidates:
+            return
+
+        try:
+            wallets = [wallet for _, wallet, _, _ in valid_candidates]
+            user_ids = self._get_user_ids(db, wallets)
+
+            # Create missing users in bulk
+            new_wallets = [wallet for wallet in wallets if wallet not in user_ids]
+            if new_wallets:
+                db.execute(insert(User), [
+                    {
+                        "wallet_address": wallet,
+                        "buy_limit_usd": settings.default_buy_limit_usd,
+                        "buy_orders_per_day": settings.default_buy_orders_per_day,
+                        "sell_limit_usd": settings.default_sell_limit_usd,
+                        "sell_orders_per_day": settings.default_sell_orders_per_day
+                    }
+                    for wallet in new_wallets
+                ])
+                user_ids.update(self._get_user_ids(db, new_wallets))
+
+            existing_lps = self._get_lp_user_ids(db, list(user_ids.values()))
+
+            lp_rows = []
+            imported_wallets = []
+            for row_number, wallet, row, limits in valid_candidates:
+                user_id = user_ids[wallet]
+                if user_id in existing_lps:
+                    errors.append(self._error(row_number, wallet, "User is already registered as LP"))
+                    continue
+                lp_rows.append({
+                    "user_id": user_id,
+                    "pix_key": row["pix_key"].strip(),
+                    "pix_key_type": row["pix_key_type"].strip().lower(),
+                    **limits
+                })
+                imported_wallets.append(wallet)
+
+            if lp_rows:
+                db.execute(insert(LiquidityProvider), lp_rows)
+            db.commit()
+            report["imported"] += len(lp_rows)
+            seen_wallets.update(imported_wallets)
+
+        except Exception as e:
+            logger.error(f"Error importing LP chunk: {e}")
+            db.rollback()
+            for row_number, wallet, _, _ in valid_candidates:
+                errors.append(self._error(row_number, wallet, "Database error while importing chunk"))
+
+    @staticmethod
+    def _check_fields(row: Dict[str, Any]) -> Dict[str, float]:
+        """Check field types and ranges, returns the order size limits given; ValueError on a bad row"""
+        missing = [
+            field for field in REQUIRED_FIELDS
+            if not isinstance(row.get(field), str) or not row[field].strip()
+        ]
+        if missing:
+            raise ValueError(f"Missing fields: {', '.join(missing)}")
+
+        limits = {}
+        for field in OPTIONAL_FLOAT_FIELDS:
+            value = row.get(field)
+            if value is None or (isinstance(value, str) and not value.strip()):
+                continue
+            if isinstance(value, bool) or not isinstance(value, (int, float, str)):
+                raise ValueError("Invalid order size limits")
+            try:
+                limits[field] = float(value)
+            except ValueError:
+                raise ValueError("Invalid order size limits")
+            if not math.isfinite(limits[field]) or limits[field] <= 0:
+                raise ValueError("Order size limits must be positive")
+
+        # Missing bounds take the model defaults
+        low = limits.get("min_order_size_usd", ORDER_SIZE_DEFAULTS["min_order_size_usd"])
+        high = limits.get("max_order_size_usd", ORDER_SIZE_DEFAULTS["max_order_size_usd"])
+        if low > high:
+            raise ValueError("min_order_size_usd is above max_order_size_usd")
+        return limits
+
+    def _get_user_ids(self, db: Session, wallets: List[str]) -> Dict[str, int]:
+        """Map wallet addresses to user IDs"""
+        user_ids = {}
+        for batch in _chunks(wallets, LOOKUP_CHUNK_SIZE):
+            rows = db.query(User.wallet_address, User.id).filter(User.wallet_address.in_(batch))
+            user_ids.update(dict(rows))
+        return user_ids
+
+    def _get_lp_user_ids(self, db: Session, user_ids: List[int]) -> set:
+        """Get the subset of user IDs that already have an LP profile"""
+        lp_user_ids = set()
+        for batch in _chunks(user_ids, LOOKUP_CHUNK_SIZE):
+            rows = db.query(LiquidityProvider.user_id).filter(LiquidityProvider.user_id.in_(batch))
+            lp_user_ids.update(user_id for user_id, in rows)
+        return lp_user_ids
+
+    @staticmethod
+    def _error(row_number: int, wallet_address: Optional[str], error: str) -> Dict[str, Any]:
+        return {"row": row_number, "wallet_address": wallet_address, "error": error}
+
+
+def _chunks(items: List[Any], size: int) -> Iterable[List[Any]]:
+    for start in range(0, len(items), size):
+        yield items[start:start + size]
+
+
+# Global instance
+lp_import_service = LPImportService()
@@ -0,0 +1,78 @@
+from typing import Optional, Dict, Any
+import hashlib
+import logging
+import mmap
+import os
+import threading
+
+logger = logging.getLogger(__name__)
+
+
+class MetadataCache:
+    """
+    Process and disk cache for runtime metadata, keyed by spec version
+
+    Implements the get/set interface SubstrateInterface expects from its
+    cache_region, so every pooled connection and every restart reuses the
+    same metadata instead of downloading it again. The raw SCALE bytes are
+    stored on disk and memory-mapped on load; decoded objects are shared in
+    memory only, since they reference dynamically generated type classes
+    that can't be serialized.
+    """
+
+    def __init__(self, directory: str, namespace: str):
+        # Spec versions are only unique per chain
+        self.directory = os.path.join(directory, hashlib.sha1(namespace.encode()).hexdigest()[:16])
+        self._memory: Dict[str, Any] = {}
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[Any]:
+        with self._lock:
+            metadata = self._memory.get(key)
+            if metadata is None:
+                metadata = self._load(key)
+                if metadata is not None:
+                    self._memory[key] = metadata
+            return metadata
+
+    def set(self, key: str, value: Any):
+        with self._lock:
+            self._memory[key] = value
+            self._store(key, value)
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, f"{key}.scale")
+
+    def _load(self, key: str) -> Optional[Any]:
+        path = self._path(key)
+        if not os.path.exists(path):
+            return None
+
+        from scalecodec.base import RuntimeConfigurationObject, ScaleBytes
+        from scalecodec.type_registry import load_type_registry_preset
+        try:
+            with open(path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+                runtime_config = RuntimeConfigurationObject()
+                runtime_config.update_type_registry(load_type_registry_preset(name="core"))
+                metadata = runtime_config.create_scale_object("MetadataVersioned", data=ScaleBytes(bytearray(data)))
+                metadata.decode()
+                # Storage functions resolve their key types through the config that decoded them
+                runtime_config.add_portable_registry(metadata)
+            logger.info(f"Loaded runtime metadata {key} from disk cache")
+            return metadata
+        except Exception as e:
+            # A corrupt entry is just a cache miss
+            logger.warning(f"Ignoring unreadable metadata cache entry {path}: {e}")
+            return None
+
+    def _store(self, key: str, value: Any):
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            path = self._path(key)
+            tmp_path = f"{path}.{os.getpid()}.tmp"
+            with open(tmp_path, "wb") as f:
+                f.write(bytes(value.data.data))
+            os.replace(tmp_path, path)
+            logger.info(f"Stored runtime metadata {key} in disk cache")
+        except Exception as e:
+            logger.warning(f"Could not write metadata cache entry {key}: {e}")
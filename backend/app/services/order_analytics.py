@@ -0,0 +1,309 @@
+from sqlalchemy.orm import Session
+from datetime import datetime, timezone, timedelta
+from typing import TYPE_CHECKING, Optional, Dict, Any, List, Tuple
+import logging
+import math
+import threading
+import time
+
+from app.models import Order, OrderType
+from app.services.order_archive import with_archive
+from app.config import settings
+
+if TYPE_CHECKING:
+    import numpy as np
+
+logger = logging.getLogger(__name__)
+
+ORDER_TYPE_CODES = {OrderType.BUY: 0, OrderType.SELL: 1}
+ORDER_TYPE_NAMES = {code: order_type.value for order_type, code in ORDER_TYPE_CODES.items()}
+
+BUCKET_SECONDS = {"hour": 3600, "day": 86400}
+PERCENTILES = (50, 90, 99)
+
+# Stage -> (start column, end column)
+STAGES = {
+    "time_to_accept": ("created", "accepted"),
+    "time_to_pay": ("accepted", "paid"),
+    "time_to_complete": ("created", "completed"),
+}
+
+# Rows committed slightly out of updated_at order are picked up on the next pass
+REFRESH_OVERLAP = timedelta(seconds=60)
+
+
+def _epoch(value: Optional[datetime]) -> float:
+    if value is None:
+        return math.nan
+    if value.tzinfo is None:
+        # utcnow() and SQLite timestamps are naive UTC
+        value = value.replace(tzinfo=timezone.utc)
+    return value.timestamp()
+
+
+class OrderLifecycleAnalytics:
+    """
+    Order lifecycle latency percentiles computed with NumPy (imported on first use)
+
+    Order timestamps are kept in memory as columns (one array per field,
+    sorted by order ID). A refresh only reads orders whose updated_at moved
+    past the last watermark and upserts them into the columns; aggregates
+    are cached until the next refresh changes something. When registered
+    with the order outbox, consume() applies transitions as they happen and
+    the periodic refresh is skipped.
+    """
+
+    def __init__(self, refresh_interval: float = 60.0):
+        self.refresh_interval = refresh_interval
+        # Allocated on first use: NumPy is only imported once analytics are used
+        self.ids: Optional["np.ndarray"] = None
+        self.columns: Dict[str, "np.ndarray"] = {}
+        self.watermark: Optional[datetime] = None
+        self.version = 0
+        self.refreshed_at: Optional[float] = None
+        self.streaming = False
+        self._results: Dict[Tuple, Any] = {}
+        self._lock = threading.Lock()
+
+    def _ensure_columns(self):
+        if self.ids is not None:
+            return
+        import numpy as np
+        self.ids = np.empty(0, dtype=np.int64)
+        self.columns = {
+            "order_type": np.empty(0, dtype=np.int8),
+            "lp_id": np.empty(0, dtype=np.int64),
+            "created": np.empty(0, dtype=np.float64),
+            "accepted": np.empty(0, dtype=np.float64),
+            "paid": np.empty(0, dtype=np.float64),
+            "completed": np.empty(0, dtype=np.float64),
+        }
+
+    def refresh_if_stale(self, db: Session):
+        if self.streaming:
+            return
+        if self.refreshed_at is None or time.monotonic() - self.refreshed_at >= self.refresh_interval:
+            self.refresh(db)
+
+    def refresh(self, db: Session) -> int:
+        """Load orders changed since the last refresh, returns rows read"""
+        import numpy as np
+        with self._lock:
+            columns = [
+                Order.id, Order.order_type, Order.lp_id, Order.updated_at,
+                Order.created_at, Order.accepted_at, Order.payment_sent_at, Order.completed_at
+            ]
+            if self.watermark is None:
+                # Full load; archived orders never change, later refreshes skip them
+                query = with_archive(db, columns)
+            else:
+                query = db.query(*columns).filter(Order.updated_at >= self.watermark - REFRESH_OVERLAP)
+            rows = query.order_by(Order.id).all()
+            self.refreshed_at = time.monotonic()
+            if not rows:
+                return 0
+
+            ids = np.fromiter((row[0] for row in rows), dtype=np.int64, count=len(rows))
+            fresh = {
+                "order_type": np.fromiter((ORDER_TYPE_CODES[row[1]] for row in rows), dtype=np.int8, count=len(rows)),
+                "lp_id": np.fromiter((row[2] if row[2] is not None else -1 for row in rows), dtype=np.int64, count=len(rows)),
+                "created": np.fromiter((_epoch(row[4]) for row in rows), dtype=np.float64, count=len(rows)),
+                "accepted": np.fromiter((_epoch(row[5]) for row in rows), dtype=np.float64, count=len(rows)),
+                "paid": np.fromiter((_epoch(row[6]) for row in rows), dtype=np.float64, count=len(rows)),
+                "completed": np.fromiter((_epoch(row[7]) for row in rows), dtype=np.float64, count=len(rows)),
+            }
+            self._upsert(ids, fresh)
+
+            latest = max((row[3] for row in rows if row[3] is not None), default=None)
+            if latest is not None and (self.watermark is None or latest > self.watermark):
+                self.watermark = latest
+            self.version += 1
+            self._results.clear()
+            return len(rows)
+
+    def bootstrap(self, db: Session):
+        """Full load before following the outbox"""
+        self.refresh(db)
+        self.streaming = True
+
+    def consume(self, events: List[Dict[str, Any]]):
+        """Outbox consumer: upsert the orders carried by the events"""
+        import numpy as np
+        latest: Dict[int, Dict[str, Any]] = {}
+        for event in events:
+            latest[event["order_id"]] = event["order"]
+        orders = [latest[order_id] for order_id in sorted(latest)]
+        count = len(orders)
+        ids = np.fromiter((order["id"] for order in orders), dtype=np.int64, count=count)
+        fresh = {
+            "order_type": np.fromiter(
+                (ORDER_TYPE_CODES[OrderType(order["order_type"])] for order in orders), dtype=np.int8, count=count
+            ),
+            "lp_id": np.fromiter(
+                (order["lp_id"] if order["lp_id"] is not None else -1 for order in orders), dtype=np.int64, count=count
+            ),
+        }
+        for column, field in (("created", "created_at"), ("accepted", "accepted_at"),
+                              ("paid", "payment_sent_at"), ("completed", "completed_at")):
+            fresh[column] = np.fromiter((_epoch(_parse(order.get(field))) for order in orders), dtype=np.float64, count=count)
+        with self._lock:
+            self._upsert(ids, fresh)
+            self.version += 1
+            self._results.clear()
+
+    def _upsert(self, ids: "np.ndarray", fresh: Dict[str, "np.ndarray"]):
+        import numpy as np
+        self._ensure_columns()
+        positions = np.searchsorted(self.ids, ids)
+        known = positions < len(self.ids)
+        known[known] = self.ids[positions[known]] == ids[known]
+
+        for name, values in fresh.items():
+            self.columns[name][positions[known]] = values[known]
+
+        new = ~known
+        if new.any():
+            self.ids = np.concatenate([self.ids, ids[new]])
+            for name, values in fresh.items():
+                self.columns[name] = np.concatenate([self.columns[name], values[new]])
+            # Backfilled or out of order IDs: keep the columns sorted by ID
+            if len(self.ids) > 1 and (np.diff(self.ids) < 0).any():
+                order = np.argsort(self.ids, kind="stable")
+                self.ids = self.ids[order]
+                for name in self.columns:
+                    self.columns[name] = self.columns[name][order]
+
+    def lifecycle(
+        self,
+        group_by: Optional[str] = None,
+        bucket: str = "day",
+        since: Optional[datetime] = None,
+        until: Optional[datetime] = None
+    ) -> List[Dict[str, Any]]:
+        """Percentiles of each lifecycle stage, overall or per order_type / lp / time bucket"""
+        import numpy as np
+        key = ("lifecycle", group_by, bucket, since, until)
+        with self._lock:
+            cached = self._results.get(key)
+            if cached is not None:
+                return cached
+
+            columns = self._select(since, until)
+            if group_by is None:
+                groups = [(None, np.arange(len(columns["created"])))]
+            else:
+                groups = self._groups(self._group_keys(columns, group_by, bucket))
+
+            result = []
+            for group, rows in groups:
+                summary = {"group": self._group_label(group, group_by), "orders": int(len(rows))}
+                for stage, (start, end) in STAGES.items():
+                    summary[stage] = _percentiles(columns[end][rows] - columns[start][rows])
+                result.append(summary)
+
+            self._results[key] = result
+            return result
+
+    def lp_ranking(self, order_type: Optional[OrderType] = None, min_orders: int = 5) -> List[Dict[str, Any]]:
+        """
+        LPs ordered by median time to complete (then to accept)
+
+        Only LPs with at least min_orders completed orders are ranked, so a
+        single lucky fill doesn't put an LP on top.
+        """
+        import numpy as np
+        key = ("lp_ranking", order_type, min_orders)
+        with self._lock:
+            cached = self._results.get(key)
+            if cached is not None:
+                return cached
+
+            columns = self._select(None, None)
+            mask = (columns["lp_id"] >= 0) & ~np.isnan(columns["completed"])
+            if order_type is not None:
+                mask &= columns["order_type"] == ORDER_TYPE_CODES[order_type]
+            completed = {name: values[mask] for name, values in columns.items()}
+
+            ranking = []
+            for lp_id, rows in self._groups(completed["lp_id"]):
+                if len(rows) < min_orders:
+                    continue
+                ranking.append({
+                    "lp_id": int(lp_id),
+                    "orders": int(len(rows)),
+                    "p50_time_to_accept": _median(completed["accepted"][rows] - completed["created"][rows]),
+                    "p50_time_to_complete": _median(completed["completed"][rows] - completed["created"][rows]),
+                })
+            ranking.sort(key=lambda lp: (lp["p50_time_to_complete"], lp["p50_time_to_accept"] or 0.0))
+
+            self._results[key] = ranking
+            return ranking
+
+    def _select(self, since: Optional[datetime], until: Optional[datetime]) -> Dict[str, "np.ndarray"]:
+        import numpy as np
+        self._ensure_columns()
+        if since is None and until is None:
+            return self.columns
+        created = self.columns["created"]
+        mask = np.ones(len(created), dtype=bool)
+        if since is not None:
+            mask &= created >= _epoch(since)
+        if until is not None:
+            mask &= created < _epoch(until)
+        return {name: values[mask] for name, values in self.columns.items()}
+
+    def _group_keys(self, columns: Dict[str, "np.ndarray"], group_by: str, bucket: str) -> "np.ndarray":
+        import numpy as np
+        if group_by == "order_type":
+            return columns["order_type"]
+        if group_by == "lp":
+            return columns["lp_id"]
+        if group_by == "bucket":
+            seconds = BUCKET_SECONDS[bucket]
+            return (columns["created"] // seconds * seconds).astype(np.int64)
+        raise ValueError(f"Unknown group_by: {group_by}")
+
+    @staticmethod
+    def _groups(keys: "np.ndarray") -> List[Tuple[Any, "np.ndarray"]]:
+        """(key, row indices) per distinct key, in key order"""
+        import numpy as np
+        if len(keys) == 0:
+            return []
+        order = np.argsort(keys, kind="stable")
+        unique, starts = np.unique(keys[order], return_index=True)
+        return list(zip(unique.tolist(), np.split(order, starts[1:])))
+
+    @staticmethod
+    def _group_label(group: Any, group_by: Optional[str]) -> Optional[str]:
+        if group_by == "order_type":
+            return ORDER_TYPE_NAMES[group]
+        if group_by == "lp":
+            return None if group < 0 else str(group)
+        if group_by == "bucket":
+            return datetime.fromtimestamp(group, tz=timezone.utc).isoformat()
+        return None
+
+
+def _parse(value: Optional[str]) -> Optional[datetime]:
+    return datetime.fromisoformat(value) if value else None
+
+
+def _percentiles(durations: "np.ndarray") -> Dict[str, Any]:
+    """Percentiles in seconds over the orders that reached both timestamps"""
+    import numpy as np
+    durations = durations[~np.isnan(durations)]
+    summary: Dict[str, Any] = {"count": int(len(durations))}
+    values = np.percentile(durations, PERCENTILES) if len(durations) else [None] * len(PERCENTILES)
+    for pct, value in zip(PERCENTILES, values):
+        summary[f"p{pct}"] = None if value is None else float(value)
+    return summary
+
+
+def _median(durations: "np.ndarray") -> Optional[float]:
+    import numpy as np
+    durations = durations[~np.isnan(durations)]
+    return float(np.median(durations)) if len(durations) else None
+
+
+# Global instance
+order_analytics = OrderLifecycleAnalytics(refresh_interval=settings.analytics_refresh_seconds)
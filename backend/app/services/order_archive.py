@@ -0,0 +1,120 @@
+from sqlalchemy import insert, delete, select
+from sqlalchemy.orm import Session, Query
+from datetime import datetime, timedelta
+from typing import Optional, Any, Callable, List
+import logging
+import threading
+
+from app.config import settings
+from app.database import SessionLocal
+from app.models import Order, ArchivedOrder, OrderStatus
+
+logger = logging.getLogger(__name__)
+
+TERMINAL_STATUSES = (OrderStatus.COMPLETED, OrderStatus.CANCELLED)
+
+# Copied as is; archived_at is filled in by the archive table
+COLUMNS = [column.key for column in Order.__table__.columns]
+
+
+def with_archive(db: Session, columns: List[Any], criterion: Optional[Callable[[Any], Any]] = None) -> Query:
+    """
+    Live and archived orders as one query
+
+    columns are Order attributes, selected from both tables (UNION ALL);
+    criterion(model) filters each side. Order the result by Order columns:
+    the query adapts them to the union.
+    """
+    live = db.query(*columns)
+    archived = db.query(*[getattr(ArchivedOrder, column.key) for column in columns])
+    if criterion is not None:
+        live = live.filter(criterion(Order))
+        archived = archived.filter(criterion(ArchivedOrder))
+    return live.union_all(archived)
+
+
+class OrderArchive:
+    """
+    Hot/cold storage for orders
+
+    Completed and cancelled orders that haven't changed for after_days are
+    moved in batches from orders to orders_archive (same columns, same
+    IDs), so the live table and its indexes only hold recent orders. Reads
+    that can reach old orders (get_order, the history lists, exports and
+    the analytics bootstrap) fall through to the archive.
+    """
+
+    def __init__(self, after_days: float = 30.0, interval: float = 3600.0, batch_size: int = 1000):
+        self.after_days = after_days
+        self.interval = interval
+        self.batch_size = batch_size
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def get(self, db: Session, order_id: int) -> Optional[ArchivedOrder]:
+        return db.query(ArchivedOrder).filter(ArchivedOrder.id == order_id).first()
+
+    def start(self):
+        """Archive old terminal orders every interval in a background thread"""
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="order-archive", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+
+    def _run(self):
+        while not self._stop.is_set():
+            try:
+                self.archive()
+            except Exception as e:
+                logger.error(f"Error archiving orders: {e}")
+            self._stop.wait(self.interval)
+
+    def archive(self, cutoff: Optional[datetime] = None) -> int:
+        """Archive every terminal order last changed before cutoff, returns orders moved"""
+        if cutoff is None:
+            cutoff = datetime.utcnow() - timedelta(days=self.after_days)
+        total = 0
+        while not self._stop.is_set():
+            moved = self.archive_batch(cutoff)
+            total += moved
+            if moved < self.batch_size:
+                break
+        if total:
+            logger.info(f"Archived {total} orders last changed before {cutoff:%Y-%m-%d %H:%M}")
+        return total
+
+    def archive_batch(self, cutoff: datetime) -> int:
+        """Move one batch to the archive in a single transaction, returns orders moved"""
+        db = SessionLocal()
+        try:
+            # Skip rows another worker is archiving (or a late update holds)
+            order_ids = [
+                order_id for (order_id,) in db.query(Order.id).filter(
+                    Order.status.in_(TERMINAL_STATUSES),
+                    Order.updated_at < cutoff
+                ).order_by(Order.id).limit(self.batch_size).with_for_update(skip_locked=True)
+            ]
+            if not order_ids:
+                db.rollback()
+                return 0
+
+            source = select(*[Order.__table__.c[name] for name in COLUMNS]).where(Order.id.in_(order_ids))
+            db.execute(insert(ArchivedOrder.__table__).from_select(COLUMNS, source))
+            db.execute(delete(Order.__table__).where(Order.id.in_(order_ids)))
+            db.commit()
+            return len(order_ids)
+        except Exception:
+            db.rollback()
+            raise
+        finally:
+            db.close()
+
+
+# Global instance
+order_archive = OrderArchive(
+    after_days=settings.archive_after_days,
+    interval=settings.archive_interval_seconds,
+    batch_size=settings.archive_batch_size
+)
@@ -0,0 +1,116 @@
+from sqlalchemy import and_, true
+from datetime import datetime, timezone
+from typing import Optional, Any, Iterator, List
+import csv
+import enum
+import io
+import json
+import logging
+
+from app.database import SessionLocal
+from app.models import Order
+from app.services.order_archive import with_archive
+
+logger = logging.getLogger(__name__)
+
+EXPORT_COLUMNS = [
+    Order.id, Order.order_type, Order.status, Order.dot_amount, Order.brl_amount, Order.usd_amount,
+    Order.exchange_rate_dot_brl, Order.lp_fee_amount, Order.user_id, Order.lp_id, Order.pix_txid,
+    Order.contract_order_id, Order.escrow_tx_hash, Order.release_tx_hash,
+    Order.created_at, Order.accepted_at, Order.payment_sent_at, Order.completed_at,
+]
+FIELDS = [column.key for column in EXPORT_COLUMNS]
+
+MEDIA_TYPES = {"ndjson": "application/x-ndjson", "csv": "text/csv"}
+
+
+def _utc(value: datetime) -> datetime:
+    if value.tzinfo is not None:
+        value = value.astimezone(timezone.utc).replace(tzinfo=None)
+    return value
+
+
+def _plain(value: Any) -> Any:
+    if isinstance(value, enum.Enum):
+        return value.value
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return value
+
+
+class OrderExporter:
+    """
+    Order history streamed as NDJSON or CSV
+
+    Rows are read as plain column tuples through a server-side cursor
+    (yield_per) and written out chunk by chunk, so memory stays flat no
+    matter how many orders an account has.
+    """
+
+    def __init__(self, chunk_size: int = 1000):
+        self.chunk_size = chunk_size
+
+    def stream(
+        self,
+        fmt: str = "ndjson",
+        user_id: Optional[int] = None,
+        lp_id: Optional[int] = None,
+        start: Optional[datetime] = None,
+        end: Optional[datetime] = None
+    ) -> Iterator[str]:
+        """Orders of a user or LP created in [start, end), oldest first, archived ones included"""
+        # Own session: the generator outlives the request's dependencies
+        db = SessionLocal()
+        try:
+            def criterion(model: Any) -> Any:
+                clauses = []
+                if user_id is not None:
+                    clauses.append(model.user_id == user_id)
+                if lp_id is not None:
+                    clauses.append(model.lp_id == lp_id)
+                if start is not None:
+                    clauses.append(model.created_at >= _utc(start))
+                if end is not None:
+                    clauses.append(model.created_at < _utc(end))
+                return and_(true(), *clauses)
+            
+            rows = with_archive(db, EXPORT_COLUMNS, criterion).order_by(Order.id).yield_per(self.chunk_size)
+
+            if fmt == "csv":
+                yield from self._csv(rows)
+            else:
+                yield from self._ndjson(rows)
+        except Exception as e:
+            # Headers are already sent: all we can do is end the stream early
+            logger.error(f"Error exporting orders: {e}")
+            raise
+        finally:
+            db.close()
+
+    def _ndjson(self, rows: Any) -> Iterator[str]:
+        chunk: List[str] = []
+        for row in rows:
+            chunk.append(json.dumps(dict(zip(FIELDS, map(_plain, row)))) + "\n")
+            if len(chunk) >= self.chunk_size:
+                yield "".join(chunk)
+                chunk = []
+        if chunk:
+            yield "".join(chunk)
+
+    def _csv(self, rows: Any) -> Iterator[str]:
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        writer.writerow(FIELDS)
+        count = 0
+        for row in rows:
+            writer.writerow(map(_plain, row))
+            count += 1
+            if count % self.chunk_size == 0:
+                yield buffer.getvalue()
+                buffer.seek(0)
+                buffer.truncate()
+        yield buffer.getvalue()
+
+
+# Global instance
+order_exporter = OrderExporter()
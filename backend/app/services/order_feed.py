@@ -0,0 +1,221 @@
+from sqlalchemy.orm import Session
+from datetime import datetime, timezone
+from typing import Optional, Dict, Any, List, Set, Tuple
+import asyncio
+import json
+import logging
+
+from app.cache import cache
+from app.config import settings
+from app.models import Order, OrderStatus
+from app.schemas import OrderResponse
+
+logger = logging.getLogger(__name__)
+
+FEED_CHANNEL = "order_feed"
+
+
+class OrderEvent:
+    CREATED = "created"
+    ACCEPTED = "accepted"
+    PAYMENT_SENT = "payment_sent"
+    COMPLETED = "completed"
+    CANCELLED = "cancelled"
+    EXPIRED = "expired"
+    # Back in the book after its acceptance failed
+    REOPENED = "reopened"
+
+
+def _expires_at(order: Dict[str, Any]) -> Optional[datetime]:
+    if not order.get("expires_at"):
+        return None
+    value = datetime.fromisoformat(order["expires_at"])
+    if value.tzinfo is not None:
+        value = value.astimezone(timezone.utc).replace(tzinfo=None)
+    return value
+
+
+class Subscription:
+    """One client's filter and outgoing message queue"""
+
+    def __init__(
+        self,
+        order_type: Optional[str] = None,
+        min_usd: Optional[float] = None,
+        max_usd: Optional[float] = None,
+        queue_size: int = 256
+    ):
+        self.order_type = order_type
+        self.min_usd = min_usd
+        self.max_usd = max_usd
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=queue_size)
+        self.overflowed = False
+        self.closed = False
+
+    def matches(self, order: Dict[str, Any]) -> bool:
+        if self.min_usd is not None and order["usd_amount"] < self.min_usd:
+            return False
+        if self.max_usd is not None and order["usd_amount"] > self.max_usd:
+            return False
+        return True
+
+    def offer(self, message: str):
+        try:
+            self.queue.put_nowait(message)
+        except asyncio.QueueFull:
+            # A client this far behind gets a fresh snapshot instead (see resync)
+            self.overflowed = True
+
+    def close(self):
+        """Wake the consumer so it can stop"""
+        self.closed = True
+        try:
+            self.queue.put_nowait(None)
+        except asyncio.QueueFull:
+            pass
+
+
+class OrderBookFeed:
+    """
+    In-memory order book pushed to WebSocket subscribers
+
+    Holds the pending orders, so a new subscriber gets its snapshot without
+    touching the database, then receives deltas as orders are created,
+    accepted, completed, cancelled or expire. Each event is serialized once
+    and handed to matching subscribers' queues; subscribers are indexed by
+    order type so an event only visits clients that can want it.
+
+    Transitions arrive from the order outbox (see consume) and are
+    published on the shared cache's pub/sub channel, so every worker's
+    book sees the orders changed by the others. The book
+    and queues are only touched on the event loop thread; publish() may be
+    called from anywhere.
+    """
+
+    def __init__(self, queue_size: int = 256, expiry_interval: float = 5.0):
+        self.queue_size = queue_size
+        self.expiry_interval = expiry_interval
+        self.book: Dict[int, Dict[str, Any]] = {}
+        self._expires_at: Dict[int, datetime] = {}
+        # order type (None = any) -> subscribers
+        self._subscribers: Dict[Optional[str], Set[Subscription]] = {}
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._expiry_task: Optional[asyncio.Task] = None
+        self._subscribed = False
+
+    @property
+    def subscriber_count(self) -> int:
+        return sum(len(subscribers) for subscribers in self._subscribers.values())
+
+    def start(self, db: Session):
+        """Load pending orders and start expiring them; call on the event loop"""
+        self._loop = asyncio.get_running_loop()
+        if not self._subscribed:
+            cache.subscribe(FEED_CHANNEL, self._on_message)
+            self._subscribed = True
+        orders = db.query(Order).filter(Order.status == OrderStatus.PENDING).all()
+        self.book.clear()
+        self._expires_at.clear()
+        for order in orders:
+            self._add(self._serialize(order))
+        self._expiry_task = self._loop.create_task(self._expire_loop())
+        logger.info(f"Order feed started with {len(self.book)} pending orders")
+
+    def stop(self):
+        if self._expiry_task:
+            self._expiry_task.cancel()
+            self._expiry_task = None
+
+    def consume(self, events: List[Dict[str, Any]]):
+        """Outbox consumer: broadcast committed transitions to all workers"""
+        for event in events:
+            if not cache.publish(FEED_CHANNEL, {"event": event["event"], "order": event["order"]}):
+                # Not checkpointed, so the outbox delivers the batch again
+                raise RuntimeError("Could not publish order feed event")
+
+    def _on_message(self, message: Dict[str, Any]):
+        # Runs on the pub/sub thread (or the publisher's, in memory mode)
+        if self._loop is None:
+            return
+        try:
+            self._loop.call_soon_threadsafe(self._dispatch, message["event"], message["order"])
+        except RuntimeError:
+            # Loop already closed, the worker is shutting down
+            pass
+
+    def subscribe(
+        self,
+        order_type: Optional[str] = None,
+        min_usd: Optional[float] = None,
+        max_usd: Optional[float] = None
+    ) -> Tuple[Subscription, List[Dict[str, Any]]]:
+        """
+        Register a subscriber and return it with its snapshot
+
+        No await between the two, so no event can fall between the
+        snapshot and the first delta.
+        """
+        subscription = Subscription(order_type, min_usd, max_usd, self.queue_size)
+        self._subscribers.setdefault(order_type, set()).add(subscription)
+        return subscription, self._snapshot(subscription)
+
+    def resync(self, subscription: Subscription) -> List[Dict[str, Any]]:
+        """Drop an overflowed subscriber's backlog and return a fresh snapshot"""
+        while not subscription.queue.empty():
+            subscription.queue.get_nowait()
+        subscription.overflowed = False
+        return self._snapshot(subscription)
+
+    def _snapshot(self, subscription: Subscription) -> List[Dict[str, Any]]:
+        return [
+            order for order in self.book.values()
+            if (subscription.order_type is None or order["order_type"] == subscription.order_type)
+            and subscription.matches(order)
+        ]
+
+    def unsubscribe(self, subscription: Subscription):
+        self._subscribers.get(subscription.order_type, set()).discard(subscription)
+
+    def _serialize(self, order: Order) -> Dict[str, Any]:
+        return OrderResponse.model_validate(order).model_dump(mode="json")
+
+    def _add(self, order: Dict[str, Any]):
+        self.book[order["id"]] = order
+        expires_at = _expires_at(order)
+        if expires_at is not None:
+            self._expires_at[order["id"]] = expires_at
+
+    def _dispatch(self, event: str, order: Dict[str, Any]):
+        if order["status"] == OrderStatus.PENDING.value and event != OrderEvent.EXPIRED:
+            self._add(order)
+        else:
+            self.book.pop(order["id"], None)
+            self._expires_at.pop(order["id"], None)
+
+        message = None
+        for order_type in (None, order["order_type"]):
+            for subscription in self._subscribers.get(order_type, ()):
+                if subscription.matches(order):
+                    if message is None:
+                        message = json.dumps({"type": event, "order": order})
+                    subscription.offer(message)
+
+    async def _expire_loop(self):
+        while True:
+            await asyncio.sleep(self.expiry_interval)
+            try:
+                now = datetime.utcnow()
+                expired = [order_id for order_id, expires_at in self._expires_at.items() if expires_at <= now]
+                for order_id in expired:
+                    order = self.book.get(order_id)
+                    if order:
+                        self._dispatch(OrderEvent.EXPIRED, order)
+            except Exception as e:
+                logger.error(f"Error expiring orders in feed: {e}")
+
+
+# Global instance
+order_feed = OrderBookFeed(
+    queue_size=settings.order_feed_queue_size,
+    expiry_interval=settings.order_feed_expiry_interval_seconds
+)
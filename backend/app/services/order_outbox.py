@@ -0,0 +1,246 @@
+from sqlalchemy import event, func
+from sqlalchemy.orm import Session
+from datetime import datetime, timedelta, timezone
+from typing import Optional, Dict, Any, List, Callable
+import logging
+import threading
+import time
+
+from app.config import settings
+from app.database import SessionLocal
+from app.models import Order, OrderOutboxEvent, SyncCursor
+from app.schemas import OrderResponse
+
+logger = logging.getLogger(__name__)
+
+Consumer = Callable[[List[Dict[str, Any]]], None]
+
+
+def _utc(value: datetime) -> datetime:
+    if value.tzinfo is not None:
+        value = value.astimezone(timezone.utc).replace(tzinfo=None)
+    return value
+
+
+class _Registration:
+    def __init__(self, name: str, handler: Consumer, bootstrap: Optional[Callable[[Session], None]]):
+        self.name = name
+        self.handler = handler
+        self.bootstrap = bootstrap
+        # Local consumers keep their position in memory, durable ones in sync_cursors
+        self.position: Optional[int] = None
+        self.retry_at = 0.0
+        self.failures = 0
+
+    @property
+    def durable(self) -> bool:
+        return self.bootstrap is None
+
+
+class OrderOutbox:
+    """
+    Transactional outbox of order state changes
+
+    Transitions call record() before committing, so the event exists if and
+    only if the change does. A relay thread reads the outbox in ID order and
+    hands batches to registered consumers, advancing each consumer's
+    checkpoint only after its handler returned: delivery is at least once,
+    in order, and a consumer costs one sequential read of new events.
+
+    Durable consumers checkpoint in sync_cursors and resume where they left
+    off. Local consumers hold in-process state: they bootstrap it from the
+    database when the relay starts and then follow the outbox from there.
+    """
+
+    def __init__(
+        self,
+        interval: float = 0.5,
+        batch_size: int = 500,
+        gap_timeout: float = 10.0,
+        retention_hours: float = 72.0
+    ):
+        self.interval = interval
+        self.batch_size = batch_size
+        self.gap_timeout = gap_timeout
+        self.retention_hours = retention_hours
+        self._consumers: List[_Registration] = []
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._pruned_at = 0.0
+
+    def record(self, db: Session, event_name: str, order: Order):
+        """Add an event for order to the current transaction"""
+        db.flush()
+        db.add(OrderOutboxEvent(order_id=order.id, event=event_name, payload=self.serialize(order)))
+        db.info["outbox_pending"] = True
+
+    @staticmethod
+    def serialize(order: Order) -> Dict[str, Any]:
+        return OrderResponse.model_validate(order).model_dump(mode="json")
+
+    def register(self, name: str, handler: Consumer, bootstrap: Optional[Callable[[Session], None]] = None):
+        """
+        Deliver outbox events to handler in batches
+
+        Without bootstrap the consumer is durable (checkpointed under
+        "outbox:<name>"); with it, the consumer is local to this process.
+        """
+        self._consumers = [consumer for consumer in self._consumers if consumer.name != name]
+        self._consumers.append(_Registration(name, handler, bootstrap))
+
+    def start(self):
+        """Bootstrap local consumers and relay events in a background thread"""
+        db = SessionLocal()
+        try:
+            head = db.query(func.coalesce(func.max(OrderOutboxEvent.id), 0)).scalar()
+            for consumer in self._consumers:
+                if not consumer.durable:
+                    # Events past head may be applied on top of the bootstrap: handlers upsert
+                    consumer.bootstrap(db)
+                    consumer.position = head
+        finally:
+            db.close()
+
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="outbox-relay", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        self._wake.set()
+
+    def notify(self):
+        """Wake the relay, called after a commit that recorded events"""
+        self._wake.set()
+
+    def _run(self):
+        while not self._stop.is_set():
+            self._wake.clear()
+            delivered = 0
+            for consumer in self._consumers:
+                if time.monotonic() < consumer.retry_at:
+                    continue
+                try:
+                    delivered += self.relay(consumer)
+                    consumer.failures = 0
+                except Exception as e:
+                    # Not checkpointed: the same batch is delivered again after a backoff
+                    consumer.failures += 1
+                    consumer.retry_at = time.monotonic() + min(self.interval * 2 ** consumer.failures, 30.0)
+                    logger.error(f"Error relaying outbox to {consumer.name}: {e}")
+            try:
+                self._prune()
+            except Exception as e:
+                logger.error(f"Error pruning outbox: {e}")
+            if delivered < self.batch_size:
+                self._wake.wait(self.interval)
+
+    def relay(self, consumer: _Registration) -> int:
+        """Deliver one batch to a consumer, returns events delivered"""
+        db = SessionLocal()
+        try:
+            cursor = None
+            if consumer.durable:
+                # Row lock: with several workers, one relays a given consumer at a time
+                cursor = db.query(SyncCursor).filter(
+                    SyncCursor.name == f"outbox:{consumer.name}"
+                ).with_for_update().first()
+                if cursor is None:
+                    cursor = SyncCursor(name=f"outbox:{consumer.name}", position=0)
+                    db.add(cursor)
+                    db.flush()
+                position = cursor.position
+            else:
+                position = consumer.position
+
+            rows = db.query(OrderOutboxEvent).filter(
+                OrderOutboxEvent.id > position
+            ).order_by(OrderOutboxEvent.id).limit(self.batch_size).all()
+            events = self._contiguous(rows, position)
+            if not events:
+                db.rollback()
+                return 0
+
+            consumer.handler(events)
+
+            if cursor is not None:
+                cursor.position = events[-1]["id"]
+                db.commit()
+            else:
+                consumer.position = events[-1]["id"]
+                db.rollback()
+            return len(events)
+        except Exception:
+            db.rollback()
+            raise
+        finally:
+            db.close()
+
+    def _contiguous(self, rows: List[OrderOutboxEvent], position: int) -> List[Dict[str, Any]]:
+        """
+        Events up to the first recent gap in IDs
+
+        A gap is an ID taken by a transaction that hasn't committed yet (or
+        rolled back). Delivering past it could skip that event for good, so
+        the batch stops there until the gap is older than gap_timeout.
+        """
+        horizon = datetime.utcnow() - timedelta(seconds=self.gap_timeout)
+        events = []
+        expected = position + 1
+        for row in rows:
+            if row.id != expected and _utc(row.created_at) > horizon:
+                break
+            events.append({
+                "id": row.id,
+                "order_id": row.order_id,
+                "event": row.event,
+                "order": row.payload,
+                "created_at": row.created_at
+            })
+            expected = row.id + 1
+        return events
+
+    def _prune(self):
+        """Drop events every durable consumer is past and older than the retention"""
+        if time.monotonic() - self._pruned_at < 3600:
+            return
+        self._pruned_at = time.monotonic()
+        db = SessionLocal()
+        try:
+            names = [f"outbox:{consumer.name}" for consumer in self._consumers if consumer.durable]
+            positions = [
+                position for (position,) in
+                db.query(SyncCursor.position).filter(SyncCursor.name.in_(names))
+            ]
+            if len(positions) < len(names):
+                return
+            deleted = db.query(OrderOutboxEvent).filter(
+                OrderOutboxEvent.id <= min(positions, default=0),
+                OrderOutboxEvent.created_at < datetime.utcnow() - timedelta(hours=self.retention_hours)
+            ).delete(synchronize_session=False)
+            db.commit()
+            if deleted:
+                logger.info(f"Pruned {deleted} outbox events")
+        finally:
+            db.close()
+
+
+# Global instance
+order_outbox = OrderOutbox(
+    interval=settings.outbox_poll_interval_seconds,
+    batch_size=settings.outbox_batch_size,
+    gap_timeout=settings.outbox_gap_timeout_seconds,
+    retention_hours=settings.outbox_retention_hours
+)
+
+
+@event.listens_for(SessionLocal, "after_commit")
+def _wake_relay(session: Session):
+    if session.info.pop("outbox_pending", False):
+        order_outbox.notify()
+
+
+@event.listens_for(SessionLocal, "after_rollback")
+def _discard_pending(session: Session):
+    session.info.pop("outbox_pending", None)
@@ -1,17 +1,45 @@
-from sqlalchemy.orm import Session
-from typing import List, Optional
+from sqlalchemy.orm import Session, Query
+from typing import Any, Callable, List, Optional
 from datetime import datetime, timedelta
-import httpx
+import asyncio
 import logging
+import time
 
+from app.database import SessionLocal
+from app.etags import resource_versions
 from app.models import Order, User, LiquidityProvider, OrderStatus, OrderType
 from app.schemas import OrderCreate
 from app.services.polkadot_service import polkadot_service
+from app.services.extrinsic_queue import ExtrinsicStatus
 from app.services.pix_service import pix_service
+from app.services.lp_earnings_service import lp_earnings_service
+from app.services.order_feed import OrderEvent
+from app.services.order_outbox import order_outbox
+from app.services.order_archive import order_archive, with_archive
+from app.serialization import ORDER_COLUMNS
+from app.cache import cache
+from app.task_status import TaskStatus, TaskName, RetryableTaskError
 from app.config import settings
+from app.metrics import metrics
 
 logger = logging.getLogger(__name__)
 
+RATES_KEY = "rates:dot"
+RATES_LOCK_KEY = "lock:rates:dot"
+RATES_LOCK_SECONDS = 5.0
+RATES_FALLBACK_TTL_SECONDS = 5.0
+
+# Contract call handed to the extrinsic queue, not yet included or failed
+CHAIN_CALL_IN_FLIGHT = (ExtrinsicStatus.QUEUED, ExtrinsicStatus.SUBMITTED)
+
+# Task that hands off each contract call
+CHAIN_CALL_TASKS = {
+    "create_order": TaskName.CREATE_ESCROW,
+    "accept_order": TaskName.ACCEPT,
+    "confirm_payment_sent": TaskName.CONFIRM_PAYMENT,
+    "complete_order": TaskName.COMPLETE,
+}
+
 
 class OrderService:
     """Service for order management"""
@@ -21,9 +49,37 @@ class OrderService:
         self.dot_to_usd_rate: Optional[float] = None
         
     async def get_exchange_rates(self) -> dict:
-        """Fetch current DOT exchange rates"""
+        """
+        Current DOT exchange rates, shared by all workers through the cache
+        
+        On a miss one worker fetches while the others wait briefly for its
+        result instead of all calling CoinGecko at once.
+        """
+        rates = cache.get(RATES_KEY)
+        if rates is None:
+            if cache.add(RATES_LOCK_KEY, True, ttl=RATES_LOCK_SECONDS):
+                try:
+                    rates = await self._fetch_exchange_rates()
+                finally:
+                    cache.delete(RATES_LOCK_KEY)
+            else:
+                deadline = time.monotonic() + RATES_LOCK_SECONDS
+                while rates is None and time.monotonic() < deadline:
+                    await asyncio.sleep(0.05)
+                    rates = cache.get(RATES_KEY)
+                if rates is None:
+                    rates = await self._fetch_exchange_rates()
+        
+        self.dot_to_usd_rate = rates["dot_to_usd"]
+        self.dot_to_brl_rate = rates["dot_to_brl"]
+        return {"dot_to_usd": self.dot_to_usd_rate, "dot_to_brl": self.dot_to_brl_rate}
+    
+    @metrics.timed("dependency_duration_seconds", dependency="coingecko", call="get_exchange_rates")
+    async def _fetch_exchange_rates(self) -> dict:
+        """Fetch current DOT exchange rates and cache them"""
         try:
             # Fetch from CoinGecko or similar API
+            import httpx
             async with httpx.AsyncClient() as client:
                 response = await client.get(
                     "https://api.coingecko.com/api/v3/simple/price",
@@ -34,24 +90,23 @@ class OrderService:
                 )
                 data = response.json()
                 
-                self.dot_to_usd_rate = data["polkadot"]["usd"]
-                self.dot_to_brl_rate = data["polkadot"]["brl"]
-                
-                logger.info(f"Exchange rates: 1 DOT = ${self.dot_to_usd_rate} USD = R${self.dot_to_brl_rate} BRL")
-                
-                return {
-                    "dot_to_usd": self.dot_to_usd_rate,
-                    "dot_to_brl": self.dot_to_brl_rate
+                rates = {
+                    "dot_to_usd": data["polkadot"]["usd"],
+                    "dot_to_brl": data["polkadot"]["brl"]
                 }
+                
+                logger.info(f"Exchange rates: 1 DOT = ${rates['dot_to_usd']} USD = R${rates['dot_to_brl']} BRL")
+                cache.set(RATES_KEY, rates, ttl=settings.exchange_rate_ttl_seconds)
+                return rates
         except Exception as e:
             logger.error(f"Error fetching exchange rates: {e}")
-            # Fallback to default rates
-            self.dot_to_usd_rate = 7.0  # Example
-            self.dot_to_brl_rate = 35.0  # Example
-            return {
-                "dot_to_usd": self.dot_to_usd_rate,
-                "dot_to_brl": self.dot_to_brl_rate
+            # Fallback to default rates, cached briefly so the API is retried soon
+            rates = {
+                "dot_to_usd": 7.0,  # Example
+                "dot_to_brl": 35.0  # Example
             }
+            cache.set(RATES_KEY, rates, ttl=RATES_FALLBACK_TTL_SECONDS)
+            return rates
     
     async def create_order(
         self,
@@ -93,10 +148,12 @@ class OrderService:
                 lp_fee_amount=lp_fee,
                 user_id=user.id,
                 pix_key=order_data.pix_key,
-                expires_at=datetime.utcnow() + timedelta(minutes=15)
+                expires_at=datetime.utcnow() + timedelta(minutes=15),
+                task_status=TaskStatus.QUEUED if order_data.order_type == OrderType.SELL else None
             )
             
             db.add(order)
+            order_outbox.record(db, OrderEvent.CREATED, order)
             db.commit()
             db.refresh(order)
             
@@ -105,13 +162,9 @@ class OrderService:
                 # Buyer will pay PIX, LP will send DOT
                 logger.info(f"Buy order created: {order.id}")
             else:
-                # Seller locks DOT on blockchain
-                blockchain_result = polkadot_service.create_order(dot_amount)
-                if blockchain_result:
-                    order.contract_order_id = blockchain_result["order_id"]
-                    order.escrow_tx_hash = blockchain_result["tx_hash"]
-                    db.commit()
-                    logger.info(f"Sell order created on blockchain: {order.id}")
+                # Seller locks DOT on blockchain, in the background
+                self._enqueue(db, order, TaskName.CREATE_ESCROW)
+                logger.info(f"Sell order created, escrow queued: {order.id}")
             
             return order
             
@@ -121,29 +174,65 @@ class OrderService:
             return None
     
     def get_order(self, db: Session, order_id: int) -> Optional[Order]:
-        """Get order by ID"""
-        return db.query(Order).filter(Order.id == order_id).first()
+        """Get order by ID, falling through to the archive (read-only ArchivedOrder)"""
+        order = db.query(Order).filter(Order.id == order_id).first()
+        return order if order is not None else order_archive.get(db, order_id)
     
     def get_active_orders(self, db: Session, order_type: Optional[OrderType] = None) -> List[Order]:
         """Get all active (pending) orders"""
+        return self.active_orders_query(db, order_type).all()
+    
+    def active_orders_query(self, db: Session, order_type: Optional[OrderType] = None) -> Query:
         query = db.query(Order).filter(Order.status == OrderStatus.PENDING)
         
         if order_type:
             query = query.filter(Order.order_type == order_type)
         
-        return query.order_by(Order.created_at.desc()).all()
+        return query.order_by(Order.created_at.desc())
     
-    def get_user_orders(self, db: Session, user_id: int) -> List[Order]:
-        """Get all orders from a user"""
-        return db.query(Order).filter(Order.user_id == user_id).order_by(Order.created_at.desc()).all()
+    def get_user_orders(self, db: Session, user_id: int) -> List[Any]:
+        """Get all orders from a user, archived ones included (rows with the OrderResponse fields)"""
+        return self.user_orders_query(db, user_id).all()
     
-    async def accept_order(
+    def user_orders_query(self, db: Session, user_id: int) -> Query:
+        return with_archive(db, ORDER_COLUMNS, lambda model: model.user_id == user_id).order_by(Order.created_at.desc())
+    
+    def lp_orders_query(self, db: Session, lp_id: int) -> Query:
+        return with_archive(db, ORDER_COLUMNS, lambda model: model.lp_id == lp_id).order_by(Order.created_at.desc())
+    
+    async def get_escrow_states(self, db: Session, order_ids: List[int]) -> List[dict]:
+        """Get on-chain escrow state for many orders in one batch lookup"""
+        contract_ids = dict(
+            db.query(Order.id, Order.contract_order_id).filter(Order.id.in_(order_ids))
+        )
+        states = await polkadot_service.get_escrow_states_async(
+            [contract_id for contract_id in contract_ids.values() if contract_id is not None]
+        )
+        
+        results = []
+        for order_id in order_ids:
+            if order_id not in contract_ids:
+                continue
+            contract_id = contract_ids[order_id]
+            state = states.get(contract_id) if contract_id is not None else None
+            results.append({
+                "order_id": order_id,
+                "contract_order_id": contract_id,
+                "status": state["status"] if state else None,
+                "amount": state["amount"] if state else None,
+                "buyer": state["buyer"] if state else None,
+                "seller": state["seller"] if state else None
+            })
+        
+        return results
+    
+    def accept_order(
         self,
         db: Session,
         order_id: int,
         lp: LiquidityProvider
     ) -> Optional[Order]:
-        """LP accepts an order"""
+        """LP accepts an order; chain call and QR code follow in the background"""
         try:
             order = self.get_order(db, order_id)
             
@@ -156,32 +245,27 @@ class OrderService:
                 logger.warning(f"Order size outside LP limits")
                 return None
             
+            # Escrow must have succeeded on chain (its inclusion sets the contract order ID)
+            if order.order_type == OrderType.SELL and (
+                order.contract_order_id is None
+                or order.chain_status in CHAIN_CALL_IN_FLIGHT
+            ):
+                logger.warning(f"Order {order_id} escrow not on chain")
+                return None
+            
             # Update order
             order.lp_id = lp.id
             order.status = OrderStatus.ACCEPTED
             order.accepted_at = datetime.utcnow()
-            
-            # If sell order, accept on blockchain
-            if order.order_type == OrderType.SELL and order.contract_order_id:
-                blockchain_result = polkadot_service.accept_order(order.contract_order_id)
-                if not blockchain_result:
-                    logger.error("Failed to accept order on blockchain")
-                    return None
-            
-            # Generate PIX QR code for payment
-            if order.order_type == OrderType.BUY:
-                # LP will receive PIX from buyer
-                pix_result = pix_service.generate_pix_qr_code(
-                    pix_key=lp.pix_key,
-                    amount=order.brl_amount,
-                    recipient_name="PolkaPay LP"
-                )
-                order.pix_qr_code = pix_result["qr_code"]
-                order.pix_txid = pix_result["txid"]
+            order.task_status = TaskStatus.QUEUED
+            order.task_error = None
+            order_outbox.record(db, OrderEvent.ACCEPTED, order)
             
             db.commit()
             db.refresh(order)
             
+            self._enqueue(db, order, TaskName.ACCEPT)
+            
             logger.info(f"Order {order_id} accepted by LP {lp.id}")
             return order
             
@@ -197,18 +281,45 @@ class OrderService:
         pix_txid: str,
         payment_proof: Optional[str] = None
     ) -> Optional[Order]:
-        """Confirm PIX payment was sent"""
+        """
+        Confirm PIX payment was sent
+        
+        An order escrowed on chain is marked paid on the contract first, in
+        the background: it turns payment_sent once that call is included,
+        since the contract releases nothing before.
+        """
         try:
             order = self.get_order(db, order_id)
             
             if not order or order.status != OrderStatus.ACCEPTED:
                 return None
             
-            order.status = OrderStatus.PAYMENT_SENT
+            escrowed = order.contract_order_id is not None
+            # Already on its way: repeated calls don't queue it twice
+            if escrowed and order.pix_txid and order.task_status in (TaskStatus.QUEUED, TaskStatus.RUNNING):
+                return order
+            
+            # The acceptance (chain call, QR code) must be done before payment;
+            # a failed confirmation (the acceptance's would have reopened the order) is retried
+            if order.task_status not in (TaskStatus.SUCCEEDED, TaskStatus.FAILED):
+                logger.warning(f"Order {order_id} acceptance not finished")
+                return None
+            
             order.pix_txid = pix_txid
             order.pix_payment_proof = payment_proof
-            order.payment_sent_at = datetime.utcnow()
             
+            if escrowed:
+                order.task_status = TaskStatus.QUEUED
+                order.task_error = None
+                db.commit()
+                db.refresh(order)
+                
+                self._enqueue(db, order, TaskName.CONFIRM_PAYMENT)
+                
+                logger.info(f"Payment confirmation queued for order {order_id}")
+                return order
+            
+            self._mark_payment_sent(db, order)
             db.commit()
             db.refresh(order)
             
@@ -220,53 +331,281 @@ class OrderService:
             db.rollback()
             return None
     
-    async def complete_order(
+    def complete_order(
         self,
         db: Session,
         order_id: int
     ) -> Optional[Order]:
-        """Complete order and release funds"""
+        """Queue payment verification and escrow release; the order completes in the background"""
         try:
             order = self.get_order(db, order_id)
             
             if not order or order.status != OrderStatus.PAYMENT_SENT:
                 return None
             
-            # Verify PIX payment (in production)
-            if order.pix_txid and settings.pix_mock_enabled:
-                # Mock verification
-                pix_service.mock_confirm_payment(order.pix_txid)
-            
-            # Complete on blockchain
-            if order.contract_order_id:
-                blockchain_result = polkadot_service.complete_order(order.contract_order_id)
-                if blockchain_result:
-                    order.release_tx_hash = blockchain_result["tx_hash"]
-            
-            # Update order
-            order.status = OrderStatus.COMPLETED
-            order.completed_at = datetime.utcnow()
-            
-            # Update user stats
-            order.user.total_orders += 1
-            order.user.successful_orders += 1
-            
-            # Update LP stats
-            if order.liquidity_provider:
-                order.liquidity_provider.total_orders_processed += 1
-                order.liquidity_provider.total_volume_usd += order.usd_amount
-                order.liquidity_provider.total_earnings_usd += (order.lp_fee_amount * order.usd_amount / order.brl_amount)
+            # Already on its way: repeated calls don't queue it twice
+            if order.task_status in (TaskStatus.QUEUED, TaskStatus.RUNNING):
+                return order
             
+            order.task_status = TaskStatus.QUEUED
+            order.task_error = None
             db.commit()
             db.refresh(order)
             
-            logger.info(f"Order {order_id} completed")
+            self._enqueue(db, order, TaskName.COMPLETE)
+            
+            logger.info(f"Order {order_id} completion queued")
             return order
             
         except Exception as e:
             logger.error(f"Error completing order: {e}")
             db.rollback()
             return None
+    
+    def _enqueue(self, db: Session, order: Order, task_name: str):
+        try:
+            # Celery is only loaded once a task is queued
+            from app.tasks import celery_app
+            celery_app.tasks[task_name].delay(order.id)
+        except Exception as e:
+            logger.error(f"Error queueing {task_name} for order {order.id}: {e}")
+            self.fail_task(task_name, order.id, "Could not queue task")
+        db.refresh(order)
+    
+    # Background side effects, run by the task worker (app.tasks)
+    
+    def run_escrow(self, order_id: int):
+        """Lock a sell order's DOT on chain"""
+        self._run_task(order_id, OrderStatus.PENDING, self._create_escrow)
+    
+    def run_acceptance(self, order_id: int):
+        """Accept a sell order on chain, or generate a buy order's PIX QR code"""
+        self._run_task(order_id, OrderStatus.ACCEPTED, self._accept)
+    
+    def run_payment_confirmation(self, order_id: int):
+        """Mark an escrowed order's payment as sent on chain"""
+        self._run_task(order_id, OrderStatus.ACCEPTED, self._confirm_payment)
+    
+    def run_completion(self, order_id: int):
+        """Verify the PIX payment, release the escrow and complete the order"""
+        self._run_task(order_id, OrderStatus.PAYMENT_SENT, self._complete)
+    
+    def _run_task(self, order_id: int, expected_status: OrderStatus, step: Callable[[Session, Order], bool]):
+        """
+        Run a side effect step under the order's row lock
+        
+        A step returns True when it handed a contract call to the extrinsic
+        queue: the task then stays running until finish_chain_call records
+        the call's inclusion or failure.
+        """
+        db = SessionLocal()
+        try:
+            order = db.query(Order).filter(Order.id == order_id).with_for_update().first()
+            # Stale or duplicate delivery: the order moved on already
+            if not order or order.status != expected_status or order.task_status == TaskStatus.SUCCEEDED:
+                db.rollback()
+                return
+            order.task_status = TaskStatus.RUNNING
+            db.commit()
+            
+            if not step(db, order):
+                order.task_status = TaskStatus.SUCCEEDED
+                order.task_error = None
+            db.commit()
+        except RetryableTaskError as e:
+            db.rollback()
+            db.query(Order).filter(Order.id == order_id).update(
+                {"task_status": TaskStatus.QUEUED, "task_error": str(e)}, synchronize_session=False
+            )
+            resource_versions.touch(db, order_id)
+            db.commit()
+            raise
+        except Exception:
+            db.rollback()
+            raise
+        finally:
+            db.close()
+    
+    def _submit_chain_call(self, db: Session, order: Order, submit: Callable[[], Optional[dict]], error: str) -> dict:
+        """Hand a contract call off, marking it queued first so a retry or redelivery doesn't send it twice"""
+        previous = order.chain_status
+        order.chain_status = ExtrinsicStatus.QUEUED
+        # Committed before the queue can report on the call
+        db.commit()
+        
+        result = submit()
+        if not result:
+            order.chain_status = previous
+            db.commit()
+            raise RetryableTaskError(error)
+        if result.get("status") != ExtrinsicStatus.QUEUED:
+            # No contract configured: the placeholder result is final
+            order.chain_status = ExtrinsicStatus.IN_BLOCK
+        return result
+    
+    def _create_escrow(self, db: Session, order: Order) -> bool:
+        if order.chain_status in CHAIN_CALL_IN_FLIGHT:
+            return True
+        if order.escrow_tx_hash:
+            return False
+        blockchain_result = self._submit_chain_call(
+            db, order,
+            lambda: polkadot_service.create_order(order.dot_amount, order.id),
+            "Failed to create order on blockchain"
+        )
+        logger.info(f"Sell order sent to blockchain: {order.id}")
+        if blockchain_result["status"] == ExtrinsicStatus.QUEUED:
+            # Contract order ID and tx hash are written by the extrinsic queue
+            return True
+        order.contract_order_id = blockchain_result["order_id"]
+        order.escrow_tx_hash = blockchain_result["tx_hash"]
+        return False
+    
+    def _accept(self, db: Session, order: Order) -> bool:
+        # If sell order, accept on blockchain
+        if order.order_type == OrderType.SELL and order.contract_order_id:
+            if order.chain_status in CHAIN_CALL_IN_FLIGHT:
+                return True
+            blockchain_result = self._submit_chain_call(
+                db, order,
+                lambda: polkadot_service.accept_order(order.contract_order_id, order.id),
+                "Failed to accept order on blockchain"
+            )
+            return blockchain_result["status"] == ExtrinsicStatus.QUEUED
+        
+        # Generate PIX QR code for payment
+        if order.order_type == OrderType.BUY and not order.pix_txid:
+            # LP will receive PIX from buyer
+            pix_result = pix_service.generate_pix_qr_code(
+                pix_key=order.liquidity_provider.pix_key,
+                amount=order.brl_amount,
+                recipient_name="PolkaPay LP"
+            )
+            order.pix_qr_code = pix_result["qr_code"]
+            order.pix_txid = pix_result["txid"]
+        return False
+    
+    def _confirm_payment(self, db: Session, order: Order) -> bool:
+        # The order is paid once the contract knows, so it can be released
+        if order.chain_status in CHAIN_CALL_IN_FLIGHT:
+            return True
+        if not order.payment_tx_hash:
+            blockchain_result = self._submit_chain_call(
+                db, order,
+                lambda: polkadot_service.confirm_payment_sent(order.contract_order_id, order.id),
+                "Failed to confirm payment on blockchain"
+            )
+            if blockchain_result["status"] == ExtrinsicStatus.QUEUED:
+                return True
+            order.payment_tx_hash = blockchain_result["tx_hash"]
+        
+        self._mark_payment_sent(db, order)
+        return False
+    
+    def _mark_payment_sent(self, db: Session, order: Order):
+        order.status = OrderStatus.PAYMENT_SENT
+        order.payment_sent_at = datetime.utcnow()
+        order_outbox.record(db, OrderEvent.PAYMENT_SENT, order)
+    
+    def _complete(self, db: Session, order: Order) -> bool:
+        # Verify PIX payment (in production)
+        if order.pix_txid and settings.pix_mock_enabled:
+            # Mock verification
+            pix_service.mock_confirm_payment(order.pix_txid)
+        
+        # Release on blockchain; the order completes once the release is included
+        if order.chain_status in CHAIN_CALL_IN_FLIGHT:
+            return True
+        if order.contract_order_id and not order.release_tx_hash:
+            blockchain_result = self._submit_chain_call(
+                db, order,
+                lambda: polkadot_service.complete_order(order.contract_order_id, order.id),
+                "Failed to release escrow on blockchain"
+            )
+            if blockchain_result["status"] == ExtrinsicStatus.QUEUED:
+                return True
+            order.release_tx_hash = blockchain_result["tx_hash"]
+        
+        self._mark_completed(db, order)
+        db.commit()
+        return False
+    
+    def _mark_completed(self, db: Session, order: Order):
+        """Complete an order whose escrow was released"""
+        order.status = OrderStatus.COMPLETED
+        order.completed_at = datetime.utcnow()
+        
+        # Update user stats
+        order.user.total_orders += 1
+        order.user.successful_orders += 1
+        
+        # LP stats: append to the ledger, the rollup job updates the LP row
+        if order.lp_id:
+            lp_earnings_service.record_completion(db, order)
+        
+        order_outbox.record(db, OrderEvent.COMPLETED, order)
+        logger.info(f"Order {order.id} completed")
+    
+    def finish_chain_call(self, method: str, order_id: int, status: str, error: Optional[str] = None):
+        """
+        Settle the task that handed a contract call off, once the extrinsic queue reports on it
+        
+        An included payment confirmation marks the order paid, an included
+        release completes it. A failed call fails the task and leaves the
+        order where it was, so it can be retried.
+        """
+        task_name = CHAIN_CALL_TASKS.get(method)
+        if not task_name:
+            return
+        if status == ExtrinsicStatus.FAILED:
+            self.fail_task(task_name, order_id, error or "Chain call failed")
+            return
+        
+        db = SessionLocal()
+        try:
+            order = db.query(Order).filter(Order.id == order_id).with_for_update().first()
+            if not order or order.task_status != TaskStatus.RUNNING:
+                db.rollback()
+                return
+            if task_name == TaskName.CONFIRM_PAYMENT and order.status == OrderStatus.ACCEPTED:
+                self._mark_payment_sent(db, order)
+            elif task_name == TaskName.COMPLETE and order.status == OrderStatus.PAYMENT_SENT:
+                self._mark_completed(db, order)
+            order.task_status = TaskStatus.SUCCEEDED
+            order.task_error = None
+            db.commit()
+        except Exception as e:
+            logger.error(f"Error recording chain call for order {order_id}: {e}")
+            db.rollback()
+        finally:
+            db.close()
+    
+    def fail_task(self, task_name: str, order_id: int, error: str):
+        """Record a side effect that ran out of retries, undoing the acceptance it belonged to"""
+        db = SessionLocal()
+        try:
+            order = db.query(Order).filter(Order.id == order_id).first()
+            if not order:
+                return
+            order.task_status = TaskStatus.FAILED
+            order.task_error = error[:500]
+            
+            reopened = task_name == TaskName.ACCEPT and order.status == OrderStatus.ACCEPTED
+            if reopened:
+                # The LP couldn't take the order after all: back to the book
+                order.status = OrderStatus.PENDING
+                order.lp_id = None
+                order.accepted_at = None
+                order.pix_qr_code = None
+                order.pix_txid = None
+                order_outbox.record(db, OrderEvent.REOPENED, order)
+            
+            db.commit()
+        except Exception as e:
+            logger.error(f"Error recording task failure for order {order_id}: {e}")
+            db.rollback()
+        finally:
+            db.close()
 
 
 # Global instance
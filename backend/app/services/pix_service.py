@@ -1,12 +1,14 @@
-import qrcode
 import io
 import base64
-from typing import Dict, Any, Optional
+from typing import Dict, Any, Optional, List, Callable
 import random
+import re
 import string
 import logging
 
+from app.cache import cache
 from app.config import settings
+from app.metrics import metrics
 
 logger = logging.getLogger(__name__)
 
@@ -16,8 +18,10 @@ class PIXService:
     
     def __init__(self):
         self.mock_enabled = settings.pix_mock_enabled
-        self.mock_transactions: Dict[str, Dict] = {}
+        # Mock transactions live in the shared cache, so any worker can verify them
+        self.mock_ttl = settings.pix_mock_transaction_ttl_seconds
     
+    @metrics.timed("dependency_duration_seconds", dependency="pix", call="generate_pix_qr_code")
     def generate_pix_qr_code(
         self,
         pix_key: str,
@@ -44,7 +48,8 @@ class PIXService:
                 txid=txid
             )
             
-            # Generate QR code image
+            # Generate QR code image (qrcode pulls in Pillow, so it loads on first use)
+            import qrcode
             qr = qrcode.QRCode(version=1, box_size=10, border=5)
             qr.add_data(pix_payload)
             qr.make(fit=True)
@@ -58,13 +63,13 @@ class PIXService:
             
             # Store mock transaction
             if self.mock_enabled:
-                self.mock_transactions[txid] = {
+                cache.set(f"pix:tx:{txid}", {
                     "txid": txid,
                     "pix_key": pix_key,
                     "amount": amount,
                     "status": "pending",
                     "qr_code": pix_payload
-                }
+                }, ttl=self.mock_ttl)
             
             logger.info(f"Generated PIX QR code for {amount} BRL to {pix_key}")
             
@@ -88,7 +93,7 @@ class PIXService:
         """
         try:
             if self.mock_enabled:
-                transaction = self.mock_transactions.get(txid)
+                transaction = cache.get(f"pix:tx:{txid}")
                 if transaction:
                     return {
                         "txid": txid,
@@ -107,8 +112,10 @@ class PIXService:
     
     def mock_confirm_payment(self, txid: str) -> bool:
         """Mock: Simulate payment confirmation (for testing)"""
-        if txid in self.mock_transactions:
-            self.mock_transactions[txid]["status"] = "confirmed"
+        transaction = cache.get(f"pix:tx:{txid}")
+        if transaction:
+            transaction["status"] = "confirmed"
+            cache.set(f"pix:tx:{txid}", transaction, ttl=self.mock_ttl)
             logger.info(f"Mock: Payment {txid} confirmed")
             return True
         return False
@@ -138,20 +145,40 @@ class PIXService:
     
     def validate_pix_key(self, pix_key: str, key_type: str) -> bool:
         """Validate PIX key format"""
-        # Basic validation - in production, use proper validation
-        if key_type == "cpf":
-            # Remove formatting
-            cpf = ''.join(filter(str.isdigit, pix_key))
-            return len(cpf) == 11
-        elif key_type == "email":
-            return "@" in pix_key and "." in pix_key
-        elif key_type == "phone":
-            phone = ''.join(filter(str.isdigit, pix_key))
-            return len(phone) >= 10
-        elif key_type == "random":
-            return len(pix_key) == 32  # EVP format
+        return self.validate_pix_keys([pix_key], [key_type])[0]
+    
+    def validate_pix_keys(self, pix_keys: List[str], key_types: List[str]) -> List[bool]:
+        """
+        Validate a batch of PIX keys
         
-        return False
+        Keys are grouped by type and each group is checked in a single pass,
+        so bulk imports don't pay the per-key dispatch cost.
+        """
+        results = [False] * len(pix_keys)
+        groups: Dict[str, List[int]] = {}
+        for index, key_type in enumerate(key_types):
+            groups.setdefault(key_type, []).append(index)
+        
+        for key_type, indexes in groups.items():
+            check = _PIX_KEY_CHECKS.get(key_type)
+            if check is None:
+                continue
+            keys = [pix_keys[i] or "" for i in indexes]
+            for index, valid in zip(indexes, map(check, keys)):
+                results[index] = valid
+        
+        return results
+
+
+# Basic validation - in production, use proper validation
+_NON_DIGITS = re.compile(r"\D")
+
+_PIX_KEY_CHECKS: Dict[str, Callable[[str], bool]] = {
+    "cpf": lambda key: len(_NON_DIGITS.sub("", key)) == 11,
+    "email": lambda key: "@" in key and "." in key,
+    "phone": lambda key: len(_NON_DIGITS.sub("", key)) >= 10,
+    "random": lambda key: len(key) == 32,  # EVP format
+}
 
 
 # Global instance
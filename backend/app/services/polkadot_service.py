@@ -1,15 +1,27 @@
-from substrateinterface import SubstrateInterface, Keypair
-try:
-    from substrateinterface import ContractInstance, ContractCode
-except ImportError:
-    # Optional imports for contract support
-    ContractInstance = None
-    ContractCode = None
-from substrateinterface.exceptions import SubstrateRequestException
-from typing import Optional, Dict, Any
+from concurrent.futures import ThreadPoolExecutor
+from typing import TYPE_CHECKING, Optional, Dict, Any, Callable, List, Tuple
+import asyncio
+import functools
 import logging
+import threading
+import time
+import weakref
 
 from app.config import settings
+from app.database import SessionLocal
+from app.etags import resource_versions
+from app.metrics import metrics
+from app.models import Order
+from app.services.substrate_pool import SubstratePool
+from app.services.extrinsic_queue import ExtrinsicQueue, ExtrinsicStatus, SubmissionStatus
+from app.services.settlement_batcher import SettlementBatcher
+from app.services.escrow_state_cache import EscrowStateCache
+from app.services.metadata_cache import MetadataCache
+
+# substrateinterface takes a large share of app import time, so it is
+# imported where it's used, once the service actually talks to the chain
+if TYPE_CHECKING:
+    from substrateinterface import SubstrateInterface, Keypair, ContractInstance
 
 logger = logging.getLogger(__name__)
 
@@ -18,77 +30,259 @@ class PolkadotService:
     """Service for interacting with Polkadot/Substrate blockchain"""
     
     def __init__(self):
-        self.substrate: Optional[SubstrateInterface] = None
-        self.contract: Optional[ContractInstance] = None
-        self.keypair: Optional[Keypair] = None
+        self.pool: Optional[SubstratePool] = None
+        self.contract: Optional["ContractInstance"] = None
+        self.keypair: Optional["Keypair"] = None
+        self.contract_metadata: Optional[Any] = None
+        self.extrinsic_queue: Optional[ExtrinsicQueue] = None
+        self.settlement_batcher: Optional[SettlementBatcher] = None
+        # Contract types live in each connection's own type registry
+        self._bound_contract_metadata: weakref.WeakKeyDictionary = weakref.WeakKeyDictionary()
+        self._contract_metadata_lock = threading.Lock()
+        
+        # block_hash -> {address: balance}, only for the last head read at (monotonic time, hash)
+        self._balance_cache: Dict[str, Dict[str, float]] = {}
+        self._balance_head: Tuple[float, Optional[str]] = (0.0, None)
+        self._balance_lock = threading.Lock()
+        
+        self.metadata_cache: Optional[MetadataCache] = None
+        if settings.metadata_cache_enabled:
+            self.metadata_cache = MetadataCache(settings.metadata_cache_dir, settings.polkadot_node_url)
         
+        self.escrow_cache = EscrowStateCache(
+            reader=self.read_contract_order,
+            max_age_blocks=settings.escrow_cache_max_age_blocks,
+            block_time=settings.polkadot_block_time_seconds,
+            read_workers=settings.polkadot_pool_size
+        )
+        
+        # Blocking substrate I/O runs here so it never stalls the event loop
+        self._executor = self._create_executor()
+        
+    @property
+    def is_connected(self) -> bool:
+        """True while at least one pooled connection is healthy"""
+        return self.pool is not None and self.pool.healthy_count > 0
+    
     def connect(self):
         """Connect to Polkadot node"""
         try:
-            self.substrate = SubstrateInterface(
+            if self.pool:
+                self.pool.close()
+            
+            self.pool = SubstratePool(
                 url=settings.polkadot_node_url,
-                ss58_format=42,  # Generic Substrate
-                type_registry_preset='rococo'
+                factory=self._create_substrate,
+                size=settings.polkadot_pool_size,
+                health_interval=settings.polkadot_health_interval_seconds,
+                backoff_max=settings.polkadot_reconnect_backoff_max_seconds
             )
-            logger.info(f"Connected to {settings.polkadot_node_url}")
+            connected = self.pool.start()
+            if connected:
+                logger.info(f"Connected to {settings.polkadot_node_url} ({self.pool.healthy_count} connections)")
+            else:
+                # The pool keeps retrying in the background with backoff
+                logger.error(f"Failed to connect to Polkadot: no connection to {settings.polkadot_node_url}")
             
             # Load keypair if seed is provided
             if settings.signer_seed:
+                from substrateinterface import Keypair
+
                 self.keypair = Keypair.create_from_uri(settings.signer_seed)
                 logger.info(f"Loaded keypair: {self.keypair.ss58_address}")
                 
-            return True
+                self._close_submission()
+                self.extrinsic_queue = ExtrinsicQueue(
+                    pool=self.pool,
+                    keypair=self.keypair,
+                    on_status=self._report_extrinsic_status,
+                    max_workers=settings.polkadot_max_in_flight_extrinsics,
+                    block_time=settings.polkadot_block_time_seconds,
+                    submit_attempts=settings.polkadot_submit_attempts
+                )
+                if settings.polkadot_batch_enabled:
+                    self.settlement_batcher = SettlementBatcher(
+                        queue=self.extrinsic_queue,
+                        compose_call=self._compose_contract_call,
+                        window=settings.polkadot_batch_window_ms / 1000,
+                        max_size=settings.polkadot_batch_max_size
+                    )
+            
+            if connected and settings.contract_address and settings.contract_metadata_path:
+                from substrateinterface import ContractMetadata
+                with self.pool.connection() as substrate:
+                    self.contract_metadata = ContractMetadata.create_from_file(
+                        settings.contract_metadata_path, substrate
+                    )
+                    self._bound_contract_metadata[substrate] = self.contract_metadata
+                logger.info(f"Loaded contract metadata for {settings.contract_address}")
+                
+            return connected
         except Exception as e:
             logger.error(f"Failed to connect to Polkadot: {e}")
             return False
     
     def disconnect(self):
         """Disconnect from Polkadot node"""
-        if self.substrate:
-            self.substrate.close()
+        self._close_submission()
+        if self.pool:
+            self.pool.close()
+            self.pool = None
             logger.info("Disconnected from Polkadot")
+        # Calls still running finish on the old executor; later calls (and reconnects) use a fresh one
+        executor, self._executor = self._executor, self._create_executor()
+        executor.shutdown(wait=False)
+    
+    @staticmethod
+    def _create_executor() -> ThreadPoolExecutor:
+        return ThreadPoolExecutor(
+            max_workers=settings.polkadot_max_workers,
+            thread_name_prefix="polkadot"
+        )
+    
+    def _close_submission(self):
+        """Flush pending settlement batches and stop the extrinsic queue"""
+        if self.settlement_batcher:
+            self.settlement_batcher.close()
+            self.settlement_batcher = None
+        if self.extrinsic_queue:
+            self.extrinsic_queue.close()
+            self.extrinsic_queue = None
+    
+    def pool_metrics(self) -> Dict[str, Any]:
+        """Connection pool metrics"""
+        if not self.pool:
+            return {"size": 0, "healthy": 0, "in_use": 0}
+        return self.pool.metrics()
+    
+    def _create_substrate(self, url: str) -> "SubstrateInterface":
+        """Open a single substrate connection (pool factory)"""
+        from substrateinterface import SubstrateInterface
+        substrate = SubstrateInterface(
+            url=url,
+            ss58_format=42,  # Generic Substrate
+            type_registry_preset='rococo',
+            cache_region=self.metadata_cache
+        )
+        try:
+            # A first runtime load that fails halfway leaves the version set
+            # without metadata, and later calls never retry it: only hand out
+            # connections whose runtime is loaded
+            substrate.init_runtime()
+        except Exception:
+            substrate.close()
+            raise
+        return substrate
     
     def get_balance(self, address: str) -> float:
         """Get DOT balance of an address"""
+        balance = self.get_balances([address]).get(address)
+        return balance["balance"] if balance and balance["balance"] is not None else 0.0
+    
+    @metrics.timed("dependency_duration_seconds", dependency="polkadot", call="get_balances")
+    def get_balances(self, addresses: List[str]) -> Dict[str, Dict[str, Any]]:
+        """
+        Get DOT balances of many addresses
+        
+        Balances are cached per block hash: a balance read at a block never
+        changes, so entries are only dropped when the head moves. The head
+        itself is re-read at most every balance_cache_ttl_seconds, and
+        uncached addresses are read in a single query_multi at that block.
+        Returns {address: {"balance": float or None, "block_hash": str}};
+        balance is None for addresses that couldn't be read.
+        """
+        now = time.monotonic()
+        results: Dict[str, Dict[str, Any]] = {}
+        
+        with self._balance_lock:
+            head_read_at, block_hash = self._balance_head
+            if block_hash is None or now - head_read_at >= settings.balance_cache_ttl_seconds:
+                block_hash = None
+            cached = self._balance_cache.get(block_hash, {})
+            missing = []
+            for address in dict.fromkeys(addresses):
+                if address in cached:
+                    results[address] = {"balance": cached[address], "block_hash": block_hash}
+                else:
+                    missing.append(address)
+        
+        if not missing:
+            return results
+        
         try:
-            if not self.substrate:
+            from substrateinterface.storage import StorageKey
+
+            if not self.pool:
                 self.connect()
                 
-            result = self.substrate.query(
-                module='System',
-                storage_function='Account',
-                params=[address]
-            )
+            with self.pool.connection() as substrate:
+                read_head = block_hash is None
+                if read_head:
+                    block_hash = substrate.get_chain_head()
+                # RPC errors raise from here; key creation below is local
+                substrate.init_runtime(block_hash=block_hash)
+                
+                storage_keys = []
+                for address in missing:
+                    try:
+                        storage_keys.append(StorageKey.create_from_storage_function(
+                            "System", "Account", [address],
+                            runtime_config=substrate.runtime_config, metadata=substrate.metadata
+                        ))
+                    except ValueError as e:
+                        logger.warning(f"Invalid address {address}: {e}")
+                        results[address] = {"balance": None, "block_hash": block_hash}
+                
+                values = substrate.query_multi(storage_keys, block_hash=block_hash) if storage_keys else []
             
-            # Convert from Planck to DOT (1 DOT = 10^10 Planck on Rococo)
-            balance = result.value['data']['free'] / (10 ** 10)
-            return balance
+            with self._balance_lock:
+                if read_head and now >= self._balance_head[0]:
+                    # New head: balances at older blocks won't be served again
+                    self._balance_head = (now, block_hash)
+                    self._balance_cache = {block_hash: self._balance_cache.get(block_hash, {})}
+                entries = self._balance_cache.get(block_hash)
+                
+                for storage_key, result in values:
+                    address = storage_key.params[0]
+                    # Convert from Planck to DOT (1 DOT = 10^10 Planck on Rococo)
+                    balance = result.value['data']['free'] / (10 ** 10)
+                    results[address] = {"balance": balance, "block_hash": block_hash}
+                    if entries is not None and len(entries) < settings.balance_cache_max_entries:
+                        entries[address] = balance
+                    
         except Exception as e:
-            logger.error(f"Error getting balance: {e}")
-            return 0.0
+            logger.error(f"Error getting balances: {e}")
+            for address in missing:
+                results.setdefault(address, {"balance": None, "block_hash": None})
+        
+        return results
     
-    def create_order(self, dot_amount: float) -> Optional[Dict[str, Any]]:
-        """Create order on smart contract"""
+    @metrics.timed("dependency_duration_seconds", dependency="polkadot", call="create_order")
+    def create_order(self, dot_amount: float, db_order_id: Optional[int] = None) -> Optional[Dict[str, Any]]:
+        """
+        Create order on smart contract
+        
+        With a contract configured the extrinsic is only submitted here; the
+        contract order ID and inclusion status are written to the order row
+        identified by db_order_id once the extrinsic lands in a block.
+        """
         try:
-            if not self.substrate or not self.keypair:
+            if not self.is_connected or not self.keypair:
                 logger.error("Not connected or no keypair")
                 return None
             
             # Convert DOT to Planck
             amount_planck = int(dot_amount * (10 ** 10))
             
-            # Call contract (placeholder - needs actual contract instance)
-            # This is a simplified version
             logger.info(f"Creating order for {dot_amount} DOT")
             
-            # TODO: Actual contract call
-            # result = self.contract.exec(
-            #     keypair=self.keypair,
-            #     method='create_order',
-            #     args={},
-            #     value=amount_planck
-            # )
+            if self.contract_metadata and self.extrinsic_queue:
+                return self._submit_contract_call(
+                    "create_order", value=amount_planck,
+                    db_order_id=db_order_id, tx_field="escrow_tx_hash"
+                )
             
+            # No contract configured (placeholder)
             return {
                 "order_id": 1,  # Mock
                 "tx_hash": "0x123...",
@@ -99,21 +293,21 @@ class PolkadotService:
             logger.error(f"Error creating order: {e}")
             return None
     
-    def accept_order(self, order_id: int) -> Optional[Dict[str, Any]]:
+    @metrics.timed("dependency_duration_seconds", dependency="polkadot", call="accept_order")
+    def accept_order(self, order_id: int, db_order_id: Optional[int] = None) -> Optional[Dict[str, Any]]:
         """Accept order on smart contract"""
         try:
-            if not self.substrate or not self.keypair:
+            if not self.is_connected or not self.keypair:
                 return None
             
             logger.info(f"Accepting order {order_id}")
             
-            # TODO: Actual contract call
-            # result = self.contract.exec(
-            #     keypair=self.keypair,
-            #     method='accept_order',
-            #     args={'order_id': order_id}
-            # )
+            if self.contract_metadata and self.extrinsic_queue:
+                return self._submit_contract_call(
+                    "accept_order", args={"order_id": order_id}, db_order_id=db_order_id
+                )
             
+            # No contract configured (placeholder)
             return {
                 "tx_hash": "0x456...",
                 "block_number": 12346
@@ -123,21 +317,48 @@ class PolkadotService:
             logger.error(f"Error accepting order: {e}")
             return None
     
-    def complete_order(self, order_id: int) -> Optional[Dict[str, Any]]:
+    @metrics.timed("dependency_duration_seconds", dependency="polkadot", call="confirm_payment_sent")
+    def confirm_payment_sent(self, order_id: int, db_order_id: Optional[int] = None) -> Optional[Dict[str, Any]]:
+        """Mark an order's PIX payment as sent, which the contract requires before completing it"""
+        try:
+            if not self.is_connected or not self.keypair:
+                return None
+            
+            logger.info(f"Confirming payment for order {order_id}")
+            
+            if self.contract_metadata and self.extrinsic_queue:
+                # Only the order's buyer may call it: the service signer created the order
+                return self._submit_contract_call(
+                    "confirm_payment_sent", args={"order_id": order_id},
+                    db_order_id=db_order_id, tx_field="payment_tx_hash"
+                )
+            
+            # No contract configured (placeholder)
+            return {
+                "tx_hash": "0xdef...",
+                "block_number": 12347
+            }
+            
+        except Exception as e:
+            logger.error(f"Error confirming payment: {e}")
+            return None
+    
+    @metrics.timed("dependency_duration_seconds", dependency="polkadot", call="complete_order")
+    def complete_order(self, order_id: int, db_order_id: Optional[int] = None) -> Optional[Dict[str, Any]]:
         """Complete order and release funds"""
         try:
-            if not self.substrate or not self.keypair:
+            if not self.is_connected or not self.keypair:
                 return None
             
             logger.info(f"Completing order {order_id}")
             
-            # TODO: Actual contract call
-            # result = self.contract.exec(
-            #     keypair=self.keypair,
-            #     method='complete_order',
-            #     args={'order_id': order_id}
-            # )
+            if self.contract_metadata and self.extrinsic_queue:
+                return self._submit_contract_call(
+                    "complete_order", args={"order_id": order_id},
+                    db_order_id=db_order_id, tx_field="release_tx_hash"
+                )
             
+            # No contract configured (placeholder)
             return {
                 "tx_hash": "0x789...",
                 "block_number": 12347
@@ -147,16 +368,21 @@ class PolkadotService:
             logger.error(f"Error completing order: {e}")
             return None
     
-    def cancel_order(self, order_id: int) -> Optional[Dict[str, Any]]:
+    @metrics.timed("dependency_duration_seconds", dependency="polkadot", call="cancel_order")
+    def cancel_order(self, order_id: int, db_order_id: Optional[int] = None) -> Optional[Dict[str, Any]]:
         """Cancel order and refund"""
         try:
-            if not self.substrate or not self.keypair:
+            if not self.is_connected or not self.keypair:
                 return None
             
             logger.info(f"Cancelling order {order_id}")
             
-            # TODO: Actual contract call
+            if self.contract_metadata and self.extrinsic_queue:
+                return self._submit_contract_call(
+                    "cancel_order", args={"order_id": order_id}, db_order_id=db_order_id
+                )
             
+            # No contract configured (placeholder)
             return {
                 "tx_hash": "0xabc...",
                 "block_number": 12348
@@ -166,9 +392,293 @@ class PolkadotService:
             logger.error(f"Error cancelling order: {e}")
             return None
     
+    def _compose_contract_call(
+        self,
+        substrate: Any,
+        method: str,
+        args: Optional[Dict[str, Any]] = None,
+        value: int = 0,
+        block_hash: Optional[str] = None
+    ) -> Any:
+        """Build a Contracts.call for an escrow contract message"""
+        if block_hash is None:
+            substrate.init_runtime()
+            block_hash = substrate.block_hash
+        data = self._encode_message(substrate, method, args or {}, block_hash)
+        return substrate.compose_call(
+            call_module="Contracts",
+            call_function="call",
+            call_params={
+                "dest": {"Id": settings.contract_address},
+                "value": value,
+                "gas_limit": {
+                    "ref_time": settings.contract_gas_limit_ref_time,
+                    "proof_size": settings.contract_gas_limit_proof_size
+                },
+                "storage_deposit_limit": None,
+                "data": data.to_hex()
+            },
+            block_hash=block_hash
+        )
+    
+    def _encode_message(self, substrate: Any, method: str, args: Dict[str, Any], block_hash: str) -> Any:
+        """
+        ContractMetadata.generate_message_data, encoding against the given block
+        
+        The library version re-reads the chain head for every argument, a few
+        RPCs each that a batch of calls would multiply.
+        """
+        from scalecodec.base import ScaleBytes
+        contract_metadata = self._contract_metadata_for(substrate)
+        for message in contract_metadata.metadata_dict["spec"]["messages"]:
+            if message["label"] != method:
+                continue
+            data = ScaleBytes(message["selector"])
+            for arg in message["args"]:
+                if arg["label"] not in args:
+                    raise ValueError(f"Argument \"{arg['label']}\" is missing")
+                data += substrate.encode_scale(
+                    type_string=contract_metadata.get_type_string_for_metadata_type(arg["type"]["type"]),
+                    value=args[arg["label"]],
+                    block_hash=block_hash
+                )
+            return data
+        raise ValueError(f"Contract message \"{method}\" not found")
+    
+    def _submit_contract_call(
+        self,
+        method: str,
+        args: Optional[Dict[str, Any]] = None,
+        value: int = 0,
+        db_order_id: Optional[int] = None,
+        tx_field: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """
+        Hand a contract call to the pipelined extrinsic queue without waiting
+        
+        When settlement batching is enabled the call joins the next
+        Utility.batch_all instead of getting its own extrinsic. No thread
+        waits for the node: the queue writes the tx hash and status to the
+        order row identified by db_order_id as they come in. "submission"
+        is a future resolving to the SubmissionStatus once the node accepted
+        (or rejected) the extrinsic, for callers without an order row.
+        """
+        if self.settlement_batcher:
+            future = self.settlement_batcher.submit(method, args, value, db_order_id, tx_field)
+        else:
+            context = {"calls": [{"method": method, "order_id": db_order_id, "tx_field": tx_field}]}
+            future = self.extrinsic_queue.submit(
+                lambda substrate: self._compose_contract_call(substrate, method, args, value),
+                context
+            )
+        
+        return {
+            "order_id": None,  # Known once the OrderCreated event is included
+            "tx_hash": None,  # Known once the node accepted the extrinsic
+            "block_number": None,
+            "status": ExtrinsicStatus.QUEUED,
+            "submission": future
+        }
+    
+    def _contract_metadata_for(self, substrate: "SubstrateInterface") -> Any:
+        """
+        Contract metadata bound to one pooled connection
+        
+        ContractMetadata registers the contract's types in, and encodes
+        through, the connection it was created with, so each connection
+        gets its own instance instead of sharing the first one's websocket.
+        """
+        from substrateinterface import ContractMetadata
+        with self._contract_metadata_lock:
+            metadata = self._bound_contract_metadata.get(substrate)
+            if metadata is None:
+                metadata = ContractMetadata(self.contract_metadata.metadata_dict, substrate)
+                self._bound_contract_metadata[substrate] = metadata
+            return metadata
+    
+    def decode_contract_events(self, receipt: Any) -> List[Dict[str, Any]]:
+        """Decode escrow contract events emitted by an included extrinsic"""
+        if not self.contract_metadata or receipt is None:
+            return []
+        
+        contract_metadata = self._contract_metadata_for(receipt.substrate)
+        decoded = []
+        for event in receipt.triggered_events:
+            contract_event = self._decode_contract_event(receipt.substrate, contract_metadata, event)
+            if contract_event:
+                decoded.append(contract_event)
+        return decoded
+    
+    def _decode_contract_event(
+        self,
+        substrate: "SubstrateInterface",
+        contract_metadata: Any,
+        event: Any
+    ) -> Optional[Dict[str, Any]]:
+        """Decode one runtime event if it is a ContractEmitted from the escrow contract"""
+        from scalecodec.base import ScaleBytes
+        from substrateinterface import ContractEvent
+        value = event.value
+        if value["module_id"] != "Contracts" or value["event_id"] != "ContractEmitted":
+            return None
+        if value["attributes"]["contract"] != settings.contract_address:
+            return None
+        
+        # Same decoding as ContractExecutionReceipt.process_events
+        contract_data = event["event"][1][1]["data"].value_object
+        if contract_metadata.metadata_version >= 5:
+            for topic in value["topics"]:
+                event_id = contract_metadata.get_event_id_by_topic(topic)
+                if event_id is not None:
+                    contract_data = substrate.create_scale_object("U8").encode(event_id).data + contract_data
+        
+        contract_event = ContractEvent(
+            data=ScaleBytes(contract_data),
+            runtime_config=substrate.runtime_config,
+            contract_metadata=contract_metadata
+        )
+        contract_event.decode()
+        # Read args right away, ContractEvent writes values into shared metadata dicts
+        return {
+            "name": contract_event.name,
+            "args": {arg["label"]: arg["value"] for arg in contract_event.args}
+        }
+    
+    @metrics.timed("dependency_duration_seconds", dependency="polkadot", call="read_contract_order")
+    def read_contract_order(self, contract_order_id: int) -> Optional[Dict[str, Any]]:
+        """Read one order from the escrow contract's get_order message (dry run)"""
+        if not self.contract_metadata:
+            return None
+        
+        from substrateinterface import Keypair, ContractInstance
+        # Reads only need an origin address, not a signer
+        origin = self.keypair or Keypair(ss58_address=settings.contract_address)
+        with self.pool.connection() as substrate:
+            contract = ContractInstance(
+                contract_address=settings.contract_address,
+                metadata=self._contract_metadata_for(substrate),
+                substrate=substrate
+            )
+            result = contract.read(origin, "get_order", {"order_id": contract_order_id})
+        
+        data = result.value["result"]["Ok"]["data"]
+        # ink! 4 wraps message results in Result<_, LangError>
+        if isinstance(data, dict) and "Ok" in data:
+            data = data["Ok"]
+        if data is None:
+            return None
+        
+        return {
+            "id": data["id"],
+            "buyer": data["buyer"],
+            "seller": data["seller"],
+            "amount": data["amount"],
+            "lp_fee": data["lp_fee"],
+            "status": data["status"],
+        }
+    
+    @metrics.timed("dependency_duration_seconds", dependency="polkadot", call="get_escrow_states")
+    def get_escrow_states(self, contract_order_ids: List[int]) -> Dict[int, Optional[Dict[str, Any]]]:
+        """On-chain escrow state for many orders, served from the escrow cache"""
+        if not self.contract_metadata:
+            return {order_id: None for order_id in contract_order_ids}
+        return self.escrow_cache.get_many(contract_order_ids)
+    
+    @metrics.timed("dependency_duration_seconds", dependency="polkadot", call="get_finalized_head_number")
+    def get_finalized_head_number(self) -> int:
+        """Get the latest finalized block number"""
+        with self.pool.connection() as substrate:
+            return substrate.get_block_header(block_hash=substrate.get_chain_finalised_head())["header"]["number"]
+    
+    @metrics.timed("dependency_duration_seconds", dependency="polkadot", call="get_block_hash")
+    def get_block_hash(self, block_number: int) -> Optional[str]:
+        """Get the hash of a block on the current chain"""
+        with self.pool.connection() as substrate:
+            return substrate.get_block_hash(block_number)
+    
+    @metrics.timed("dependency_duration_seconds", dependency="polkadot", call="get_block_contract_events")
+    def get_block_contract_events(self, block_number: int) -> Tuple[str, List[Dict[str, Any]]]:
+        """
+        Decode escrow contract events emitted in a block
+        
+        Returns (block_hash, events) where each event is
+        {"name", "args", "event_index", "tx_hash"}.
+        """
+        with self.pool.connection() as substrate:
+            block_hash = substrate.get_block_hash(block_number)
+            block = substrate.get_block(block_hash=block_hash)
+            events = substrate.get_events(block_hash)
+            contract_metadata = self._contract_metadata_for(substrate)
+            
+            extrinsic_hashes = [
+                f"0x{extrinsic.extrinsic_hash.hex()}" if extrinsic.extrinsic_hash else None
+                for extrinsic in block["extrinsics"]
+            ]
+            
+            decoded = []
+            for event_index, event in enumerate(events):
+                contract_event = self._decode_contract_event(substrate, contract_metadata, event)
+                if not contract_event:
+                    continue
+                
+                extrinsic_idx = event.value.get("extrinsic_idx")
+                contract_event["event_index"] = event_index
+                contract_event["tx_hash"] = extrinsic_hashes[extrinsic_idx] if extrinsic_idx is not None else None
+                decoded.append(contract_event)
+        
+        return block_hash, decoded
+    
+    def _report_extrinsic_status(self, status: SubmissionStatus):
+        """Write extrinsic status back to the order rows it belongs to"""
+        calls = [call for call in status.context.get("calls", []) if call.get("order_id")]
+        if not calls:
+            return
+        
+        created_ids: List[int] = []
+        if status.status == ExtrinsicStatus.IN_BLOCK and any(call["method"] == "create_order" for call in calls):
+            created_ids = [
+                event["args"]["order_id"]
+                for event in self.decode_contract_events(status.receipt)
+                if event["name"] == "OrderCreated"
+            ]
+        
+        db = SessionLocal()
+        try:
+            for call in calls:
+                values: Dict[str, Any] = {"chain_status": status.status}
+                if call.get("tx_field") and status.status == ExtrinsicStatus.FAILED:
+                    # The call did nothing: a retry submits it again
+                    values[call["tx_field"]] = None
+                elif call.get("tx_field") and status.tx_hash:
+                    values[call["tx_field"]] = status.tx_hash
+                if call["method"] == "create_order" and created_ids:
+                    # Events are emitted in call order
+                    values["contract_order_id"] = created_ids.pop(0)
+                query = db.query(Order).filter(Order.id == call["order_id"])
+                if status.status == ExtrinsicStatus.SUBMITTED:
+                    # Reported from another thread than inclusion: never overwrite a later status
+                    query = query.filter(Order.chain_status == ExtrinsicStatus.QUEUED)
+                query.update(values, synchronize_session=False)
+                resource_versions.touch(db, call["order_id"])
+            db.commit()
+        except Exception as e:
+            logger.error(f"Error saving extrinsic status: {e}")
+            db.rollback()
+            return
+        finally:
+            db.close()
+        
+        if status.status != ExtrinsicStatus.SUBMITTED:
+            # The order task that handed the call off finishes (or fails) now
+            from app.services.order_service import order_service
+            for call in calls:
+                order_service.finish_chain_call(call["method"], call["order_id"], status.status, status.error)
+    
+    @metrics.timed("dependency_duration_seconds", dependency="polkadot", call="verify_signature")
     def verify_signature(self, wallet_address: str, message: str, signature: str) -> bool:
         """Verify wallet signature for authentication"""
         try:
+            from substrateinterface import Keypair
             keypair = Keypair(ss58_address=wallet_address)
             is_valid = keypair.verify(message, signature)
             return is_valid
@@ -176,6 +686,68 @@ class PolkadotService:
             logger.error(f"Error verifying signature: {e}")
             return False
 
+    async def get_balance_async(self, address: str) -> float:
+        """Get DOT balance of an address without blocking the event loop"""
+        balance = await self._run_async(self.get_balance, address)
+        return balance if balance is not None else 0.0
+    
+    async def get_balances_async(self, addresses: List[str]) -> Dict[str, Dict[str, Any]]:
+        """Get DOT balances of many addresses without blocking the event loop"""
+        balances = await self._run_async(self.get_balances, addresses)
+        if balances is None:
+            return {address: {"balance": None, "block_hash": None} for address in addresses}
+        return balances
+    
+    async def get_escrow_states_async(self, contract_order_ids: List[int]) -> Dict[int, Optional[Dict[str, Any]]]:
+        """On-chain escrow state for many orders without blocking the event loop"""
+        states = await self._run_async(self.get_escrow_states, contract_order_ids)
+        return states if states is not None else {order_id: None for order_id in contract_order_ids}
+    
+    async def create_order_async(self, dot_amount: float, db_order_id: Optional[int] = None) -> Optional[Dict[str, Any]]:
+        """Create order on smart contract without blocking the event loop"""
+        return await self._run_async(self.create_order, dot_amount, db_order_id)
+    
+    async def accept_order_async(self, order_id: int, db_order_id: Optional[int] = None) -> Optional[Dict[str, Any]]:
+        """Accept order on smart contract without blocking the event loop"""
+        return await self._run_async(self.accept_order, order_id, db_order_id)
+    
+    async def confirm_payment_sent_async(self, order_id: int, db_order_id: Optional[int] = None) -> Optional[Dict[str, Any]]:
+        """Confirm payment on smart contract without blocking the event loop"""
+        return await self._run_async(self.confirm_payment_sent, order_id, db_order_id)
+    
+    async def complete_order_async(self, order_id: int, db_order_id: Optional[int] = None) -> Optional[Dict[str, Any]]:
+        """Complete order on smart contract without blocking the event loop"""
+        return await self._run_async(self.complete_order, order_id, db_order_id)
+    
+    async def cancel_order_async(self, order_id: int, db_order_id: Optional[int] = None) -> Optional[Dict[str, Any]]:
+        """Cancel order on smart contract without blocking the event loop"""
+        return await self._run_async(self.cancel_order, order_id, db_order_id)
+    
+    async def _run_async(
+        self,
+        func: Callable[..., Any],
+        *args: Any,
+        timeout: Optional[float] = None
+    ) -> Any:
+        """
+        Run a blocking chain call on the Polkadot thread pool
+        
+        Returns None if the call doesn't finish within the timeout. The
+        worker thread is not interrupted, so the call may still complete
+        on chain; callers must treat a timeout as an unknown outcome.
+        """
+        loop = asyncio.get_running_loop()
+        timeout = timeout or settings.polkadot_call_timeout_seconds
+        try:
+            return await asyncio.wait_for(
+                loop.run_in_executor(self._executor, functools.partial(func, *args)),
+                timeout=timeout
+            )
+        except asyncio.TimeoutError:
+            metrics.inc("polkadot_call_timeouts_total", call=func.__name__)
+            logger.error(f"Polkadot call {func.__name__} timed out after {timeout}s")
+            return None
+
 
 # Global instance
 polkadot_service = PolkadotService()
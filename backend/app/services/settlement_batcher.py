@@ -0,0 +1,131 @@
+from concurrent.futures import Future
+from dataclasses import dataclass, field
+from typing import Optional, Dict, Any, Callable, List
+import logging
+import threading
+import time
+
+from app.services.extrinsic_queue import ExtrinsicQueue, SubmissionStatus
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class _PendingCall:
+    method: str
+    args: Dict[str, Any]
+    value: int
+    db_order_id: Optional[int]
+    tx_field: Optional[str]
+    future: Future = field(default_factory=Future)
+
+
+class SettlementBatcher:
+    """
+    Collects escrow contract calls and submits them as one Utility.batch_all
+
+    A batch is flushed when it reaches max_size or when window seconds have
+    passed since its first call. batch_all is atomic, so every call in a
+    batch shares the same tx hash and inclusion status.
+    """
+
+    def __init__(
+        self,
+        queue: ExtrinsicQueue,
+        compose_call: Callable[[Any, str, Dict[str, Any], int, Optional[str]], Any],
+        window: float = 0.5,
+        max_size: int = 50
+    ):
+        self.queue = queue
+        self.compose_call = compose_call
+        self.window = window
+        self.max_size = max_size
+
+        self._calls: List[_PendingCall] = []
+        self._first_call_at: Optional[float] = None
+        self._condition = threading.Condition()
+        self._stop = False
+        self._thread = threading.Thread(target=self._run, name="settlement-batcher", daemon=True)
+        self._thread.start()
+
+    def submit(
+        self,
+        method: str,
+        args: Optional[Dict[str, Any]] = None,
+        value: int = 0,
+        db_order_id: Optional[int] = None,
+        tx_field: Optional[str] = None
+    ) -> Future:
+        """Queue a contract call, the future resolves with the batch's SubmissionStatus"""
+        call = _PendingCall(method=method, args=args or {}, value=value, db_order_id=db_order_id, tx_field=tx_field)
+        with self._condition:
+            if not self._calls:
+                self._first_call_at = time.monotonic()
+            self._calls.append(call)
+            self._condition.notify()
+        return call.future
+
+    def close(self):
+        with self._condition:
+            self._stop = True
+            self._condition.notify()
+        self._thread.join(timeout=self.window + 1)
+
+    def _run(self):
+        while True:
+            with self._condition:
+                while not self._stop and not self._batch_ready():
+                    timeout = None
+                    if self._calls:
+                        timeout = max(0.0, self._first_call_at + self.window - time.monotonic())
+                    self._condition.wait(timeout)
+
+                batch = self._calls[:self.max_size]
+                self._calls = self._calls[self.max_size:]
+                self._first_call_at = time.monotonic() if self._calls else None
+                stopping = self._stop
+
+            if batch:
+                self._flush(batch)
+            if stopping and not self._calls:
+                return
+
+    def _batch_ready(self) -> bool:
+        if not self._calls:
+            return False
+        return len(self._calls) >= self.max_size or time.monotonic() - self._first_call_at >= self.window
+
+    def _flush(self, batch: List[_PendingCall]):
+        def build_call(substrate: Any) -> Any:
+            # Load the runtime once: composing against its block hash skips the per-call RPCs
+            substrate.init_runtime()
+            calls = [
+                self.compose_call(substrate, call.method, call.args, call.value, substrate.block_hash).value
+                for call in batch
+            ]
+            return substrate.compose_call(
+                call_module="Utility",
+                call_function="batch_all",
+                call_params={"calls": calls},
+                block_hash=substrate.block_hash
+            )
+
+        context = {
+            "calls": [
+                {"method": call.method, "order_id": call.db_order_id, "tx_field": call.tx_field}
+                for call in batch
+            ]
+        }
+        logger.info(f"Submitting settlement batch of {len(batch)} calls")
+
+        def resolve(future: Future):
+            try:
+                status: SubmissionStatus = future.result()
+            except Exception as e:
+                for call in batch:
+                    call.future.set_exception(e)
+                return
+            for call in batch:
+                call.future.set_result(status)
+
+        self.queue.submit(build_call, context).add_done_callback(resolve)
@@ -0,0 +1,242 @@
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from typing import Optional, Dict, Any, Callable, Iterator, List
+import json
+import logging
+import random
+import threading
+import time
+
+from websocket import WebSocketException
+
+logger = logging.getLogger(__name__)
+
+# Errors that mean the websocket itself is unusable (as opposed to an RPC error);
+# a socket closed mid-request surfaces as an empty, undecodable response
+CONNECTION_ERRORS = (ConnectionError, OSError, TimeoutError, WebSocketException, json.JSONDecodeError)
+
+
+class PoolUnavailableError(Exception):
+    """No healthy substrate connection could be checked out"""
+
+
+class PooledConnection:
+    """A single substrate connection owned by the pool"""
+
+    def __init__(self, index: int):
+        self.index = index
+        self.substrate: Optional[Any] = None
+        self.in_use = False
+        self.failures = 0
+        self.next_retry_at = 0.0
+        self.uses = 0
+
+    @property
+    def healthy(self) -> bool:
+        return self.substrate is not None
+
+
+class SubstratePool:
+    """
+    Pool of substrate websocket connections
+
+    Each connection serves one caller at a time; checkout picks the idle
+    healthy connection with the fewest uses. A background thread pings idle
+    connections and reconnects broken ones with exponential backoff.
+    """
+
+    def __init__(
+        self,
+        url: str,
+        factory: Callable[[str], Any],
+        size: int = 4,
+        health_interval: float = 15.0,
+        backoff_base: float = 0.5,
+        backoff_max: float = 30.0,
+        checkout_timeout: float = 10.0
+    ):
+        self.url = url
+        self.factory = factory
+        self.size = size
+        self.health_interval = health_interval
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.checkout_timeout = checkout_timeout
+
+        self._connections: List[PooledConnection] = [PooledConnection(i) for i in range(size)]
+        self._condition = threading.Condition()
+        self._stop = threading.Event()
+        # Set to run the health loop now (a connection broke, or the pool is closing)
+        self._wake = threading.Event()
+        self._health_thread: Optional[threading.Thread] = None
+        self._stats = {
+            "checkouts": 0,
+            "checkout_timeouts": 0,
+            "checkout_wait_seconds": 0.0,
+            "reconnects": 0,
+            "reconnect_failures": 0,
+            "health_check_failures": 0,
+        }
+
+    def start(self) -> bool:
+        """Open all connections (in parallel) and start health checks, True if any connected"""
+        self._stop.clear()
+        self._wake.clear()
+        with ThreadPoolExecutor(max_workers=self.size, thread_name_prefix="substrate-pool-connect") as executor:
+            list(executor.map(self._reconnect, self._connections))
+
+        self._health_thread = threading.Thread(
+            target=self._health_loop,
+            name="substrate-pool-health",
+            daemon=True
+        )
+        self._health_thread.start()
+        return self.healthy_count > 0
+
+    def close(self):
+        """Stop health checks and close all connections"""
+        self._stop.set()
+        self._wake.set()
+        # A reconnect in flight finishes (and is closed by _reconnect) before connections are closed
+        if self._health_thread and self._health_thread is not threading.current_thread():
+            self._health_thread.join()
+            self._health_thread = None
+        with self._condition:
+            for conn in self._connections:
+                self._close_connection(conn)
+            self._condition.notify_all()
+
+    @property
+    def healthy_count(self) -> int:
+        return sum(1 for conn in self._connections if conn.healthy)
+
+    @contextmanager
+    def connection(self, timeout: Optional[float] = None) -> Iterator[Any]:
+        """Check out a substrate connection for exclusive use"""
+        conn = self._checkout(self.checkout_timeout if timeout is None else timeout)
+        try:
+            yield conn.substrate
+        except CONNECTION_ERRORS as e:
+            logger.warning(f"Substrate connection {conn.index} failed: {e}")
+            self._mark_broken(conn)
+            raise
+        finally:
+            self._checkin(conn)
+
+    def metrics(self) -> Dict[str, Any]:
+        """Pool gauges and counters"""
+        with self._condition:
+            return {
+                "size": self.size,
+                "healthy": self.healthy_count,
+                "in_use": sum(1 for conn in self._connections if conn.in_use),
+                **self._stats
+            }
+
+    def _checkout(self, timeout: float) -> PooledConnection:
+        started = time.monotonic()
+        deadline = started + timeout
+        with self._condition:
+            while True:
+                idle = [conn for conn in self._connections if conn.healthy and not conn.in_use]
+                if idle:
+                    conn = min(idle, key=lambda c: c.uses)
+                    conn.in_use = True
+                    conn.uses += 1
+                    self._stats["checkouts"] += 1
+                    self._stats["checkout_wait_seconds"] += time.monotonic() - started
+                    return conn
+
+                remaining = deadline - time.monotonic()
+                if remaining <= 0 or self._stop.is_set():
+                    self._stats["checkout_timeouts"] += 1
+                    raise PoolUnavailableError(
+                        f"No healthy substrate connection available ({self.healthy_count}/{self.size} healthy)"
+                    )
+                self._condition.wait(remaining)
+
+    def _checkin(self, conn: PooledConnection):
+        with self._condition:
+            conn.in_use = False
+            self._condition.notify()
+
+    def _mark_broken(self, conn: PooledConnection):
+        with self._condition:
+            self._close_connection(conn)
+            conn.next_retry_at = time.monotonic()
+        # Reconnect right away instead of at the next health interval
+        self._wake.set()
+
+    def _close_connection(self, conn: PooledConnection):
+        if conn.substrate is not None:
+            self._close_substrate(conn.substrate)
+            conn.substrate = None
+
+    @staticmethod
+    def _close_substrate(substrate: Any):
+        try:
+            substrate.close()
+        except Exception:
+            pass
+
+    def _reconnect(self, conn: PooledConnection) -> bool:
+        """Try to (re)open a connection, scheduling the next retry on failure"""
+        try:
+            substrate = self.factory(self.url)
+        except Exception as e:
+            with self._condition:
+                conn.failures += 1
+                delay = min(self.backoff_max, self.backoff_base * (2 ** (conn.failures - 1)))
+                conn.next_retry_at = time.monotonic() + delay * random.uniform(0.5, 1.0)
+                self._stats["reconnect_failures"] += 1
+            logger.warning(f"Substrate connection {conn.index} failed to connect (attempt {conn.failures}): {e}")
+            return False
+
+        with self._condition:
+            if self._stop.is_set():
+                # The pool was closed while this connection was opening
+                self._close_substrate(substrate)
+                return False
+            conn.substrate = substrate
+            conn.failures = 0
+            conn.next_retry_at = 0.0
+            self._stats["reconnects"] += 1
+            self._condition.notify()
+        return True
+
+    def _health_loop(self):
+        while not self._stop.is_set():
+            self._run_health_checks()
+            # Wake up early while connections are waiting on backoff
+            pending = [conn.next_retry_at for conn in self._connections if not conn.healthy]
+            wait = self.health_interval
+            if pending:
+                wait = max(0.05, min(wait, min(pending) - time.monotonic()))
+            self._wake.wait(wait)
+            self._wake.clear()
+
+    def _run_health_checks(self):
+        now = time.monotonic()
+        for conn in self._connections:
+            if self._stop.is_set():
+                return
+
+            if not conn.healthy:
+                if now >= conn.next_retry_at:
+                    self._reconnect(conn)
+                continue
+
+            # Only ping idle connections, busy ones prove themselves
+            with self._condition:
+                if conn.in_use or not conn.healthy:
+                    continue
+                conn.in_use = True
+            try:
+                conn.substrate.rpc_request("system_health", [])
+            except Exception as e:
+                logger.warning(f"Substrate connection {conn.index} health check failed: {e}")
+                with self._condition:
+                    self._stats["health_check_failures"] += 1
+                self._mark_broken(conn)
+            finally:
+                self._checkin(conn)
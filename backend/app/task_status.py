@@ -0,0 +1,19 @@
+"""Order task states and names, importable without loading Celery"""
+
+
+class TaskStatus:
+    QUEUED = "queued"
+    RUNNING = "running"
+    SUCCEEDED = "succeeded"
+    FAILED = "failed"
+
+
+class TaskName:
+    CREATE_ESCROW = "orders.create_escrow"
+    ACCEPT = "orders.accept"
+    CONFIRM_PAYMENT = "orders.confirm_payment"
+    COMPLETE = "orders.complete"
+
+
+class RetryableTaskError(Exception):
+    """A side effect failed in a way worth retrying (chain or PIX unavailable)"""
@@ -0,0 +1,78 @@
+from celery import Celery, Task
+from celery.signals import worker_process_init
+from typing import Any
+import logging
+
+from app.config import settings
+from app.task_status import TaskName, RetryableTaskError
+
+logger = logging.getLogger(__name__)
+
+
+celery_app = Celery("polkapay", broker=settings.celery_broker_url)
+celery_app.conf.update(
+    task_default_queue="polkapay",
+    # Acknowledge after the task ran, so a worker crash re-delivers it
+    task_acks_late=True,
+    task_reject_on_worker_lost=True,
+    worker_prefetch_multiplier=1,
+    task_ignore_result=True,
+    task_always_eager=settings.celery_task_always_eager,
+    broker_connection_timeout=2,
+    broker_connection_retry_on_startup=True,
+    task_publish_retry_policy={"max_retries": 2, "interval_start": 0, "interval_step": 0.2, "interval_max": 0.5},
+)
+
+
+class OrderTask(Task):
+    """Order side effect with retries and backoff; marks the order failed when they run out"""
+
+    autoretry_for = (RetryableTaskError,)
+    retry_backoff = True
+    retry_backoff_max = settings.task_retry_backoff_max_seconds
+    retry_jitter = True
+    max_retries = settings.task_max_retries
+
+    def on_failure(self, exc: Exception, task_id: str, args: Any, kwargs: Any, einfo: Any):
+        from app.services.order_service import order_service
+        logger.error(f"Task {self.name} for order {args[0]} failed: {exc}")
+        order_service.fail_task(self.name, args[0], str(exc))
+
+
+# Tasks import the order service lazily: it imports this module to enqueue them
+
+@celery_app.task(base=OrderTask, name=TaskName.CREATE_ESCROW)
+def create_escrow_task(order_id: int):
+    """Lock a sell order's DOT in the escrow contract"""
+    from app.services.order_service import order_service
+    order_service.run_escrow(order_id)
+
+
+@celery_app.task(base=OrderTask, name=TaskName.ACCEPT)
+def accept_order_task(order_id: int):
+    """Accept on chain (sell) or render the PIX QR code (buy)"""
+    from app.services.order_service import order_service
+    order_service.run_acceptance(order_id)
+
+
+@celery_app.task(base=OrderTask, name=TaskName.CONFIRM_PAYMENT)
+def confirm_payment_task(order_id: int):
+    """Mark the escrow's payment as sent on chain"""
+    from app.services.order_service import order_service
+    order_service.run_payment_confirmation(order_id)
+
+
+@celery_app.task(base=OrderTask, name=TaskName.COMPLETE)
+def complete_order_task(order_id: int):
+    """Verify the PIX payment, release the escrow and complete the order"""
+    from app.services.order_service import order_service
+    order_service.run_completion(order_id)
+
+
+@worker_process_init.connect
+def _connect_worker(**kwargs: Any):
+    from app.services.polkadot_service import polkadot_service
+    if polkadot_service.connect():
+        logger.info("Worker connected to Polkadot network")
+    else:
+        logger.warning("Worker failed to connect to Polkadot network")
@@ -0,0 +1,32 @@
+"""
+Move completed and cancelled orders out of the live orders table
+
+Same job the API runs every ARCHIVE_INTERVAL_SECONDS, for a first backfill
+or a different threshold.
+
+Usage: python scripts/archive_orders.py [--older-than-days 30] [--batch-size 1000]
+"""
+import sys
+sys.path.append(".")
+
+from datetime import datetime, timedelta
+import argparse
+
+from app.config import settings
+from app.services.order_archive import OrderArchive
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Archive old completed and cancelled orders")
+    parser.add_argument("--older-than-days", type=float, default=settings.archive_after_days,
+                        help="Archive orders unchanged for this many days")
+    parser.add_argument("--batch-size", type=int, default=settings.archive_batch_size, help="Orders moved per transaction")
+    args = parser.parse_args()
+
+    archive = OrderArchive(batch_size=args.batch_size)
+    moved = archive.archive(datetime.utcnow() - timedelta(days=args.older_than_days))
+    print(f"✅ Archived {moved} orders")
+
+
+if __name__ == "__main__":
+    main()
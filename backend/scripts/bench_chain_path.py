@@ -0,0 +1,283 @@
+"""
+Benchmark the order chain path against the mock Substrate node
+
+Starts the mock node in-process and drives orders through PolkadotService:
+create -> accept -> confirm_payment_sent -> complete, waiting for each
+extrinsic's inclusion before the next step (the contract needs the order
+ID from OrderCreated). Reports throughput and p50/p99 latency per stage,
+plus escrow state and balance reads.
+
+Usage: python scripts/bench_chain_path.py [--orders 200] [--concurrency 20]
+           [--block-time 0.5] [--latency-ms 2] [--jitter-ms 1]
+           [--error-rate 0] [--drop-rate 0] [--fail-methods author_submitExtrinsic]
+           [--batch] [--reads 200]
+"""
+import sys
+sys.path.append(".")
+sys.path.append("scripts")
+
+from typing import Optional, Dict, Any, List
+import argparse
+import asyncio
+import logging
+import math
+import os
+import tempfile
+import time
+
+from substrateinterface import Keypair
+
+from app.config import settings
+from app.services.extrinsic_queue import ExtrinsicStatus, SubmissionStatus
+from app.services.polkadot_service import PolkadotService
+from mock_runtime import CONTRACT_ADDRESS
+from mock_substrate_node import MockSubstrateNode, write_contract_metadata
+
+STAGES = ["create", "accept", "confirm", "complete"]
+
+
+def percentile(values: List[float], pct: float) -> float:
+    """Nearest-rank percentile"""
+    if not values:
+        return float("nan")
+    ordered = sorted(values)
+    return ordered[max(0, min(len(ordered) - 1, math.ceil(pct / 100 * len(ordered)) - 1))]
+
+
+class InclusionTracker:
+    """Resolves waiters when the extrinsic queue reports inclusion or failure"""
+
+    def __init__(self, service: PolkadotService, loop: asyncio.AbstractEventLoop):
+        self.service = service
+        self.loop = loop
+        self._report = service.extrinsic_queue.on_status
+        self._done: Dict[str, SubmissionStatus] = {}
+        self._waiters: Dict[str, List[asyncio.Future]] = {}
+        # tx hash -> contract order IDs from OrderCreated, in emission order
+        self._created: Dict[str, List[int]] = {}
+        service.extrinsic_queue.on_status = self.on_status
+
+    def on_status(self, status: SubmissionStatus):
+        # Runs on the extrinsic tracker thread
+        self._report(status)
+        if status.status == ExtrinsicStatus.SUBMITTED or not status.tx_hash:
+            return
+        created = [
+            event["args"]["order_id"]
+            for event in self.service.decode_contract_events(status.receipt)
+            if event["name"] == "OrderCreated"
+        ] if status.status == ExtrinsicStatus.IN_BLOCK else []
+        self.loop.call_soon_threadsafe(self._resolve, status, created)
+
+    def _resolve(self, status: SubmissionStatus, created: List[int]):
+        self._done[status.tx_hash] = status
+        self._created.setdefault(status.tx_hash, []).extend(created)
+        for waiter in self._waiters.pop(status.tx_hash, []):
+            if not waiter.done():
+                waiter.set_result(status)
+
+    async def wait(self, tx_hash: str, timeout: float) -> Optional[SubmissionStatus]:
+        if tx_hash not in self._done:
+            waiter = self.loop.create_future()
+            self._waiters.setdefault(tx_hash, []).append(waiter)
+            try:
+                await asyncio.wait_for(waiter, timeout)
+            except asyncio.TimeoutError:
+                return None
+        return self._done[tx_hash]
+
+    def take_created(self, tx_hash: str) -> Optional[int]:
+        created = self._created.get(tx_hash)
+        return created.pop(0) if created else None
+
+
+class ChainPathBenchmark:
+    def __init__(self, service: PolkadotService, tracker: InclusionTracker, inclusion_timeout: float):
+        self.service = service
+        self.tracker = tracker
+        self.inclusion_timeout = inclusion_timeout
+        self.submitted: Dict[str, List[float]] = {stage: [] for stage in STAGES}
+        self.included: Dict[str, List[float]] = {stage: [] for stage in STAGES}
+        self.failures: Dict[str, int] = {stage: 0 for stage in STAGES}
+        self.order_latency: List[float] = []
+        self.contract_order_ids: List[int] = []
+
+    async def run_order(self, semaphore: asyncio.Semaphore, dot_amount: float):
+        async with semaphore:
+            started = time.perf_counter()
+            contract_order_id = None
+            for stage in STAGES:
+                stage_started = time.perf_counter()
+                result = await self._submit(stage, dot_amount, contract_order_id)
+                if not result:
+                    self.failures[stage] += 1
+                    return
+                # Calls are handed off without waiting: the node's answer arrives on this future
+                submission = await asyncio.wrap_future(result["submission"])
+                if not submission.tx_hash:
+                    self.failures[stage] += 1
+                    return
+                self.submitted[stage].append(time.perf_counter() - stage_started)
+
+                status = await self.tracker.wait(submission.tx_hash, self.inclusion_timeout)
+                if not status or status.status != ExtrinsicStatus.IN_BLOCK:
+                    self.failures[stage] += 1
+                    return
+                self.included[stage].append(time.perf_counter() - stage_started)
+
+                if stage == "create":
+                    contract_order_id = self.tracker.take_created(submission.tx_hash)
+                    if contract_order_id is None:
+                        self.failures[stage] += 1
+                        return
+                    self.contract_order_ids.append(contract_order_id)
+
+            self.order_latency.append(time.perf_counter() - started)
+
+    async def _submit(self, stage: str, dot_amount: float, contract_order_id: Optional[int]) -> Optional[Dict[str, Any]]:
+        if stage == "create":
+            return await self.service.create_order_async(dot_amount)
+        if stage == "accept":
+            return await self.service.accept_order_async(contract_order_id)
+        if stage == "confirm":
+            return await self.service.confirm_payment_sent_async(contract_order_id)
+        return await self.service.complete_order_async(contract_order_id)
+
+
+async def bench_reads(service: PolkadotService, contract_order_ids: List[int], reads: int, concurrency: int) -> Dict[str, List[float]]:
+    """Time uncached escrow state reads and balance reads"""
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies: Dict[str, List[float]] = {"escrow_state": [], "balance": []}
+    addresses = [Keypair.create_from_uri(f"//Bench{i}").ss58_address for i in range(min(reads, 50))]
+
+    async def timed(kind: str, call):
+        async with semaphore:
+            started = time.perf_counter()
+            await call
+            latencies[kind].append(time.perf_counter() - started)
+
+    tasks = []
+    for i in range(reads):
+        if contract_order_ids:
+            order_id = contract_order_ids[i % len(contract_order_ids)]
+            service.escrow_cache.invalidate(order_id)
+            tasks.append(timed("escrow_state", service.get_escrow_states_async([order_id])))
+        # Skip the balance cache so every read goes to the node
+        service._balance_cache.clear()
+        tasks.append(timed("balance", service.get_balances_async([addresses[i % len(addresses)]])))
+    await asyncio.gather(*tasks)
+    return latencies
+
+
+def print_latencies(label: str, values: List[float]):
+    print(
+        f"  {label:<22} n={len(values):<6} "
+        f"p50 {percentile(values, 50) * 1000:8.1f} ms   p99 {percentile(values, 99) * 1000:8.1f} ms"
+    )
+
+
+async def run(args: argparse.Namespace, service: PolkadotService, node: MockSubstrateNode):
+    tracker = InclusionTracker(service, asyncio.get_running_loop())
+    benchmark = ChainPathBenchmark(service, tracker, inclusion_timeout=args.block_time * 20 + 10)
+    semaphore = asyncio.Semaphore(args.concurrency)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(benchmark.run_order(semaphore, args.dot_amount) for _ in range(args.orders)))
+    elapsed = time.perf_counter() - started
+
+    completed = len(benchmark.order_latency)
+    extrinsics = sum(len(values) for values in benchmark.included.values())
+    print(f"Orders: {completed} completed, {args.orders - completed} failed in {elapsed:.1f}s")
+    print(f"Throughput: {completed / elapsed:.2f} orders/s, {extrinsics / elapsed:.2f} included calls/s")
+    print("Submit latency (accepted by node):")
+    for stage in STAGES:
+        print_latencies(stage, benchmark.submitted[stage])
+    print("Inclusion latency (submit to in-block report):")
+    for stage in STAGES:
+        print_latencies(stage, benchmark.included[stage])
+    print_latencies("order end-to-end", benchmark.order_latency)
+    failures = {stage: count for stage, count in benchmark.failures.items() if count}
+    if failures:
+        print(f"Failures by stage: {failures}")
+
+    if args.reads:
+        started = time.perf_counter()
+        latencies = await bench_reads(service, benchmark.contract_order_ids, args.reads, args.concurrency)
+        elapsed = time.perf_counter() - started
+        total = sum(len(values) for values in latencies.values())
+        print(f"Reads: {total} in {elapsed:.1f}s ({total / elapsed:.1f}/s)")
+        for kind, values in latencies.items():
+            if values:
+                print_latencies(kind, values)
+
+    stats = node.stats()
+    print(
+        f"Mock node: {stats['blocks']} blocks, {stats['extrinsics']} extrinsics, {stats['requests']} requests, "
+        f"{stats['injected_errors']} injected errors, {stats['dropped_connections']} dropped connections"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the order chain path against a mock node")
+    parser.add_argument("--orders", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=20, help="Orders in flight at once")
+    parser.add_argument("--dot-amount", type=float, default=1.0)
+    parser.add_argument("--block-time", type=float, default=0.5)
+    parser.add_argument("--latency-ms", type=float, default=2.0)
+    parser.add_argument("--jitter-ms", type=float, default=1.0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--drop-rate", type=float, default=0.0)
+    parser.add_argument("--fail-methods", help="Comma separated RPC methods errors and drops apply to (default: all)")
+    parser.add_argument("--batch", action="store_true", help="Enable settlement batching (Utility.batch_all)")
+    parser.add_argument("--reads", type=int, default=200, help="Escrow state and balance reads after the orders")
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.WARNING)
+
+    node = MockSubstrateNode(
+        block_time=args.block_time,
+        latency_ms=args.latency_ms,
+        jitter_ms=args.jitter_ms,
+        fail_methods=set(args.fail_methods.split(",")) if args.fail_methods else None,
+        seed=args.seed
+    )
+    url = node.start()
+
+    # Settings are read when the service connects
+    settings.polkadot_node_url = url
+    settings.polkadot_block_time_seconds = args.block_time
+    settings.signer_seed = "//Alice"
+    settings.contract_address = CONTRACT_ADDRESS
+    settings.contract_metadata_path = write_contract_metadata(
+        os.path.join(tempfile.mkdtemp(prefix="mock-contract-"), "metadata.json")
+    )
+    settings.polkadot_batch_enabled = args.batch
+    # Every run gets a new port, so a disk cache would only collect garbage
+    settings.metadata_cache_enabled = False
+
+    print(
+        f"Mock node: {url} (block time {args.block_time}s, latency {args.latency_ms}±{args.jitter_ms} ms, "
+        f"error rate {args.error_rate:.1%}, drop rate {args.drop_rate:.1%})"
+    )
+    print(
+        f"Service: pool {settings.polkadot_pool_size}, in-flight {settings.polkadot_max_in_flight_extrinsics}, "
+        f"batching {'on' if args.batch else 'off'}; {args.orders} orders, concurrency {args.concurrency}"
+    )
+
+    service = PolkadotService()
+    try:
+        if not service.connect() or not service.contract_metadata:
+            print("❌ Could not connect to the mock node")
+            sys.exit(1)
+        # Inject failures only once connected, startup isn't what's measured
+        node.error_rate = args.error_rate
+        node.drop_rate = args.drop_rate
+        asyncio.run(run(args, service, node))
+    finally:
+        service.disconnect()
+        node.stop()
+
+
+if __name__ == "__main__":
+    main()
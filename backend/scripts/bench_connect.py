@@ -0,0 +1,58 @@
+"""
+Benchmark PolkadotService connect time with a cold and a warm metadata cache
+
+Usage: python scripts/bench_connect.py [--runs 3]
+Point POLKADOT_NODE_URL at the node to measure (e.g. the mock node).
+"""
+import sys
+sys.path.append(".")
+
+import argparse
+import logging
+import shutil
+import statistics
+import time
+
+from app.config import settings
+from app.services.polkadot_service import PolkadotService
+
+
+def measure_connect() -> float:
+    """Time a fresh service until its first connection has loaded metadata"""
+    service = PolkadotService()
+    started = time.perf_counter()
+    try:
+        if not service.connect():
+            raise RuntimeError(f"Could not connect to {settings.polkadot_node_url}")
+        with service.pool.connection() as substrate:
+            substrate.init_runtime()
+        return time.perf_counter() - started
+    finally:
+        service.disconnect()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark Polkadot connect time")
+    parser.add_argument("--runs", type=int, default=3)
+    args = parser.parse_args()
+    
+    logging.basicConfig(level=logging.WARNING)
+    
+    cold = []
+    for _ in range(args.runs):
+        shutil.rmtree(settings.metadata_cache_dir, ignore_errors=True)
+        cold.append(measure_connect())
+    
+    # The last cold run left a populated cache behind
+    warm = [measure_connect() for _ in range(args.runs)]
+    
+    cold_median = statistics.median(cold)
+    warm_median = statistics.median(warm)
+    print(f"Node: {settings.polkadot_node_url} (pool size {settings.polkadot_pool_size})")
+    print(f"Cold connect: {cold_median * 1000:.0f} ms (median of {args.runs})")
+    print(f"Warm connect: {warm_median * 1000:.0f} ms (median of {args.runs})")
+    print(f"Speedup: {cold_median / warm_median:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
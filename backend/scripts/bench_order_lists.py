@@ -0,0 +1,100 @@
+"""
+Benchmark order list serialization, Pydantic response_model vs orjson rows
+
+Serves the active order book both ways from one app:
+- before: ORM objects validated through response_model=List[OrderResponse]
+  and encoded by FastAPI's stdlib JSON path
+- after: column tuples encoded with orjson (app.serialization)
+
+Runs against a temporary SQLite database seeded with --orders pending
+orders (scripts/generate_data.py), checks both bodies decode to the same JSON, and prints rows per
+second for each path.
+
+Usage: python scripts/bench_order_lists.py [--orders 20000] [--runs 5]
+"""
+import sys
+sys.path.append(".")
+
+from typing import Callable, List
+import argparse
+import json
+import os
+import statistics
+import tempfile
+import time
+
+
+def seed(count: int):
+    sys.path.append("scripts")
+    from generate_data import DataGenerator
+
+    DataGenerator(users=1000, pending=count, workers=2).run()
+
+
+def build_app():
+    from fastapi import FastAPI, Depends
+    from sqlalchemy.orm import Session
+    from app.database import get_db
+    from app.schemas import OrderResponse
+    from app.serialization import order_list_response
+    from app.services.order_service import order_service
+
+    app = FastAPI()
+
+    @app.get("/before", response_model=List[OrderResponse])
+    def before(db: Session = Depends(get_db)):
+        return order_service.get_active_orders(db)
+
+    @app.get("/after", response_model=List[OrderResponse])
+    def after(db: Session = Depends(get_db)):
+        return order_list_response(order_service.active_orders_query(db))
+
+    return app
+
+
+def measure(get: Callable[[], bytes], runs: int) -> List[float]:
+    timings = []
+    for _ in range(runs):
+        started = time.perf_counter()
+        get()
+        timings.append(time.perf_counter() - started)
+    return timings
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark order list serialization")
+    parser.add_argument("--orders", type=int, default=20000, help="Pending orders to serve")
+    parser.add_argument("--runs", type=int, default=5, help="Requests per path")
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix="polkapay-bench-")
+    os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(workdir, 'bench.db')}"
+    os.environ.setdefault("DEBUG", "False")
+
+    from fastapi.testclient import TestClient
+    from app.migrations import upgrade_schema
+
+    print(f"🗄️  Seeding {args.orders} pending orders...")
+    upgrade_schema()
+    seed(args.orders)
+
+    client = TestClient(build_app())
+    before = client.get("/before").content
+    after = client.get("/after").content
+    if json.loads(before) != json.loads(after):
+        print("❌ Responses differ")
+        sys.exit(1)
+    print(f"✅ Same JSON from both paths ({len(after) / 1e6:.1f} MB)")
+
+    print(f"\n{'path':<8} {'median ms':>10} {'rows/s':>12}")
+    medians = {}
+    for path in ("before", "after"):
+        timings = measure(lambda: client.get(f"/{path}").content, args.runs)
+        medians[path] = statistics.median(timings)
+        print(f"{path:<8} {medians[path] * 1000:>10.1f} {args.orders / medians[path]:>12,.0f}")
+
+    print(f"\n⚡ Speedup: {medians['before'] / medians['after']:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
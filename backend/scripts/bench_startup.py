@@ -0,0 +1,146 @@
+"""
+Benchmark backend startup time against a budget
+
+Measures, each in a fresh interpreter:
+- import time of app.main, and which heavy libraries it loaded eagerly
+- time until uvicorn answers /health
+- time until /health reports ready (schema current, Polkadot connected)
+
+The server runs on a temporary SQLite database migrated with Alembic and
+a mock Substrate node, so no external services are needed. Exits with
+status 1 when a median exceeds its budget.
+
+Usage: python scripts/bench_startup.py [--runs 5] [--import-budget-ms 1500]
+           [--serve-budget-ms 3000] [--ready-budget-ms 5000]
+"""
+import sys
+sys.path.append(".")
+sys.path.append("scripts")
+
+from typing import Dict, List, Optional
+import argparse
+import json
+import os
+import socket
+import statistics
+import subprocess
+import tempfile
+import time
+import urllib.request
+
+from mock_substrate_node import MockSubstrateNode
+
+# Libraries that should only load on first use
+LAZY_MODULES = ["substrateinterface", "scalecodec", "qrcode", "PIL", "httpx", "alembic", "numpy", "celery"]
+
+IMPORT_PROBE = """
+import json, sys, time
+started = time.perf_counter()
+import app.main
+elapsed = time.perf_counter() - started
+print(json.dumps({"seconds": elapsed, "loaded": [m for m in %r if m in sys.modules]}))
+""" % (LAZY_MODULES,)
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def measure_import(env: Dict[str, str]) -> Dict[str, object]:
+    output = subprocess.run(
+        [sys.executable, "-c", IMPORT_PROBE], env=env, capture_output=True, text=True, check=True
+    ).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def get_health(port: int) -> Optional[Dict[str, object]]:
+    try:
+        with urllib.request.urlopen(f"http://127.0.0.1:{port}/health", timeout=1) as response:
+            return json.loads(response.read())
+    except OSError:
+        return None
+
+
+def measure_server(env: Dict[str, str], timeout: float) -> Dict[str, Optional[float]]:
+    """Start uvicorn and time the first /health answer and readiness"""
+    port = free_port()
+    started = time.perf_counter()
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app.main:app", "--port", str(port), "--log-level", "warning"],
+        env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+    )
+    serving = ready = None
+    try:
+        while time.perf_counter() - started < timeout and ready is None:
+            health = get_health(port)
+            if health is not None:
+                now = time.perf_counter() - started
+                serving = serving if serving is not None else now
+                if health.get("ready"):
+                    ready = now
+            time.sleep(0.01)
+    finally:
+        server.terminate()
+        server.wait()
+    return {"serving": serving, "ready": ready}
+
+
+def report(label: str, values: List[Optional[float]], budget_ms: float) -> bool:
+    measured = [value for value in values if value is not None]
+    if len(measured) < len(values):
+        print(f"❌ {label}: {len(values) - len(measured)} of {len(values)} runs timed out")
+        return False
+    median_ms = statistics.median(measured) * 1000
+    ok = median_ms <= budget_ms
+    print(
+        f"{'✅' if ok else '❌'} {label}: median {median_ms:.0f} ms, "
+        f"max {max(measured) * 1000:.0f} ms (budget {budget_ms:.0f} ms)"
+    )
+    return ok
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark backend startup time")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--import-budget-ms", type=float, default=1500)
+    parser.add_argument("--serve-budget-ms", type=float, default=3000)
+    parser.add_argument("--ready-budget-ms", type=float, default=5000)
+    parser.add_argument("--timeout", type=float, default=30, help="Seconds to wait for one server to become ready")
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix="bench-startup-")
+    node = MockSubstrateNode(block_time=1.0)
+    env = dict(
+        os.environ,
+        DATABASE_URL=f"sqlite:///{os.path.join(workdir, 'startup.db')}",
+        DEBUG="False",
+        POLKADOT_NODE_URL=node.start(),
+        METADATA_CACHE_DIR=os.path.join(workdir, "metadata"),
+        INDEXER_ENABLED="False"
+    )
+
+    try:
+        subprocess.run(
+            [sys.executable, "-m", "alembic", "upgrade", "head"], env=env, check=True, capture_output=True
+        )
+
+        imports = [measure_import(env) for _ in range(args.runs)]
+        servers = [measure_server(env, args.timeout) for _ in range(args.runs)]
+    finally:
+        node.stop()
+
+    print(f"Startup over {args.runs} runs (Python {sys.version.split()[0]})")
+    ok = report("import app.main", [run["seconds"] for run in imports], args.import_budget_ms)
+    ok = report("serving /health", [run["serving"] for run in servers], args.serve_budget_ms) and ok
+    ok = report("ready", [run["ready"] for run in servers], args.ready_budget_ms) and ok
+
+    eager = sorted({module for run in imports for module in run["loaded"]})
+    if eager:
+        print(f"ℹ️  Loaded eagerly by import: {', '.join(eager)}")
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,398 @@
+"""
+Generate synthetic users, LPs, orders and LP ledger entries at scale
+
+Shared fixture for the performance benchmarks. Values are drawn with NumPy
+from distributions shaped like real traffic:
+- order volume grows over --days and follows the Brazilian day
+- amounts are log-normal
+- a few heavy users and LPs place most orders
+- statuses and lifecycle timestamps depend on each order's age
+--pending adds open orders from the last 15 minutes on top (order book depth).
+
+Rows are generated in chunks by a process pool, each chunk seeded from
+--seed and its position: the same options give the same rows whatever
+--workers is (timestamps are relative to --now). PostgreSQL chunks are
+loaded by the workers with COPY. SQLite has a single writer, so the
+workers hand their rows to this process, which inserts them with
+executemany. IDs continue from each table's current maximum, so data can
+be added to an existing database.
+
+Usage:
+    python scripts/generate_data.py --users 200000 --lps 20000 --orders 5000000 --workers 8
+    python scripts/generate_data.py --users 1000 --pending 20000 --now 2026-01-01T12:00:00
+"""
+import sys
+sys.path.append(".")
+
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from typing import Optional, Dict, Any, List, Tuple
+import argparse
+import csv
+import hashlib
+import io
+import time
+
+import numpy as np
+from sqlalchemy import func
+
+from app.config import settings
+from app.database import engine, SessionLocal
+from app.models import User, LiquidityProvider, Order
+
+BASE58 = "123456789ABCDEFGHJKLMNPQRSTUVWXYZabcdefghijkmnopqrstuvwxyz"
+
+USER_COLUMNS = (
+    "id", "wallet_address", "buy_limit_usd", "buy_orders_per_day", "sell_limit_usd", "sell_orders_per_day",
+    "total_orders", "successful_orders", "rating", "is_verified", "verification_level", "created_at",
+)
+LP_COLUMNS = (
+    "id", "user_id", "pix_key", "pix_key_type", "total_orders_processed", "total_volume_usd",
+    "total_earnings_usd", "rating", "is_active", "is_available", "max_order_size_usd", "min_order_size_usd",
+    "created_at",
+)
+ORDER_COLUMNS = (
+    "id", "order_type", "status", "dot_amount", "brl_amount", "usd_amount", "exchange_rate_dot_brl",
+    "lp_fee_amount", "user_id", "lp_id", "pix_key", "pix_txid", "contract_order_id", "escrow_tx_hash",
+    "release_tx_hash", "chain_status", "task_status", "created_at", "accepted_at", "payment_sent_at",
+    "completed_at", "expires_at", "updated_at",
+)
+LEDGER_COLUMNS = ("lp_id", "order_id", "volume_usd", "earnings_usd", "occurred_at")
+COLUMNS = {
+    "users": USER_COLUMNS,
+    "liquidity_providers": LP_COLUMNS,
+    "orders": ORDER_COLUMNS,
+    "lp_ledger": LEDGER_COLUMNS,
+}
+
+# Share of orders per UTC hour: busy from late morning to night in Brasília (UTC-3)
+HOURLY_WEIGHTS = np.array([
+    6, 4, 3, 2, 1, 1, 1, 1, 1, 2, 3, 4, 6, 7, 8, 8, 8, 8, 8, 8, 8, 9, 9, 8
+], dtype=np.float64)
+HOURLY_WEIGHTS /= HOURLY_WEIGHTS.sum()
+
+# Verification level: (share, buy limit, buy orders/day, sell limit, sell orders/day)
+LEVELS = (
+    (0.70, settings.default_buy_limit_usd, settings.default_buy_orders_per_day,
+     settings.default_sell_limit_usd, settings.default_sell_orders_per_day),
+    (0.25, 500.0, 5, 2000.0, 20),
+    (0.05, 5000.0, 20, 20000.0, 50),
+)
+PIX_KEY_TYPES = (("email", 0.4), ("cpf", 0.3), ("phone", 0.2), ("random", 0.1))
+
+MINUTE_US = 60 * 1_000_000
+DAY_US = 24 * 60 * MINUTE_US
+BOOK_WINDOW_US = 15 * MINUTE_US
+
+
+def _wallet(seed: int, user_id: int) -> str:
+    """SS58-looking address, unique per user ID"""
+    value = int.from_bytes(hashlib.blake2b(f"{seed}:{user_id}".encode(), digest_size=34).digest(), "big")
+    chars = []
+    while value:
+        value, digit = divmod(value, 58)
+        chars.append(BASE58[digit])
+    return "5" + "".join(reversed(chars))[:47].rjust(47, "1")
+
+
+def _timestamps(values: np.ndarray) -> List[Optional[str]]:
+    """Epoch microseconds (-1 for none) as SQLAlchemy's naive timestamp text"""
+    text = np.char.replace(np.datetime_as_string(values.astype("datetime64[us]"), unit="us"), "T", " ")
+    return [None if value < 0 else stamp for value, stamp in zip(values.tolist(), text.tolist())]
+
+
+def _skewed(rng: np.random.Generator, count: int, size: int, power: float) -> np.ndarray:
+    """Indexes in [0, size) where low indexes are drawn far more often"""
+    return np.minimum((size * rng.random(count) ** power).astype(np.int64), size - 1)
+
+
+def _users(rng: np.random.Generator, start: int, count: int, cfg: Dict[str, Any]) -> Dict[str, List[Tuple]]:
+    ids = np.arange(start, start + count)
+    level = rng.choice(len(LEVELS), size=count, p=[level[0] for level in LEVELS])
+    created = cfg["now"] - (cfg["days"] * DAY_US * np.sqrt(rng.random(count))).astype(np.int64)
+    rating = np.round(np.clip(rng.normal(4.7, 0.3, count), 1.0, 5.0), 2)
+    rows = [
+        (user_id, _wallet(cfg["seed"], user_id), *LEVELS[lv][1:], 0, 0, rt, lv > 0, lv, ts)
+        for user_id, lv, rt, ts in zip(ids.tolist(), level.tolist(), rating.tolist(), _timestamps(created))
+    ]
+    return {"users": rows}
+
+
+def _lps(rng: np.random.Generator, start: int, count: int, cfg: Dict[str, Any]) -> Dict[str, List[Tuple]]:
+    # One LP per user, taken from the first users
+    ids = np.arange(start, start + count)
+    user_ids = cfg["user_offset"] + 1 + (ids - cfg["lp_offset"] - 1)
+    key_types = rng.choice([kind for kind, _ in PIX_KEY_TYPES], size=count, p=[share for _, share in PIX_KEY_TYPES])
+    min_size = rng.choice([1.0, 5.0, 10.0, 20.0], size=count, p=[0.5, 0.2, 0.2, 0.1])
+    max_size = rng.choice([200.0, 500.0, 1000.0, 2000.0, 5000.0], size=count, p=[0.2, 0.3, 0.3, 0.15, 0.05])
+    active = rng.random(count) < 0.95
+    available = active & (rng.random(count) < 0.7)
+    rating = np.round(np.clip(rng.normal(4.8, 0.2, count), 1.0, 5.0), 2)
+    created = cfg["now"] - (cfg["days"] * DAY_US * rng.random(count)).astype(np.int64)
+    rows = [
+        (lp_id, user_id, f"lp{lp_id}@pix.example" if kind == "email" else f"{kind}-{lp_id:011d}", kind,
+         0, 0.0, 0.0, rt, act, av, mx, mn, ts)
+        for lp_id, user_id, kind, rt, act, av, mx, mn, ts in zip(
+            ids.tolist(), user_ids.tolist(), key_types.tolist(), rating.tolist(), active.tolist(),
+            available.tolist(), max_size.tolist(), min_size.tolist(), _timestamps(created)
+        )
+    ]
+    return {"liquidity_providers": rows}
+
+
+def _orders(rng: np.random.Generator, start: int, count: int, cfg: Dict[str, Any]) -> Dict[str, List[Tuple]]:
+    now = cfg["now"]
+    ids = np.arange(start, start + count)
+
+    if cfg.get("pending"):
+        created = now - (BOOK_WINDOW_US * rng.random(count)).astype(np.int64)
+    else:
+        # Volume grows over the period (density rising linearly), spread over the day by HOURLY_WEIGHTS
+        days_ago = np.where(rng.random(count) < 0.3, rng.random(count), np.sqrt(rng.random(count)))
+        day = (cfg["days"] * (1 - days_ago)).astype(np.int64)
+        hour = rng.choice(24, size=count, p=HOURLY_WEIGHTS)
+        midnight = now - now % DAY_US
+        created = midnight - day * DAY_US + hour * 60 * MINUTE_US + (60 * MINUTE_US * rng.random(count)).astype(np.int64)
+        created = np.minimum(created, now - 1)
+    age = now - created
+
+    sell = rng.random(count) < 0.45
+    usd = np.round(np.clip(rng.lognormal(np.log(40.0), 1.0, count), 1.0, 5000.0), 2)
+    # DOT drifts around $7 over a 90 day cycle, BRL around 5 per USD
+    dot_usd = 7.0 * (1 + 0.15 * np.sin(2 * np.pi * created / (90 * DAY_US)))
+    dot_brl = np.round(dot_usd * (5.0 + 0.2 * np.sin(2 * np.pi * created / (30 * DAY_US))), 4)
+    dot = np.round(usd / dot_usd, 6)
+    brl = np.round(dot * dot_brl, 2)
+    fee = np.round(brl * settings.lp_fee_percentage / 100, 2)
+    user_ids = cfg["user_offset"] + 1 + _skewed(rng, count, cfg["users"], 2.5)
+
+    # Statuses by age: the book is recent, older orders have settled
+    draw = rng.random(count)
+    status = np.full(count, "COMPLETED", dtype=object)
+    if cfg.get("pending"):
+        status[:] = "PENDING"
+    else:
+        fresh = age < BOOK_WINDOW_US
+        recent = ~fresh & (age < 60 * MINUTE_US)
+        old = age >= 60 * MINUTE_US
+        status[fresh & (draw < 0.60)] = "PENDING"
+        status[fresh & (draw >= 0.60) & (draw < 0.85)] = "ACCEPTED"
+        status[fresh & (draw >= 0.85)] = "PAYMENT_SENT"
+        status[recent & (draw < 0.10)] = "PENDING"
+        status[recent & (draw >= 0.10) & (draw < 0.20)] = "ACCEPTED"
+        status[recent & (draw >= 0.20) & (draw < 0.30)] = "PAYMENT_SENT"
+        status[recent & (draw >= 0.95)] = "CANCELLED"
+        status[old & (draw >= 0.88) & (draw < 0.98)] = "CANCELLED"
+        status[old & (draw >= 0.98)] = "DISPUTED"
+
+    # Lifecycle: accept ~1.5 min, pay ~4 min, release ~2 min; half the cancellations were never accepted
+    accepted = created + rng.exponential(90e6, count).astype(np.int64)
+    paid = accepted + rng.exponential(240e6, count).astype(np.int64)
+    completed = paid + rng.exponential(120e6, count).astype(np.int64)
+    was_accepted = (status != "PENDING") & ~((status == "CANCELLED") & (rng.random(count) < 0.5))
+    was_paid = np.isin(status, ("PAYMENT_SENT", "COMPLETED", "DISPUTED"))
+    is_completed = status == "COMPLETED"
+    accepted = np.where(was_accepted, np.minimum(accepted, now), -1)
+    paid = np.where(was_paid, np.minimum(paid, now), -1)
+    completed = np.where(is_completed, np.minimum(completed, now), -1)
+    cancelled = np.minimum(np.maximum(created, accepted) + rng.exponential(600e6, count).astype(np.int64), now)
+    updated = np.maximum.reduce([created, accepted, paid, completed])
+    updated = np.where(status == "CANCELLED", cancelled, updated)
+
+    lp_ids = np.where(was_accepted, cfg["lp_offset"] + 1 + _skewed(rng, count, max(cfg["lps"], 1), 3.0), -1)
+    if not cfg["lps"]:
+        lp_ids[:] = -1
+
+    created_text, accepted_text, paid_text, completed_text, expires_text, updated_text = (
+        _timestamps(created), _timestamps(accepted), _timestamps(paid), _timestamps(completed),
+        _timestamps(created + BOOK_WINDOW_US), _timestamps(updated)
+    )
+    rows = []
+    ledger = []
+    for i, order_id in enumerate(ids.tolist()):
+        is_sell = bool(sell[i])
+        st = status[i]
+        lp_id = int(lp_ids[i]) if lp_ids[i] >= 0 else None
+        rows.append((
+            order_id, "SELL" if is_sell else "BUY", st, float(dot[i]), float(brl[i]), float(usd[i]),
+            float(dot_brl[i]), float(fee[i]), int(user_ids[i]), lp_id,
+            f"{int(user_ids[i])}@pix.example" if is_sell else None,
+            f"SYN{order_id:022d}" if paid[i] >= 0 else None,
+            order_id if is_sell else None,
+            f"0x{order_id:064x}" if is_sell else None,
+            f"0x{order_id:063x}f" if is_sell and st == "COMPLETED" else None,
+            "in_block" if is_sell else None,
+            "succeeded" if st != "PENDING" or is_sell else None,
+            created_text[i], accepted_text[i], paid_text[i], completed_text[i], expires_text[i], updated_text[i],
+        ))
+        if st == "COMPLETED" and lp_id is not None:
+            # Same earnings formula as LPEarningsService.record_completion
+            earnings = float(fee[i]) * float(usd[i]) / float(brl[i]) if brl[i] else 0.0
+            ledger.append((lp_id, order_id, float(usd[i]), round(earnings, 8), completed_text[i]))
+    return {"orders": rows, "lp_ledger": ledger}
+
+
+GENERATORS = {"users": _users, "liquidity_providers": _lps, "orders": _orders}
+
+
+def _init_worker():
+    # Connections inherited from the parent process must not be reused
+    engine.dispose(close=False)
+
+
+def _copy(tables: Dict[str, List[Tuple]]):
+    """Load rows with COPY (PostgreSQL), one transaction per chunk"""
+    connection = engine.raw_connection()
+    try:
+        cursor = connection.cursor()
+        for table, rows in tables.items():
+            if not rows:
+                continue
+            buffer = io.StringIO()
+            csv.writer(buffer).writerows(rows)
+            buffer.seek(0)
+            cursor.copy_expert(f"COPY {table} ({', '.join(COLUMNS[table])}) FROM STDIN WITH (FORMAT csv)", buffer)
+        connection.commit()
+    finally:
+        connection.close()
+
+
+def _insert(tables: Dict[str, List[Tuple]]):
+    """Load rows with executemany (SQLite), one transaction per chunk"""
+    with engine.begin() as conn:
+        for table, rows in tables.items():
+            if rows:
+                columns = COLUMNS[table]
+                conn.exec_driver_sql(
+                    f"INSERT INTO {table} ({', '.join(columns)}) VALUES ({', '.join('?' * len(columns))})", rows
+                )
+
+
+def _run_chunk(job: Tuple[str, int, int, int, Dict[str, Any]]) -> Any:
+    kind, index, start, count, cfg = job
+    rng = np.random.default_rng([cfg["seed"], list(GENERATORS).index(kind), index, int(bool(cfg.get("pending")))])
+    tables = GENERATORS[kind](rng, start, count, cfg)
+    if cfg["copy"]:
+        _copy(tables)
+        return {table: len(rows) for table, rows in tables.items()}
+    return tables
+
+
+class DataGenerator:
+    """Bulk-load synthetic data; see the module docstring for the distributions"""
+
+    def __init__(
+        self,
+        users: int,
+        lps: int = 0,
+        orders: int = 0,
+        pending: int = 0,
+        days: int = 180,
+        seed: int = 0,
+        workers: int = 4,
+        chunk_size: int = 50000,
+        now: Optional[datetime] = None
+    ):
+        if lps > users:
+            raise ValueError("Every LP needs its own user: --lps can't exceed --users")
+        self.users = users
+        self.lps = lps
+        self.orders = orders
+        self.pending = pending
+        self.days = days
+        self.seed = seed
+        self.workers = workers
+        self.chunk_size = chunk_size
+        self.now = now or datetime.utcnow()
+
+    def run(self) -> Dict[str, int]:
+        """Generate and load everything, returns rows loaded per table"""
+        db = SessionLocal()
+        try:
+            offsets = {
+                model.__tablename__: db.query(func.coalesce(func.max(model.id), 0)).scalar()
+                for model in (User, LiquidityProvider, Order)
+            }
+        finally:
+            db.close()
+
+        copy = engine.dialect.name == "postgresql"
+        cfg = {
+            "seed": self.seed, "days": self.days, "copy": copy,
+            "now": int((self.now - datetime(1970, 1, 1)).total_seconds() * 1_000_000),
+            "users": self.users, "lps": self.lps,
+            "user_offset": offsets["users"], "lp_offset": offsets["liquidity_providers"],
+        }
+        order_start = offsets["orders"] + 1
+        phases = [
+            [self._jobs("users", offsets["users"] + 1, self.users, cfg)],
+            [self._jobs("liquidity_providers", offsets["liquidity_providers"] + 1, self.lps, cfg)],
+            [
+                self._jobs("orders", order_start, self.orders, cfg),
+                self._jobs("orders", order_start + self.orders, self.pending, dict(cfg, pending=True)),
+            ],
+        ]
+
+        loaded: Dict[str, int] = {table: 0 for table in COLUMNS}
+        with ProcessPoolExecutor(max_workers=self.workers, initializer=_init_worker) as pool:
+            # Phase by phase: orders reference users and LPs that must exist already
+            for phase in phases:
+                jobs = [job for jobs in phase for job in jobs]
+                for result in pool.map(_run_chunk, jobs):
+                    if not copy:
+                        _insert(result)
+                        result = {table: len(rows) for table, rows in result.items()}
+                    for table, count in result.items():
+                        loaded[table] += count
+
+        if copy:
+            self._reset_sequences()
+        return loaded
+
+    def _jobs(self, kind: str, start: int, total: int, cfg: Dict[str, Any]) -> List[Tuple]:
+        return [
+            (kind, index, start + offset, min(self.chunk_size, total - offset), cfg)
+            for index, offset in enumerate(range(0, total, self.chunk_size))
+        ]
+
+    @staticmethod
+    def _reset_sequences():
+        """IDs were set explicitly: move the PostgreSQL sequences past them"""
+        with engine.begin() as conn:
+            for table in ("users", "liquidity_providers", "orders"):
+                conn.exec_driver_sql(
+                    f"SELECT setval(pg_get_serial_sequence('{table}', 'id'), "
+                    f"(SELECT COALESCE(MAX(id), 1) FROM {table}))"
+                )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate synthetic data for benchmarks")
+    parser.add_argument("--users", type=int, default=100000)
+    parser.add_argument("--lps", type=int, default=10000)
+    parser.add_argument("--orders", type=int, default=1000000, help="Orders over the whole period, any status")
+    parser.add_argument("--pending", type=int, default=0, help="Extra open orders from the last 15 minutes")
+    parser.add_argument("--days", type=int, default=180, help="Period the orders are spread over")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--chunk-size", type=int, default=50000, help="Rows per generated and loaded chunk")
+    parser.add_argument("--now", type=datetime.fromisoformat, help="Reference time (UTC, default: now)")
+    args = parser.parse_args()
+
+    from app.migrations import upgrade_schema
+    upgrade_schema()
+
+    started = time.perf_counter()
+    loaded = DataGenerator(
+        users=args.users, lps=args.lps, orders=args.orders, pending=args.pending, days=args.days,
+        seed=args.seed, workers=args.workers, chunk_size=args.chunk_size, now=args.now
+    ).run()
+    elapsed = time.perf_counter() - started
+
+    for table, count in loaded.items():
+        print(f"✅ {table}: {count:,} rows")
+    print(f"⏱️  {sum(loaded.values()):,} rows in {elapsed:.1f}s ({sum(loaded.values()) / elapsed:,.0f} rows/s)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,52 @@
+"""
+Bulk import Liquidity Providers from a CSV or NDJSON file
+
+Usage: python scripts/import_lps.py lps.csv [--format csv|ndjson] [--errors errors.json]
+"""
+import sys
+sys.path.append(".")
+
+import argparse
+import json
+
+from app.database import SessionLocal
+from app.services.lp_import_service import LPImportService
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Bulk import Liquidity Providers")
+    parser.add_argument("path", help="CSV or NDJSON file with LP rows")
+    parser.add_argument("--format", dest="file_format", choices=["csv", "ndjson"], help="File format (default: from extension)")
+    parser.add_argument("--chunk-size", type=int, default=5000, help="Rows per bulk insert")
+    parser.add_argument("--errors", help="Write the per-row error report to this JSON file")
+    args = parser.parse_args()
+    
+    file_format = args.file_format
+    if not file_format:
+        file_format = "ndjson" if args.path.endswith((".ndjson", ".jsonl")) else "csv"
+    
+    db = SessionLocal()
+    
+    try:
+        with open(args.path, encoding="utf-8", newline="") as stream:
+            report = LPImportService(chunk_size=args.chunk_size).import_stream(db, stream, file_format)
+    finally:
+        db.close()
+    
+    print(f"✅ Imported {report['imported']} of {report['total_rows']} LPs")
+    
+    if report["errors"]:
+        print(f"❌ {report['failed']} rows failed")
+        if args.errors:
+            with open(args.errors, "w", encoding="utf-8") as f:
+                json.dump(report["errors"], f, indent=2)
+            print(f"ℹ️  Error report written to {args.errors}")
+        else:
+            for error in report["errors"][:20]:
+                print(f"   row {error['row']}: {error['error']}")
+            if report["failed"] > 20:
+                print(f"   ... and {report['failed'] - 20} more")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,53 @@
+"""
+Index escrow contract events into the transactions table
+
+Usage:
+    python scripts/index_chain.py                       # catch up to the finalized head
+    python scripts/index_chain.py --replay blocks.ndjson
+    python scripts/index_chain.py --record blocks.ndjson --from-block 100 --to-block 200
+"""
+import sys
+sys.path.append(".")
+
+import argparse
+
+from app.config import settings
+from app.services.polkadot_service import polkadot_service
+from app.services.chain_indexer import ChainIndexer, SubstrateBlockSource, RecordedBlockSource, record_blocks
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Index escrow contract events")
+    parser.add_argument("--replay", help="Index blocks from an NDJSON recording instead of the chain")
+    parser.add_argument("--record", help="Write blocks from the chain to an NDJSON recording")
+    parser.add_argument("--from-block", type=int, help="First block (recording, or first run)")
+    parser.add_argument("--to-block", type=int, help="Last block (default: head)")
+    parser.add_argument("--batch-size", type=int, default=settings.indexer_batch_size)
+    args = parser.parse_args()
+    
+    if args.replay:
+        source = RecordedBlockSource(args.replay)
+    else:
+        if not polkadot_service.connect() or not polkadot_service.contract_metadata:
+            print("❌ Could not connect to Polkadot or load contract metadata")
+            sys.exit(1)
+        source = SubstrateBlockSource(polkadot_service)
+    
+    try:
+        if args.record:
+            end = args.to_block if args.to_block is not None else source.head()
+            start = args.from_block if args.from_block is not None else end
+            with open(args.record, "w", encoding="utf-8") as f:
+                f.writelines(record_blocks(source, start, end))
+            print(f"✅ Recorded blocks {start}-{end} to {args.record}")
+            return
+        
+        indexer = ChainIndexer(source, batch_size=args.batch_size, start_block=args.from_block)
+        indexed = indexer.sync(args.to_block)
+        print(f"✅ Indexed {indexed} blocks")
+    finally:
+        polkadot_service.disconnect()
+
+
+if __name__ == "__main__":
+    main()
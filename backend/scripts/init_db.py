@@ -1,19 +1,31 @@
 """
 Initialize database with sample data
+
+With --users (and --lps/--orders), synthetic data at benchmark scale is
+added on top with scripts/generate_data.py.
+
+Usage:
+    python scripts/init_db.py
+    python scripts/init_db.py --users 200000 --lps 20000 --orders 5000000 --workers 8
 """
 import sys
 sys.path.append(".")
+sys.path.append("scripts")
 
-from app.database import SessionLocal, engine, Base
+import argparse
+import time
+
+from app.database import SessionLocal
+from app.migrations import upgrade_schema
 from app.models import User, LiquidityProvider
 
 
 def init_db():
     """Initialize database with tables and sample data"""
     
-    # Create all tables
-    Base.metadata.create_all(bind=engine)
-    print("✅ Database tables created")
+    # Create or migrate tables (alembic upgrade head)
+    upgrade_schema()
+    print("✅ Database schema up to date")
     
     # Create session
     db = SessionLocal()
@@ -73,6 +85,32 @@ def init_db():
         db.close()
 
 
+def generate(args: argparse.Namespace):
+    """Bulk-load synthetic users, LPs and orders (see generate_data.py)"""
+    from generate_data import DataGenerator
+
+    print(f"🗄️  Generating {args.users:,} users, {args.lps:,} LPs and {args.orders + args.pending:,} orders...")
+    started = time.perf_counter()
+    loaded = DataGenerator(
+        users=args.users, lps=args.lps, orders=args.orders, pending=args.pending, days=args.days,
+        seed=args.seed, workers=args.workers, chunk_size=args.chunk_size
+    ).run()
+    print(f"✅ Loaded {sum(loaded.values()):,} rows in {time.perf_counter() - started:.1f}s")
+
+
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Initialize database with sample data")
+    parser.add_argument("--users", type=int, default=0, help="Synthetic users to generate")
+    parser.add_argument("--lps", type=int, default=0, help="Synthetic LPs, taken from the generated users")
+    parser.add_argument("--orders", type=int, default=0, help="Synthetic orders over --days, any status")
+    parser.add_argument("--pending", type=int, default=0, help="Extra open orders from the last 15 minutes")
+    parser.add_argument("--days", type=int, default=180)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--chunk-size", type=int, default=50000)
+    args = parser.parse_args()
+
     init_db()
+    if args.users:
+        generate(args)
 
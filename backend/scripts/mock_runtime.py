@@ -0,0 +1,579 @@
+"""
+Synthetic runtime used by the mock Substrate node
+
+Provides just enough of a chain for PolkadotService: V14 runtime metadata
+with System, Utility and Contracts pallets, ink! metadata for the
+PolkaPayEscrow contract and a Python model of the contract (mirroring
+contracts/lib.rs) that the mock node executes when blocks are produced.
+"""
+from dataclasses import dataclass, replace
+from typing import Optional, Dict, Any, List, Tuple
+import hashlib
+import struct
+
+import xxhash
+from scalecodec.base import RuntimeConfigurationObject, ScaleBytes
+from scalecodec.type_registry import load_type_registry_preset
+from scalecodec.utils.ss58 import ss58_encode, ss58_decode
+
+SS58_FORMAT = 42
+# Past the legacy type overrides in scalecodec's rococo preset, which PolkadotService loads
+SPEC_VERSION = 1_014_000
+TRANSACTION_VERSION = 1
+
+# Pallet indices
+SYSTEM_INDEX = 0
+UTILITY_INDEX = 1
+CONTRACTS_INDEX = 2
+
+# Contracts pallet call and error indices
+CONTRACTS_CALL_INDEX = 6
+CONTRACT_REVERTED_ERROR = 0
+CONTRACT_NOT_FOUND_ERROR = 1
+
+# Contract account the node deploys PolkaPayEscrow at
+CONTRACT_PUBLIC_KEY = hashlib.blake2b(b"polkapay-escrow-mock", digest_size=32).digest()
+CONTRACT_ADDRESS = ss58_encode(CONTRACT_PUBLIC_KEY, SS58_FORMAT)
+
+ORDER_STATUSES = ["Pending", "Accepted", "PaymentSent", "Completed", "Disputed", "Cancelled"]
+CONTRACT_ERRORS = ["OrderNotFound", "Unauthorized", "InvalidStatus", "InsufficientBalance", "TransferFailed"]
+# (label, payable, args, return type key)
+CONTRACT_MESSAGES = [
+    ("create_order", True, [], "Result<Result<u64,Error>,LangError>"),
+    ("accept_order", False, [("order_id", "u64")], "Result<Result<(),Error>,LangError>"),
+    ("confirm_payment_sent", False, [("order_id", "u64")], "Result<Result<(),Error>,LangError>"),
+    ("complete_order", False, [("order_id", "u64")], "Result<Result<(),Error>,LangError>"),
+    ("cancel_order", False, [("order_id", "u64")], "Result<Result<(),Error>,LangError>"),
+    ("get_order", False, [("order_id", "u64")], "Result<Option<Order>,LangError>"),
+    ("get_balance", False, [], "Result<u128,LangError>"),
+]
+# (label, [(field, type key, topic)])
+CONTRACT_EVENTS = [
+    ("OrderCreated", [("order_id", "u64", True), ("buyer", "AccountId", True), ("amount", "u128", False)]),
+    ("OrderAccepted", [("order_id", "u64", True), ("seller", "AccountId", True)]),
+    ("OrderCompleted", [("order_id", "u64", True)]),
+    ("OrderCancelled", [("order_id", "u64", True)]),
+]
+
+
+def selector(label: str) -> bytes:
+    """ink! 4 message selector: first four bytes of BLAKE2b-256 of the label"""
+    return hashlib.blake2b(label.encode(), digest_size=32).digest()[:4]
+
+
+def twox128(data: bytes) -> bytes:
+    return b"".join(xxhash.xxh64(data, seed=seed).intdigest().to_bytes(8, "little") for seed in (0, 1))
+
+
+def compact(value: int) -> bytes:
+    """SCALE compact integer encoding"""
+    if value < 1 << 6:
+        return bytes([value << 2])
+    if value < 1 << 14:
+        return ((value << 2) | 1).to_bytes(2, "little")
+    if value < 1 << 30:
+        return ((value << 2) | 2).to_bytes(4, "little")
+    data = value.to_bytes((value.bit_length() + 7) // 8, "little")
+    return bytes([((len(data) - 4) << 2) | 3]) + data
+
+
+def decode_compact(data: bytes, offset: int = 0) -> Tuple[int, int]:
+    """Decode a compact integer, returns (value, next offset)"""
+    mode = data[offset] & 3
+    if mode == 0:
+        return data[offset] >> 2, offset + 1
+    if mode == 1:
+        return int.from_bytes(data[offset:offset + 2], "little") >> 2, offset + 2
+    if mode == 2:
+        return int.from_bytes(data[offset:offset + 4], "little") >> 2, offset + 4
+    length = (data[offset] >> 2) + 4
+    return int.from_bytes(data[offset + 1:offset + 1 + length], "little"), offset + 1 + length
+
+
+def account_id(address: str) -> bytes:
+    return bytes.fromhex(ss58_decode(address))
+
+
+def account_storage_prefix() -> bytes:
+    return twox128(b"System") + twox128(b"Account")
+
+
+def events_storage_key() -> bytes:
+    return twox128(b"System") + twox128(b"Events")
+
+
+def encode_account_info(nonce: int, free: int) -> bytes:
+    """frame_system::AccountInfo with pallet_balances::AccountData"""
+    return struct.pack("<IIII", nonce, 0, 1, 0) + b"".join(
+        value.to_bytes(16, "little") for value in (free, 0, 0, 1 << 127)
+    )
+
+
+class _TypeRegistry:
+    """Builds a scale-info PortableRegistry, types are referenced by key and may be forward declared"""
+
+    def __init__(self):
+        self.types: List[Optional[Dict[str, Any]]] = []
+        self._ids: Dict[str, int] = {}
+
+    def id(self, key: str) -> int:
+        if key not in self._ids:
+            self._ids[key] = len(self.types)
+            self.types.append(None)
+        return self._ids[key]
+
+    def define(self, key: str, definition: Dict[str, Any], path: Tuple[str, ...] = (), params: Tuple = ()) -> int:
+        type_id = self.id(key)
+        self.types[type_id] = {
+            "id": type_id,
+            "type": {
+                "path": list(path),
+                "params": [{"name": name, "type": param} for name, param in params],
+                "def": definition,
+                "docs": [],
+            },
+        }
+        return type_id
+
+    def primitive(self, name: str) -> int:
+        return self.define(name, {"primitive": name})
+
+    def array(self, key: str, length: int, item: str) -> int:
+        return self.define(key, {"array": {"len": length, "type": self.id(item)}})
+
+    def sequence(self, key: str, item: str) -> int:
+        return self.define(key, {"sequence": {"type": self.id(item)}})
+
+    def compact(self, key: str, item: str) -> int:
+        return self.define(key, {"compact": {"type": self.id(item)}})
+
+    def tuple(self, key: str, items: List[str]) -> int:
+        return self.define(key, {"tuple": [self.id(item) for item in items]})
+
+    def composite(self, key: str, fields: List[Tuple[Optional[str], str]], path: Tuple[str, ...] = (), params: Tuple = ()) -> int:
+        return self.define(key, {"composite": {"fields": [self._field(name, item) for name, item in fields]}}, path, params)
+
+    def variant(self, key: str, variants: List[Tuple[str, int, List[Tuple[Optional[str], str]]]], path: Tuple[str, ...] = (), params: Tuple = ()) -> int:
+        return self.define(key, {"variant": {"variants": [
+            {"name": name, "fields": [self._field(field, item) for field, item in fields], "index": index, "docs": []}
+            for name, index, fields in variants
+        ]}}, path, params)
+
+    def option(self, key: str, item: str) -> int:
+        return self.variant(key, [("None", 0, []), ("Some", 1, [(None, item)])], ("Option",), (("T", self.id(item)),))
+
+    def result(self, key: str, ok: str, err: str) -> int:
+        return self.variant(
+            key, [("Ok", 0, [(None, ok)]), ("Err", 1, [(None, err)])],
+            ("Result",), (("T", self.id(ok)), ("E", self.id(err)))
+        )
+
+    def _field(self, name: Optional[str], item: str) -> Dict[str, Any]:
+        return {"name": name, "type": self.id(item), "typeName": item, "docs": []}
+
+    def build(self) -> List[Dict[str, Any]]:
+        missing = [key for key, type_id in self._ids.items() if self.types[type_id] is None]
+        if missing:
+            raise ValueError(f"Undefined types: {missing}")
+        return self.types
+
+
+def build_runtime_metadata() -> bytes:
+    """SCALE encoded MetadataVersioned (V14) of the synthetic runtime"""
+    types = _TypeRegistry()
+    for name in ("u8", "u16", "u32", "u64", "u128", "bool"):
+        types.primitive(name)
+    types.tuple("()", [])
+    types.array("[u8;4]", 4, "u8")
+    types.array("[u8;20]", 20, "u8")
+    types.array("[u8;32]", 32, "u8")
+    types.array("[u8;64]", 64, "u8")
+    types.array("[u8;65]", 65, "u8")
+    types.sequence("Vec<u8>", "u8")
+    types.compact("Compact<u32>", "u32")
+    types.compact("Compact<u64>", "u64")
+    types.compact("Compact<u128>", "u128")
+    types.compact("Compact<()>", "()")
+    types.option("Option<Compact<u128>>", "Compact<u128>")
+
+    types.composite("AccountId32", [(None, "[u8;32]")], ("sp_core", "crypto", "AccountId32"))
+    types.composite("H256", [(None, "[u8;32]")], ("primitive_types", "H256"))
+    types.sequence("Vec<H256>", "H256")
+    types.variant("MultiAddress", [
+        ("Id", 0, [(None, "AccountId32")]),
+        ("Index", 1, [(None, "Compact<()>")]),
+        ("Raw", 2, [(None, "Vec<u8>")]),
+        ("Address32", 3, [(None, "[u8;32]")]),
+        ("Address20", 4, [(None, "[u8;20]")]),
+    ], ("sp_runtime", "multiaddress", "MultiAddress"), (("AccountId", types.id("AccountId32")), ("AccountIndex", types.id("()"))))
+    types.variant("MultiSignature", [
+        ("Ed25519", 0, [(None, "[u8;64]")]),
+        ("Sr25519", 1, [(None, "[u8;64]")]),
+        ("Ecdsa", 2, [(None, "[u8;65]")]),
+    ], ("sp_runtime", "MultiSignature"))
+    types.composite("Weight", [("ref_time", "Compact<u64>"), ("proof_size", "Compact<u64>")], ("sp_weights", "weight_v2", "Weight"))
+
+    # Calls
+    types.variant("ContractsCall", [("call", CONTRACTS_CALL_INDEX, [
+        ("dest", "MultiAddress"),
+        ("value", "Compact<u128>"),
+        ("gas_limit", "Weight"),
+        ("storage_deposit_limit", "Option<Compact<u128>>"),
+        ("data", "Vec<u8>"),
+    ])], ("pallet_contracts", "pallet", "Call"))
+    types.variant("UtilityCall", [("batch_all", 2, [("calls", "Vec<RuntimeCall>")])], ("pallet_utility", "pallet", "Call"))
+    types.sequence("Vec<RuntimeCall>", "RuntimeCall")
+    types.variant("RuntimeCall", [
+        ("Utility", UTILITY_INDEX, [(None, "UtilityCall")]),
+        ("Contracts", CONTRACTS_INDEX, [(None, "ContractsCall")]),
+    ], ("mock_runtime", "RuntimeCall"))
+
+    # Events
+    types.variant("DispatchClass", [("Normal", 0, []), ("Operational", 1, []), ("Mandatory", 2, [])], ("frame_support", "dispatch", "DispatchClass"))
+    types.variant("Pays", [("Yes", 0, []), ("No", 1, [])], ("frame_support", "dispatch", "Pays"))
+    types.composite("DispatchInfo", [("weight", "Weight"), ("class", "DispatchClass"), ("pays_fee", "Pays")], ("frame_support", "dispatch", "DispatchInfo"))
+    types.composite("ModuleError", [("index", "u8"), ("error", "[u8;4]")], ("sp_runtime", "ModuleError"))
+    types.variant("DispatchError", [
+        ("Other", 0, []),
+        ("CannotLookup", 1, []),
+        ("BadOrigin", 2, []),
+        ("Module", 3, [(None, "ModuleError")]),
+    ], ("sp_runtime", "DispatchError"))
+    types.variant("SystemEvent", [
+        ("ExtrinsicSuccess", 0, [("dispatch_info", "DispatchInfo")]),
+        ("ExtrinsicFailed", 1, [("dispatch_error", "DispatchError"), ("dispatch_info", "DispatchInfo")]),
+    ], ("frame_system", "pallet", "Event"))
+    types.variant("ContractsEvent", [("ContractEmitted", 3, [("contract", "AccountId32"), ("data", "Vec<u8>")])], ("pallet_contracts", "pallet", "Event"))
+    types.variant("RuntimeEvent", [
+        ("System", SYSTEM_INDEX, [(None, "SystemEvent")]),
+        ("Contracts", CONTRACTS_INDEX, [(None, "ContractsEvent")]),
+    ], ("mock_runtime", "RuntimeEvent"))
+    types.variant("Phase", [("ApplyExtrinsic", 0, [(None, "u32")]), ("Finalization", 1, []), ("Initialization", 2, [])], ("frame_system", "Phase"))
+    types.composite("EventRecord", [("phase", "Phase"), ("event", "RuntimeEvent"), ("topics", "Vec<H256>")],
+                    ("frame_system", "EventRecord"), (("E", types.id("RuntimeEvent")), ("T", types.id("H256"))))
+    types.sequence("Vec<EventRecord>", "EventRecord")
+    types.variant("ContractsError", [
+        ("ContractReverted", CONTRACT_REVERTED_ERROR, []),
+        ("ContractNotFound", CONTRACT_NOT_FOUND_ERROR, []),
+    ], ("pallet_contracts", "pallet", "Error"))
+
+    # Storage
+    types.composite("ExtraFlags", [(None, "u128")], ("pallet_balances", "types", "ExtraFlags"))
+    types.composite("AccountData", [("free", "u128"), ("reserved", "u128"), ("frozen", "u128"), ("flags", "ExtraFlags")],
+                    ("pallet_balances", "types", "AccountData"))
+    types.composite("AccountInfo", [("nonce", "u32"), ("consumers", "u32"), ("providers", "u32"), ("sufficients", "u32"), ("data", "AccountData")],
+                    ("frame_system", "AccountInfo"))
+
+    # Extrinsic format
+    types.variant("Era", [("Immortal", 0, [])], ("sp_runtime", "generic", "era", "Era"))
+    for extension in ("CheckSpecVersion", "CheckTxVersion", "CheckGenesis", "CheckWeight"):
+        types.composite(extension, [], ("frame_system", "extensions", extension))
+    types.composite("CheckMortality", [(None, "Era")], ("frame_system", "extensions", "check_mortality", "CheckMortality"))
+    types.composite("CheckNonce", [(None, "Compact<u32>")], ("frame_system", "extensions", "check_nonce", "CheckNonce"))
+    types.composite("ChargeTransactionPayment", [(None, "Compact<u128>")], ("pallet_transaction_payment", "ChargeTransactionPayment"))
+    types.composite("UncheckedExtrinsic", [(None, "Vec<u8>")], ("sp_runtime", "generic", "unchecked_extrinsic", "UncheckedExtrinsic"), (
+        ("Address", types.id("MultiAddress")),
+        ("Call", types.id("RuntimeCall")),
+        ("Signature", types.id("MultiSignature")),
+        ("Extra", types.id("()")),
+    ))
+
+    signed_extensions = [
+        ("CheckSpecVersion", "u32"),
+        ("CheckTxVersion", "u32"),
+        ("CheckGenesis", "H256"),
+        ("CheckMortality", "H256"),
+        ("CheckNonce", "()"),
+        ("CheckWeight", "()"),
+        ("ChargeTransactionPayment", "()"),
+    ]
+
+    pallets = [
+        {
+            "name": "System",
+            "storage": {"prefix": "System", "entries": [
+                {
+                    "name": "Account",
+                    "modifier": "Default",
+                    "type": {"Map": {"hashers": ["Blake2_128Concat"], "key": types.id("AccountId32"), "value": types.id("AccountInfo")}},
+                    "default": "0x" + encode_account_info(0, 0).hex(),
+                    "documentation": [],
+                },
+                {
+                    "name": "Events",
+                    "modifier": "Default",
+                    "type": {"Plain": types.id("Vec<EventRecord>")},
+                    "default": "0x00",
+                    "documentation": [],
+                },
+            ]},
+            "calls": None,
+            "event": {"ty": types.id("SystemEvent")},
+            "constants": [
+                {"name": "SS58Prefix", "type": types.id("u16"), "value": "0x" + SS58_FORMAT.to_bytes(2, "little").hex(), "documentation": []},
+            ],
+            "error": None,
+            "index": SYSTEM_INDEX,
+        },
+        {
+            "name": "Utility",
+            "storage": None,
+            "calls": {"ty": types.id("UtilityCall")},
+            "event": None,
+            "constants": [],
+            "error": None,
+            "index": UTILITY_INDEX,
+        },
+        {
+            "name": "Contracts",
+            "storage": None,
+            "calls": {"ty": types.id("ContractsCall")},
+            "event": {"ty": types.id("ContractsEvent")},
+            "constants": [],
+            "error": {"ty": types.id("ContractsError")},
+            "index": CONTRACTS_INDEX,
+        },
+    ]
+
+    runtime_config = RuntimeConfigurationObject()
+    runtime_config.update_type_registry(load_type_registry_preset(name="core"))
+    metadata = runtime_config.create_scale_object("MetadataVersioned")
+    data = metadata.encode(["0x6d657461", {"V14": {
+        "types": {"types": types.build()},
+        "pallets": pallets,
+        "extrinsic": {
+            "ty": types.id("UncheckedExtrinsic"),
+            "version": 4,
+            "signed_extensions": [
+                {"identifier": name, "ty": types.id(name), "additional_signed": types.id(additional)}
+                for name, additional in signed_extensions
+            ],
+        },
+        "runtime_type": types.id("()"),
+    }}])
+    return bytes(data.data)
+
+
+def build_contract_metadata() -> Dict[str, Any]:
+    """ink! 4 metadata of PolkaPayEscrow, as written by cargo contract build"""
+    types = _TypeRegistry()
+    types.primitive("u8")
+    types.primitive("u16")
+    types.primitive("u64")
+    types.primitive("u128")
+    types.tuple("()", [])
+    types.array("[u8;32]", 32, "u8")
+    types.composite("AccountId", [(None, "[u8;32]")], ("ink_primitives", "types", "AccountId"))
+    types.composite("Hash", [(None, "[u8;32]")], ("ink_primitives", "types", "Hash"))
+    types.option("Option<AccountId>", "AccountId")
+    types.variant("OrderStatus", [(name, index, []) for index, name in enumerate(ORDER_STATUSES)],
+                  ("polkapay_escrow", "polkapay_escrow", "OrderStatus"))
+    types.composite("Order", [
+        ("id", "u64"),
+        ("buyer", "AccountId"),
+        ("seller", "Option<AccountId>"),
+        ("amount", "u128"),
+        ("lp_fee", "u128"),
+        ("status", "OrderStatus"),
+        ("created_at", "u64"),
+    ], ("polkapay_escrow", "polkapay_escrow", "Order"))
+    types.option("Option<Order>", "Order")
+    types.variant("Error", [(name, index, []) for index, name in enumerate(CONTRACT_ERRORS)],
+                  ("polkapay_escrow", "polkapay_escrow", "Error"))
+    types.variant("LangError", [("CouldNotReadInput", 1, [])], ("ink_primitives", "LangError"))
+    types.result("Result<u64,Error>", "u64", "Error")
+    types.result("Result<(),Error>", "()", "Error")
+    types.result("Result<(),LangError>", "()", "LangError")
+    types.result("Result<Result<u64,Error>,LangError>", "Result<u64,Error>", "LangError")
+    types.result("Result<Result<(),Error>,LangError>", "Result<(),Error>", "LangError")
+    types.result("Result<Option<Order>,LangError>", "Option<Order>", "LangError")
+    types.result("Result<u128,LangError>", "u128", "LangError")
+
+    def type_spec(key: str) -> Dict[str, Any]:
+        return {"type": types.id(key), "displayName": [key.split("<")[0]]}
+
+    return {
+        "source": {
+            "hash": "0x" + hashlib.blake2b(b"polkapay-escrow-mock-code", digest_size=32).hexdigest(),
+            "language": "ink! 4.3.0",
+            "compiler": "rustc 1.72.0",
+        },
+        "contract": {"name": "polkapay_escrow", "version": "0.1.0", "authors": []},
+        "spec": {
+            "constructors": [{
+                "label": "new",
+                "selector": "0x" + selector("new").hex(),
+                "payable": False,
+                "default": False,
+                "args": [{"label": "lp_fee_bps", "type": type_spec("u16")}],
+                "returnType": type_spec("Result<(),LangError>"),
+                "docs": [],
+            }],
+            "messages": [
+                {
+                    "label": label,
+                    "selector": "0x" + selector(label).hex(),
+                    "mutates": label not in ("get_order", "get_balance"),
+                    "payable": payable,
+                    "default": False,
+                    "args": [{"label": name, "type": type_spec(key)} for name, key in args],
+                    "returnType": type_spec(return_type),
+                    "docs": [],
+                }
+                for label, payable, args, return_type in CONTRACT_MESSAGES
+            ],
+            "events": [
+                {
+                    "label": label,
+                    "args": [
+                        {"label": name, "indexed": topic, "type": type_spec(key), "docs": []}
+                        for name, key, topic in fields
+                    ],
+                    "docs": [],
+                }
+                for label, fields in CONTRACT_EVENTS
+            ],
+            "docs": [],
+            "lang_error": type_spec("LangError"),
+            "environment": {
+                "accountId": type_spec("AccountId"),
+                "balance": type_spec("u128"),
+                "blockNumber": {"type": types.id("u64"), "displayName": ["BlockNumber"]},
+                "hash": type_spec("Hash"),
+                "timestamp": {"type": types.id("u64"), "displayName": ["Timestamp"]},
+                "maxEventTopics": 4,
+            },
+        },
+        "storage": {"root": {"layout": {"struct": {"fields": [], "name": "PolkaPayEscrow"}}, "root_key": "0x00000000"}},
+        "types": types.build(),
+        "version": "4",
+    }
+
+
+@dataclass(frozen=True)
+class EscrowOrder:
+    id: int
+    buyer: bytes
+    seller: Optional[bytes]
+    amount: int
+    lp_fee: int
+    status: int
+    created_at: int
+
+    def encode(self) -> bytes:
+        seller = b"\x01" + self.seller if self.seller else b"\x00"
+        return (
+            struct.pack("<Q", self.id) + self.buyer + seller
+            + self.amount.to_bytes(16, "little") + self.lp_fee.to_bytes(16, "little")
+            + bytes([self.status]) + struct.pack("<Q", self.created_at)
+        )
+
+
+class ContractError(Exception):
+    def __init__(self, name: str):
+        super().__init__(name)
+        self.index = CONTRACT_ERRORS.index(name)
+
+
+class EscrowContract:
+    """
+    Python model of PolkaPayEscrow
+
+    execute() dispatches on the message selector like the ink! contract and
+    returns (return data, events). Orders are immutable so snapshot() is a
+    cheap copy for reverting failed batches.
+    """
+
+    def __init__(self, owner: bytes, lp_fee_bps: int = 200):
+        self.owner = owner
+        self.lp_fee_bps = lp_fee_bps
+        self.next_order_id = 1
+        self.orders: Dict[int, EscrowOrder] = {}
+        self.balance = 0
+        self._selectors = {selector(label): label for label, _, _, _ in CONTRACT_MESSAGES}
+
+    def snapshot(self) -> Tuple[int, Dict[int, EscrowOrder], int]:
+        return self.next_order_id, dict(self.orders), self.balance
+
+    def restore(self, snapshot: Tuple[int, Dict[int, EscrowOrder], int]):
+        self.next_order_id, self.orders, self.balance = snapshot
+
+    def execute(self, caller: bytes, value: int, data: bytes, timestamp: int, dry_run: bool = False) -> Tuple[bytes, List[bytes]]:
+        """
+        Run a message, returns its SCALE encoded return value and event data
+
+        Raises ContractError when the message returns Err, which reverts
+        the call on chain.
+        """
+        label = self._selectors.get(bytes(data[:4]))
+        if label is None:
+            raise ValueError(f"Unknown selector 0x{bytes(data[:4]).hex()}")
+        args = data[4:]
+        snapshot = self.snapshot() if dry_run else None
+        events: List[bytes] = []
+
+        try:
+            if label == "get_order":
+                order = self.orders.get(struct.unpack_from("<Q", args)[0])
+                return b"\x00" + (b"\x01" + order.encode() if order else b"\x00"), events
+            if label == "get_balance":
+                return b"\x00" + self.balance.to_bytes(16, "little"), events
+
+            if label == "create_order":
+                if value == 0:
+                    raise ContractError("InsufficientBalance")
+                order = EscrowOrder(
+                    id=self.next_order_id, buyer=caller, seller=None, amount=value,
+                    lp_fee=value * self.lp_fee_bps // 10000, status=0, created_at=timestamp
+                )
+                self.orders[order.id] = order
+                self.next_order_id += 1
+                self.balance += value
+                events.append(self._event("OrderCreated", struct.pack("<Q", order.id) + caller + value.to_bytes(16, "little")))
+                return b"\x00\x00" + struct.pack("<Q", order.id), events
+
+            order_id = struct.unpack_from("<Q", args)[0]
+            order = self.orders.get(order_id)
+            if order is None:
+                raise ContractError("OrderNotFound")
+
+            if label == "accept_order":
+                if order.status != ORDER_STATUSES.index("Pending"):
+                    raise ContractError("InvalidStatus")
+                self.orders[order_id] = replace(order, seller=caller, status=ORDER_STATUSES.index("Accepted"))
+                events.append(self._event("OrderAccepted", struct.pack("<Q", order_id) + caller))
+
+            elif label == "confirm_payment_sent":
+                if order.buyer != caller:
+                    raise ContractError("Unauthorized")
+                if order.status != ORDER_STATUSES.index("Accepted"):
+                    raise ContractError("InvalidStatus")
+                self.orders[order_id] = replace(order, status=ORDER_STATUSES.index("PaymentSent"))
+
+            elif label == "complete_order":
+                if order.seller is None:
+                    raise ContractError("Unauthorized")
+                if order.status != ORDER_STATUSES.index("PaymentSent"):
+                    raise ContractError("InvalidStatus")
+                self.balance -= order.amount
+                self.orders[order_id] = replace(order, status=ORDER_STATUSES.index("Completed"))
+                events.append(self._event("OrderCompleted", struct.pack("<Q", order_id)))
+
+            elif label == "cancel_order":
+                if order.buyer != caller:
+                    raise ContractError("Unauthorized")
+                if order.status != ORDER_STATUSES.index("Pending"):
+                    raise ContractError("InvalidStatus")
+                self.balance -= order.amount
+                self.orders[order_id] = replace(order, status=ORDER_STATUSES.index("Cancelled"))
+                events.append(self._event("OrderCancelled", struct.pack("<Q", order_id)))
+
+            return b"\x00\x00", events
+        finally:
+            if snapshot:
+                self.restore(snapshot)
+
+    def _event(self, label: str, fields: bytes) -> bytes:
+        # ink! 4 prefixes event data with the event's index in the metadata
+        index = [name for name, _ in CONTRACT_EVENTS].index(label)
+        return bytes([index]) + fields
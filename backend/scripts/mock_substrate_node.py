@@ -0,0 +1,663 @@
+"""
+Mock Substrate JSON-RPC node for chain-path benchmarks
+
+Serves the synthetic runtime from scripts/mock_runtime.py over a websocket,
+produces blocks on a timer and executes PolkaPayEscrow calls, so
+PolkadotService can be exercised without a public testnet. Latency and
+failures can be injected per request.
+
+Usage: python scripts/mock_substrate_node.py [--port 9944] [--block-time 1.0]
+           [--latency-ms 0] [--jitter-ms 0] [--error-rate 0] [--drop-rate 0]
+           [--fail-methods author_submitExtrinsic,state_call]
+Point the backend at it with the environment printed on startup.
+"""
+import sys
+sys.path.append(".")
+sys.path.append("scripts")
+
+from dataclasses import dataclass, field
+from typing import Optional, Dict, Any, List, Tuple, Set
+import argparse
+import asyncio
+import hashlib
+import itertools
+import json
+import logging
+import os
+import random
+import struct
+import threading
+import time
+
+import websockets
+from scalecodec.base import RuntimeConfigurationObject, ScaleBytes
+from scalecodec.type_registry import load_type_registry_preset
+from scalecodec.utils.ss58 import ss58_encode
+
+from mock_runtime import (
+    SS58_FORMAT, SPEC_VERSION, TRANSACTION_VERSION, SYSTEM_INDEX, UTILITY_INDEX, CONTRACTS_INDEX,
+    CONTRACT_REVERTED_ERROR, CONTRACT_NOT_FOUND_ERROR, CONTRACT_ADDRESS, CONTRACT_PUBLIC_KEY,
+    ContractError, EscrowContract, build_runtime_metadata, build_contract_metadata,
+    compact, decode_compact, account_id, account_storage_prefix, events_storage_key, encode_account_info
+)
+
+logger = logging.getLogger(__name__)
+
+RUNTIME_VERSION = {
+    "specName": "polkapay-mock",
+    "implName": "polkapay-mock",
+    "authoringVersion": 1,
+    "specVersion": SPEC_VERSION,
+    "implVersion": 1,
+    "apis": [],
+    "transactionVersion": TRANSACTION_VERSION,
+    "stateVersion": 1,
+}
+
+# Weight reported for every extrinsic (ref_time, proof_size)
+EXTRINSIC_WEIGHT = (1_000_000_000, 100_000)
+REVERT_FLAG = 1
+
+
+class RpcError(Exception):
+    def __init__(self, code: int, message: str, data: Optional[str] = None):
+        super().__init__(message)
+        self.code = code
+        self.message = message
+        self.data = data
+
+    def to_dict(self) -> Dict[str, Any]:
+        error = {"code": self.code, "message": self.message}
+        if self.data is not None:
+            error["data"] = self.data
+        return error
+
+
+@dataclass
+class Block:
+    number: int
+    hash: str
+    parent_hash: str
+    extrinsics: List[str] = field(default_factory=list)
+    events: bytes = b"\x00"
+
+    def header(self) -> Dict[str, Any]:
+        return {
+            "parentHash": self.parent_hash,
+            "number": hex(self.number),
+            "stateRoot": "0x" + "00" * 32,
+            "extrinsicsRoot": "0x" + "00" * 32,
+            "digest": {"logs": []},
+        }
+
+
+@dataclass
+class _PoolEntry:
+    tx_hash: str
+    signer: str
+    nonce: int
+    data: str
+    call: bytes
+
+
+class MockChain:
+    """
+    Chain state behind the mock node
+
+    Accounts only carry a nonce and a fixed free balance. Extrinsics are
+    validated against nonces on submission and executed in nonce order when
+    a block is produced; signatures are not verified.
+    """
+
+    def __init__(self, free_balance: int = 1000 * 10 ** 10, max_block_extrinsics: int = 500):
+        self.free_balance = free_balance
+        self.max_block_extrinsics = max_block_extrinsics
+        self.metadata = build_runtime_metadata()
+        self.metadata_hex = "0x" + self.metadata.hex()
+
+        self.runtime_config = RuntimeConfigurationObject(implements_scale_info=True, ss58_format=SS58_FORMAT)
+        self.runtime_config.update_type_registry(load_type_registry_preset(name="core"))
+        self._metadata_obj = self.runtime_config.create_scale_object("MetadataVersioned", data=ScaleBytes(self.metadata))
+        self._metadata_obj.decode()
+        self.runtime_config.add_portable_registry(self._metadata_obj)
+
+        self.contract = EscrowContract(owner=hashlib.blake2b(b"polkapay-escrow-owner", digest_size=32).digest())
+        self.nonces: Dict[str, int] = {}
+        self.pool: Dict[str, _PoolEntry] = {}
+
+        genesis = Block(number=0, hash=self._block_hash(0, "0x" + "00" * 32, []), parent_hash="0x" + "00" * 32)
+        self.blocks: List[Block] = [genesis]
+        self._blocks_by_hash: Dict[str, Block] = {genesis.hash: genesis}
+
+    @property
+    def head(self) -> Block:
+        return self.blocks[-1]
+
+    def block(self, block_hash: Optional[str] = None) -> Optional[Block]:
+        if block_hash is None:
+            return self.head
+        return self._blocks_by_hash.get(block_hash)
+
+    def next_index(self, address: str) -> int:
+        """Next nonce for an account, including its transactions in the pool"""
+        nonce = self.nonces.get(address, 0)
+        pooled = {entry.nonce for entry in self.pool.values() if entry.signer == address}
+        while nonce in pooled:
+            nonce += 1
+        return nonce
+
+    def submit(self, data: str) -> str:
+        """Validate an extrinsic and add it to the pool, returns its hash"""
+        try:
+            extrinsic = self.runtime_config.create_scale_object(
+                "Extrinsic", data=ScaleBytes(data), metadata=self._metadata_obj
+            )
+            extrinsic.decode()
+        except Exception as e:
+            raise RpcError(1002, "Verification Error: Runtime error: Could not decode extrinsic", str(e))
+
+        value = extrinsic.value
+        if not value.get("address"):
+            raise RpcError(1010, "Invalid Transaction", "Transaction call is not expected")
+
+        tx_hash = f"0x{extrinsic.extrinsic_hash.hex()}"
+        signer = value["address"]["Id"] if isinstance(value["address"], dict) else value["address"]
+        nonce = value["nonce"]
+
+        if tx_hash in self.pool:
+            raise RpcError(1013, "Transaction Already Imported")
+        if nonce < self.nonces.get(signer, 0):
+            raise RpcError(1010, "Invalid Transaction", "Transaction is outdated")
+        if any(entry.signer == signer and entry.nonce == nonce for entry in self.pool.values()):
+            raise RpcError(1014, "Priority is too low: (0 vs 0)", "The transaction has too low priority to replace another transaction already in the pool.")
+
+        call = bytes(extrinsic.value_object["call"].get_used_bytes())
+        self.pool[tx_hash] = _PoolEntry(tx_hash=tx_hash, signer=signer, nonce=nonce, data=data, call=call)
+        return tx_hash
+
+    def produce_block(self) -> Tuple[Block, List[str]]:
+        """Build the next block from ready pool transactions, returns (block, included hashes)"""
+        ready: List[_PoolEntry] = []
+        expected = dict(self.nonces)
+        for entry in sorted(self.pool.values(), key=lambda entry: (entry.signer, entry.nonce)):
+            if len(ready) >= self.max_block_extrinsics:
+                break
+            next_nonce = expected.get(entry.signer, 0)
+            if entry.nonce < next_nonce:
+                # Stale, another transaction used this nonce
+                del self.pool[entry.tx_hash]
+            elif entry.nonce == next_nonce:
+                ready.append(entry)
+                expected[entry.signer] = next_nonce + 1
+
+        timestamp = int(time.time() * 1000)
+        records: List[bytes] = []
+        for index, entry in enumerate(ready):
+            del self.pool[entry.tx_hash]
+            records.extend(self._apply(index, entry, timestamp))
+
+        parent = self.head
+        number = parent.number + 1
+        hashes = [entry.tx_hash for entry in ready]
+        block = Block(
+            number=number,
+            hash=self._block_hash(number, parent.hash, hashes),
+            parent_hash=parent.hash,
+            extrinsics=[entry.data for entry in ready],
+            events=compact(len(records)) + b"".join(records),
+        )
+        self.blocks.append(block)
+        self._blocks_by_hash[block.hash] = block
+        return block, hashes
+
+    def storage(self, key: str, block: Block) -> Optional[str]:
+        raw = bytes.fromhex(key[2:])
+        if raw == events_storage_key():
+            return "0x" + block.events.hex()
+        if raw.startswith(account_storage_prefix()) and len(raw) == 80:
+            address = ss58_encode(raw[-32:], SS58_FORMAT)
+            return "0x" + encode_account_info(self.nonces.get(address, 0), self.free_balance).hex()
+        return None
+
+    def state_call(self, method: str, data: str) -> str:
+        raw = bytes.fromhex(data[2:])
+        if method == "AccountNonceApi_account_nonce":
+            address = ss58_encode(raw[:32], SS58_FORMAT)
+            return "0x" + struct.pack("<I", self.nonces.get(address, 0)).hex()
+        if method == "ContractsApi_call":
+            return "0x" + self._dry_run(raw).hex()
+        raise RpcError(-32000, f"Client error: Execution failed: Exported method {method} is not found")
+
+    def _apply(self, index: int, entry: _PoolEntry, timestamp: int) -> List[bytes]:
+        """Execute one extrinsic, returns its event records"""
+        self.nonces[entry.signer] = entry.nonce + 1
+        caller = account_id(entry.signer)
+        phase = b"\x00" + struct.pack("<I", index)
+        snapshot = self.contract.snapshot()
+
+        emitted: List[bytes] = []
+        try:
+            for dest, value, input_data in self._decode_calls(entry.call)[0]:
+                if dest != CONTRACT_PUBLIC_KEY:
+                    raise LookupError(dest.hex())
+                emitted.extend(self.contract.execute(caller, value, input_data, timestamp)[1])
+        except ContractError as e:
+            logger.debug(f"Extrinsic {entry.tx_hash} reverted: {e}")
+            error = CONTRACT_REVERTED_ERROR
+        except LookupError as e:
+            logger.debug(f"Extrinsic {entry.tx_hash} called a missing contract: {e}")
+            error = CONTRACT_NOT_FOUND_ERROR
+        else:
+            records = [
+                phase + bytes([CONTRACTS_INDEX, 3]) + CONTRACT_PUBLIC_KEY + compact(len(data)) + data + b"\x00"
+                for data in emitted
+            ]
+            records.append(phase + bytes([SYSTEM_INDEX, 0]) + _dispatch_info() + b"\x00")
+            return records
+
+        # batch_all is atomic, a failing call reverts the whole extrinsic
+        self.contract.restore(snapshot)
+        module_error = b"\x03" + bytes([CONTRACTS_INDEX, error, 0, 0, 0])
+        return [phase + bytes([SYSTEM_INDEX, 1]) + module_error + _dispatch_info() + b"\x00"]
+
+    def _decode_calls(self, data: bytes, offset: int = 0) -> Tuple[List[Tuple[bytes, int, bytes]], int]:
+        """
+        Decode a call into its contract calls as (dest, value, input data)
+
+        Only the calls in the synthetic runtime exist: Contracts.call and
+        Utility.batch_all of them. Returns (calls, next offset).
+        """
+        pallet, function = data[offset], data[offset + 1]
+        offset += 2
+        if (pallet, function) == (UTILITY_INDEX, 2):
+            count, offset = decode_compact(data, offset)
+            calls = []
+            for _ in range(count):
+                inner, offset = self._decode_calls(data, offset)
+                calls.extend(inner)
+            return calls, offset
+
+        # Contracts.call: dest, value, gas_limit, storage_deposit_limit, data
+        if data[offset] != 0:
+            raise LookupError("Only MultiAddress::Id destinations are supported")
+        dest = data[offset + 1:offset + 33]
+        value, offset = decode_compact(data, offset + 33)
+        _, offset = decode_compact(data, offset)
+        _, offset = decode_compact(data, offset)
+        if data[offset]:
+            _, offset = decode_compact(data, offset + 1)
+        else:
+            offset += 1
+        length, offset = decode_compact(data, offset)
+        return [(dest, value, data[offset:offset + length])], offset + length
+
+    def _dry_run(self, raw: bytes) -> bytes:
+        """ContractsApi_call: execute without committing, returns a ContractExecResult"""
+        origin, dest = raw[:32], raw[32:64]
+        value = int.from_bytes(raw[64:80], "little")
+        offset = 80
+        if raw[offset]:
+            _, offset = decode_compact(raw, offset + 1)
+            _, offset = decode_compact(raw, offset)
+        else:
+            offset += 1
+        offset += 17 if raw[offset] else 1
+        length, offset = decode_compact(raw, offset)
+        input_data = raw[offset:offset + length]
+
+        gas = _weight()
+        prefix = gas + gas + b"\x01" + bytes(16) + b"\x00"
+        if dest != CONTRACT_PUBLIC_KEY:
+            return prefix + b"\x01\x03" + bytes([CONTRACTS_INDEX, CONTRACT_NOT_FOUND_ERROR, 0, 0, 0])
+
+        flags = 0
+        try:
+            data, _ = self.contract.execute(origin, value, input_data, int(time.time() * 1000), dry_run=True)
+        except ContractError as e:
+            # Message returned Err: Ok(Err(error)) with the revert flag
+            flags = REVERT_FLAG
+            data = b"\x00\x01" + bytes([e.index])
+        return prefix + b"\x00" + struct.pack("<I", flags) + compact(len(data)) + data
+
+    @staticmethod
+    def _block_hash(number: int, parent_hash: str, extrinsic_hashes: List[str]) -> str:
+        digest = hashlib.blake2b(digest_size=32)
+        digest.update(struct.pack("<I", number))
+        digest.update(parent_hash.encode())
+        for tx_hash in extrinsic_hashes:
+            digest.update(tx_hash.encode())
+        return "0x" + digest.hexdigest()
+
+
+def _weight() -> bytes:
+    return compact(EXTRINSIC_WEIGHT[0]) + compact(EXTRINSIC_WEIGHT[1])
+
+
+def _dispatch_info() -> bytes:
+    # Normal class, pays fee
+    return _weight() + b"\x00\x00"
+
+
+class MockSubstrateNode:
+    """
+    Websocket JSON-RPC server around a MockChain
+
+    Every request is delayed by latency plus uniform jitter. With
+    error_rate a request gets an error response instead of its result, with
+    drop_rate the connection is closed without responding; both apply only
+    to fail_methods when given. Subscription notifications are never
+    delayed or dropped.
+    """
+
+    def __init__(
+        self,
+        chain: Optional[MockChain] = None,
+        block_time: float = 1.0,
+        latency_ms: float = 0.0,
+        jitter_ms: float = 0.0,
+        error_rate: float = 0.0,
+        drop_rate: float = 0.0,
+        fail_methods: Optional[Set[str]] = None,
+        seed: Optional[int] = None
+    ):
+        self.chain = chain or MockChain()
+        self.block_time = block_time
+        self.latency = latency_ms / 1000
+        self.jitter = jitter_ms / 1000
+        self.error_rate = error_rate
+        self.drop_rate = drop_rate
+        self.fail_methods = fail_methods
+        self.url: Optional[str] = None
+
+        self._random = random.Random(seed)
+        self._subscription_ids = itertools.count(1)
+        # subscription id -> websocket
+        self._head_subscribers: Dict[str, Any] = {}
+        self._finalized_subscribers: Dict[str, Any] = {}
+        # tx hash -> (subscription id, websocket)
+        self._watchers: Dict[str, Tuple[str, Any]] = {}
+        self._stats: Dict[str, int] = {"requests": 0, "injected_errors": 0, "dropped_connections": 0, "blocks": 0, "extrinsics": 0}
+        self._method_counts: Dict[str, int] = {}
+
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._thread: Optional[threading.Thread] = None
+        self._stopped: Optional[asyncio.Event] = None
+
+    async def serve(self, host: str = "127.0.0.1", port: int = 9944, ready: Optional[threading.Event] = None):
+        """Serve until stop() is called"""
+        self._loop = asyncio.get_running_loop()
+        self._stopped = asyncio.Event()
+        async with websockets.serve(self._handle, host, port, max_size=None) as server:
+            bound_port = server.sockets[0].getsockname()[1]
+            self.url = f"ws://{host}:{bound_port}"
+            producer = asyncio.create_task(self._produce_blocks())
+            if ready:
+                ready.set()
+            try:
+                await self._stopped.wait()
+            finally:
+                producer.cancel()
+
+    def start(self, host: str = "127.0.0.1", port: int = 0) -> str:
+        """Run the node in a background thread, returns its websocket URL"""
+        ready = threading.Event()
+        self._thread = threading.Thread(
+            target=lambda: asyncio.run(self.serve(host, port, ready)), name="mock-substrate-node", daemon=True
+        )
+        self._thread.start()
+        if not ready.wait(timeout=10):
+            raise RuntimeError("Mock node did not start")
+        return self.url
+
+    def stop(self):
+        if self._loop and self._stopped:
+            self._loop.call_soon_threadsafe(self._stopped.set)
+        if self._thread:
+            self._thread.join(timeout=5)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            **self._stats,
+            "head": self.chain.head.number,
+            "pool": len(self.chain.pool),
+            "methods": dict(sorted(self._method_counts.items(), key=lambda item: -item[1])),
+        }
+
+    async def _handle(self, websocket: Any, path: Optional[str] = None):
+        try:
+            async for message in websocket:
+                request = json.loads(message)
+                method = request.get("method", "")
+                self._stats["requests"] += 1
+                self._method_counts[method] = self._method_counts.get(method, 0) + 1
+
+                if self._inject(self.drop_rate, method):
+                    self._stats["dropped_connections"] += 1
+                    await websocket.close()
+                    return
+
+                delay = self.latency + self._random.uniform(0, self.jitter)
+                if delay:
+                    await asyncio.sleep(delay)
+
+                response: Dict[str, Any] = {"jsonrpc": "2.0", "id": request.get("id")}
+                try:
+                    if self._inject(self.error_rate, method):
+                        self._stats["injected_errors"] += 1
+                        raise RpcError(-32000, "Mock node: injected failure")
+                    response["result"] = self._call(method, request.get("params") or [], websocket)
+                except RpcError as e:
+                    response["error"] = e.to_dict()
+                except Exception as e:
+                    logger.exception(f"Error handling {method}")
+                    response["error"] = {"code": -32603, "message": f"Internal error: {e}"}
+                await websocket.send(json.dumps(response))
+        except websockets.ConnectionClosed:
+            pass
+        finally:
+            self._unsubscribe_all(websocket)
+
+    def _inject(self, rate: float, method: str) -> bool:
+        if not rate or (self.fail_methods and method not in self.fail_methods):
+            return False
+        return self._random.random() < rate
+
+    def _call(self, method: str, params: List[Any], websocket: Any) -> Any:
+        chain = self.chain
+
+        if method == "rpc_methods":
+            return {"version": 1, "methods": sorted(RPC_METHODS)}
+        if method == "system_chain":
+            return "PolkaPay Mock"
+        if method == "system_name":
+            return "mock-substrate-node"
+        if method == "system_version":
+            return "0.1.0"
+        if method == "system_properties":
+            return {"ss58Format": SS58_FORMAT, "tokenDecimals": 10, "tokenSymbol": "ROC"}
+        if method == "system_health":
+            return {"peers": 0, "isSyncing": False, "shouldHavePeers": False}
+        if method == "system_accountNextIndex":
+            return chain.next_index(params[0])
+
+        if method == "chain_getBlockHash":
+            if not params or params[0] is None:
+                return chain.head.hash
+            number = int(params[0], 16) if isinstance(params[0], str) else params[0]
+            return chain.blocks[number].hash if 0 <= number < len(chain.blocks) else None
+        if method in ("chain_getHead", "chain_getFinalizedHead", "chain_getFinalisedHead"):
+            return chain.head.hash
+        if method == "chain_getHeader":
+            block = chain.block(params[0] if params else None)
+            return block.header() if block else None
+        if method == "chain_getBlock":
+            block = chain.block(params[0] if params else None)
+            if not block:
+                return None
+            return {"block": {"header": block.header(), "extrinsics": block.extrinsics}, "justifications": None}
+
+        if method in ("state_getRuntimeVersion", "chain_getRuntimeVersion"):
+            return RUNTIME_VERSION
+        if method == "state_getMetadata":
+            return chain.metadata_hex
+        if method in ("state_getStorage", "state_getStorageAt"):
+            block = self._block(params[1] if len(params) > 1 else None)
+            return chain.storage(params[0], block)
+        if method == "state_queryStorageAt":
+            block = self._block(params[1] if len(params) > 1 else None)
+            return [{"block": block.hash, "changes": [[key, chain.storage(key, block)] for key in params[0]]}]
+        if method == "state_call":
+            return chain.state_call(params[0], params[1])
+
+        if method == "author_submitExtrinsic":
+            return chain.submit(params[0])
+        if method == "author_pendingExtrinsics":
+            return [entry.data for entry in chain.pool.values()]
+        if method == "author_submitAndWatchExtrinsic":
+            tx_hash = chain.submit(params[0])
+            subscription_id = self._new_subscription_id()
+            self._watchers[tx_hash] = (subscription_id, websocket)
+            return subscription_id
+
+        if method in ("chain_subscribeNewHeads", "chain_subscribeNewHead", "chain_subscribeAllHeads"):
+            subscription_id = self._new_subscription_id()
+            self._head_subscribers[subscription_id] = websocket
+            return subscription_id
+        if method in ("chain_subscribeFinalizedHeads", "chain_subscribeFinalisedHeads"):
+            subscription_id = self._new_subscription_id()
+            self._finalized_subscribers[subscription_id] = websocket
+            return subscription_id
+        if method in UNSUBSCRIBE_METHODS:
+            subscription_id = params[0]
+            found = (
+                self._head_subscribers.pop(subscription_id, None) is not None
+                or self._finalized_subscribers.pop(subscription_id, None) is not None
+            )
+            for tx_hash, (watch_id, _) in list(self._watchers.items()):
+                if watch_id == subscription_id:
+                    del self._watchers[tx_hash]
+                    found = True
+            return found
+
+        raise RpcError(-32601, "Method not found")
+
+    def _block(self, block_hash: Optional[str]) -> Block:
+        block = self.chain.block(block_hash)
+        if block is None:
+            raise RpcError(4003, "Client error: UnknownBlock: State already discarded")
+        return block
+
+    def _new_subscription_id(self) -> str:
+        return f"mock-{next(self._subscription_ids)}"
+
+    def _unsubscribe_all(self, websocket: Any):
+        for subscribers in (self._head_subscribers, self._finalized_subscribers):
+            for subscription_id in [key for key, ws in subscribers.items() if ws is websocket]:
+                del subscribers[subscription_id]
+        for tx_hash in [key for key, (_, ws) in self._watchers.items() if ws is websocket]:
+            del self._watchers[tx_hash]
+
+    async def _produce_blocks(self):
+        while True:
+            await asyncio.sleep(self.block_time)
+            try:
+                block, included = self.chain.produce_block()
+            except Exception:
+                logger.exception("Error producing block")
+                continue
+            self._stats["blocks"] += 1
+            self._stats["extrinsics"] += len(included)
+
+            header = block.header()
+            # Blocks are final as soon as they are produced
+            for method, subscribers in (
+                ("chain_newHead", self._head_subscribers),
+                ("chain_finalizedHead", self._finalized_subscribers),
+            ):
+                for subscription_id, websocket in list(subscribers.items()):
+                    await self._notify(websocket, method, subscription_id, header)
+
+            for tx_hash in included:
+                watcher = self._watchers.pop(tx_hash, None)
+                if watcher:
+                    subscription_id, websocket = watcher
+                    await self._notify(websocket, "author_extrinsicUpdate", subscription_id, {"inBlock": block.hash})
+                    await self._notify(websocket, "author_extrinsicUpdate", subscription_id, {"finalized": block.hash})
+
+    async def _notify(self, websocket: Any, method: str, subscription_id: str, result: Any):
+        try:
+            await websocket.send(json.dumps({
+                "jsonrpc": "2.0",
+                "method": method,
+                "params": {"subscription": subscription_id, "result": result},
+            }))
+        except websockets.ConnectionClosed:
+            self._unsubscribe_all(websocket)
+
+
+UNSUBSCRIBE_METHODS = {
+    "chain_unsubscribeNewHeads", "chain_unsubscribeNewHead", "chain_unsubscribeAllHeads",
+    "chain_unsubscribeFinalizedHeads", "chain_unsubscribeFinalisedHeads", "author_unwatchExtrinsic",
+}
+
+RPC_METHODS = {
+    "rpc_methods", "system_chain", "system_name", "system_version", "system_properties", "system_health",
+    "system_accountNextIndex", "chain_getBlockHash", "chain_getHead", "chain_getFinalizedHead",
+    "chain_getFinalisedHead", "chain_getHeader", "chain_getBlock", "state_getRuntimeVersion",
+    "chain_getRuntimeVersion", "state_getMetadata", "state_getStorage", "state_getStorageAt",
+    "state_queryStorageAt", "state_call", "author_submitExtrinsic", "author_pendingExtrinsics",
+    "author_submitAndWatchExtrinsic", "chain_subscribeNewHeads", "chain_subscribeNewHead",
+    "chain_subscribeAllHeads", "chain_subscribeFinalizedHeads", "chain_subscribeFinalisedHeads",
+} | UNSUBSCRIBE_METHODS
+
+
+def write_contract_metadata(path: str) -> str:
+    """Write the escrow contract's ink! metadata for CONTRACT_METADATA_PATH"""
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(build_contract_metadata(), f, indent=2)
+    return path
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run a mock Substrate node for benchmarks")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=9944)
+    parser.add_argument("--block-time", type=float, default=1.0, help="Seconds between blocks")
+    parser.add_argument("--latency-ms", type=float, default=0.0, help="Delay added to every request")
+    parser.add_argument("--jitter-ms", type=float, default=0.0, help="Uniform random delay on top of latency")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Fraction of requests answered with an error")
+    parser.add_argument("--drop-rate", type=float, default=0.0, help="Fraction of requests that close the connection")
+    parser.add_argument("--fail-methods", help="Comma separated RPC methods errors and drops apply to (default: all)")
+    parser.add_argument("--contract-metadata", default=".cache/mock_contract_metadata.json")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+
+    node = MockSubstrateNode(
+        block_time=args.block_time,
+        latency_ms=args.latency_ms,
+        jitter_ms=args.jitter_ms,
+        error_rate=args.error_rate,
+        drop_rate=args.drop_rate,
+        fail_methods=set(args.fail_methods.split(",")) if args.fail_methods else None
+    )
+    metadata_path = write_contract_metadata(args.contract_metadata)
+
+    print(f"✅ Mock node on ws://{args.host}:{args.port} (block time {args.block_time}s)")
+    print("ℹ️  Backend environment:")
+    print(f"   POLKADOT_NODE_URL=ws://{args.host}:{args.port}")
+    print(f"   POLKADOT_BLOCK_TIME_SECONDS={args.block_time}")
+    print(f"   CONTRACT_ADDRESS={CONTRACT_ADDRESS}")
+    print(f"   CONTRACT_METADATA_PATH={os.path.abspath(metadata_path)}")
+
+    try:
+        asyncio.run(node.serve(args.host, args.port))
+    except KeyboardInterrupt:
+        print(f"ℹ️  Stopped at block {node.chain.head.number}")
+
+
+if __name__ == "__main__":
+    main()